@@ -1,13 +1,18 @@
+import uuid
 import streamlit as st
-import asyncio
-import sqlite3
 import pandas as pd
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.genai import types
-from marriage_council.broker import get_broker_agent
+from marriage_council.registry import registry
+from marriage_council.sub_agents.vetting import fast_path_stats
+from marriage_council.tool_cache import tool_cache_stats
+from marriage_council.single_flight import single_flight_stats
+from marriage_council.tracing import agent_latency_percentiles, tokens_per_turn
 from marriage_council.config import conf
-from marriage_council.database import setup_database
+from marriage_council.database import setup_database, get_connection, profiles_version
+from marriage_council.log_tail import LogTail, get_log_tail
+from marriage_council.log_store import activity_summary
+from marriage_council.sessions import SqliteSessionService, chat_transcript
 
 st.set_page_config(page_title="Marriage Council AI", layout="wide", page_icon="💍")
 
@@ -15,54 +20,70 @@ st.set_page_config(page_title="Marriage Council AI", layout="wide", page_icon="
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
-if "session_service" not in st.session_state:
-    st.session_state.session_service = InMemorySessionService()
-    st.session_state.session_id = "session_v1"
-    
-    async def init_session():
-        await st.session_state.session_service.create_session(
-            app_name="MarriageApp", user_id="user", session_id=st.session_state.session_id
-        )
-    asyncio.run(init_session())
-
 setup_database()
 
+@st.cache_resource
+def shared_session_service():
+    return SqliteSessionService()
+
+if "session_service" not in st.session_state:
+    service = st.session_state.session_service = shared_session_service()
+    # One durable session per browser tab; the ?session= URL parameter resumes it after a restart
+    session_id = st.query_params.get("session") or uuid.uuid4().hex
+    st.query_params["session"] = session_id
+    st.session_state.session_id = session_id
+
+    # Runs on the registry loop thread, which has no Streamlit context: pass values, not session_state
+    session = registry.run(service.get_session(app_name="MarriageApp", user_id="user", session_id=session_id))
+    if session is None:
+        registry.run(service.create_session(app_name="MarriageApp", user_id="user", session_id=session_id))
+    else:
+        st.session_state.messages = chat_transcript(session)
+
 # --- 2. GLOBAL FUNCTION: RUN AGENT LOGIC ---
-async def run_agent(input_prompt):
-    # FIX: Create Agent FRESH inside the loop
-    fresh_agent = get_broker_agent()
-    
-    local_runner = Runner(
-        agent=fresh_agent,
-        app_name="MarriageApp",
-        session_service=st.session_state.session_service
-    )
-    
+def run_agent(input_prompt):
+    # The broker graph and Runner are shared process-wide (see registry.py)
     st.session_state.messages.append({"role": "user", "content": input_prompt})
     
     with st.chat_message("user"):
         st.markdown(input_prompt)
         
     with st.chat_message("assistant"):
+        progress = st.status("🧭 Broker is working...", expanded=False)
         response_container = st.empty()
         response_data = [""]
-        
+        streamed = ""
+
+        def show_progress(update):
+            # Sub-agents run inside AgentTools, so their progress arrives via ProgressPlugin, not events
+            icon = "▶️" if update.phase == "started" else "✅"
+            progress.write(f"{icon} `{update.agent_name}` {update.phase} ({update.elapsed_ms:.0f} ms)")
+            progress.update(label=f"{icon} {update.agent_name} {update.phase}")
+
         msg_content = types.Content(role="user", parts=[types.Part(text=input_prompt)])
-        
-        async for event in local_runner.run_async(
-            user_id="user", session_id=st.session_state.session_id, new_message=msg_content
+        run_config = RunConfig(streaming_mode=StreamingMode.SSE) if conf.ui_streaming else None
+
+        for event in registry.iter_events(
+            "MarriageApp", st.session_state.session_service,
+            user_id="user", session_id=st.session_state.session_id, new_message=msg_content,
+            run_config=run_config, on_progress=show_progress
         ):
-            if event.get_function_calls():
+            if event.get_function_calls() and not event.partial:
                 fn = event.get_function_calls()[0]
                 with st.status(f"⚙️ Calling Tool: {fn.name}...", expanded=False):
                     st.write(f"Arguments: {fn.args}")
-            
+
             if event.content and event.content.parts:
                 text = event.content.parts[0].text
-                if text:
+                if text and event.partial:
+                    streamed += text
+                    response_container.markdown(streamed + "▌")
+                elif text:
+                    streamed = ""
                     response_data[0] = text
                     response_container.markdown(response_data[0])
-        
+        progress.update(label="✅ Broker finished", state="complete")
+
     st.session_state.messages.append({"role": "assistant", "content": response_data[0]})
 
 
@@ -80,7 +101,7 @@ with col1:
             st.markdown(msg["content"])
 
     if prompt := st.chat_input("Ask the broker..."):
-        asyncio.run(run_agent(prompt))
+        run_agent(prompt)
 
 
 # --- 4. GUIDED WORKFLOW BUTTONS ---
@@ -90,33 +111,84 @@ colA, colB, colC = st.columns(3)
 
 with colA:
     if st.button("1. IDENTIFY & VET COUPLE", help="Finds random couple and runs parallel background checks."):
-        asyncio.run(run_agent("Find a random couple and run the full vetting pipeline."))
+        run_agent("Find a random couple and run the full vetting pipeline.")
 
 with colB:
     if st.button("2. START NEGOTIATION", help="Consults Groom/Bride reps to gather their initial demands."):
-        asyncio.run(run_agent("Phase 1 passed. Consult the Groom and Bride representatives for their demands."))
+        run_agent("Phase 1 passed. Consult the Groom and Bride representatives for their demands.")
 
 with colC:
     if st.button("3. PROPOSE & FINALIZE DEAL", type="primary", help="Proposes the optimal compromise and verifies utility score."):
-        asyncio.run(run_agent("Propose the optimal compromise and verify the final utility score to finalize the deal."))
+        run_agent("Propose the optimal compromise and verify the final utility score to finalize the deal.")
 
 
-with col2:
+# --- 5. OBSERVABILITY PANEL ---
+@st.cache_resource
+def shared_log_tail(db_name):
+    # One tail per process: every browser session reads the same ring
+    return get_log_tail(db_name)
+
+@st.cache_data(max_entries=4)
+def profile_preview(db_name, version):
+    # Keyed on the profile change feed, so it re-queries only after a profile write
+    with get_connection(db_name) as conn:
+        return pd.read_sql("SELECT id, name, location, risk_factor FROM profiles LIMIT 5", conn)
+
+@st.cache_data(ttl=conf.dashboard_refresh_seconds or None)
+def span_summaries(db_name):
+    with get_connection(db_name) as conn:
+        return agent_latency_percentiles(conn), tokens_per_turn(conn)
+
+@st.fragment(run_every=conf.dashboard_refresh_seconds or None)
+def observability_panel():
+    # Reruns on its own timer without touching the chat column
     st.subheader("📊 System Observability")
-    if st.button("🔄 Refresh Logs"): 
-        st.rerun()
-        
-    conn = sqlite3.connect(conf.db_name)
-    
+    if st.button("🔄 Refresh Logs"):
+        st.rerun(scope="fragment")
+
+    tail = shared_log_tail(conf.db_name)
     st.write("**🕵️ Detective Logs**")
     try:
-        logs = pd.read_sql("SELECT timestamp, details FROM agent_logs WHERE agent_name='Detective' ORDER BY id DESC LIMIT 5", conn)
-        st.dataframe(logs, hide_index=True)
+        tail.poll()
+        logs = tail.recent(agent_name="Detective", limit=5)
+        if logs:
+            st.dataframe(pd.DataFrame(logs, columns=LogTail.COLUMNS)[["timestamp", "details"]], hide_index=True)
+        else: st.write("No logs yet.")
     except: st.write("No logs yet.")
-    
+
     st.write("**💾 Database Profiles**")
     try:
-        profiles = pd.read_sql("SELECT id, name, location, risk_factor FROM profiles LIMIT 5", conn)
-        st.dataframe(profiles, hide_index=True)
+        with get_connection() as conn:
+            version = profiles_version(conn)
+        st.dataframe(profile_preview(conf.db_name, version), hide_index=True)
     except: st.write("No profiles found.")
-    conn.close()
+
+    st.write("**📈 Activity (last hour)**")
+    try:
+        with get_connection() as conn:
+            activity = activity_summary(conn, minutes=60)
+        if activity:
+            st.dataframe(pd.DataFrame(activity, columns=["agent", "action", "events", "errors", "avg_ms", "min_ms", "max_ms"]),
+                         hide_index=True)
+        else: st.write("No activity yet.")
+    except: st.write("No activity yet.")
+
+    try:
+        latency, tokens = span_summaries(conf.db_name)
+        st.write("**⏱️ Latency per Agent (p50/p95)**")
+        st.dataframe(latency, hide_index=True)
+        st.write("**🔢 Tokens per Turn**")
+        st.dataframe(tokens, hide_index=True)
+    except: st.write("No spans yet.")
+
+    st.write("**⚡ Vetting Fast Path**")
+    st.json(fast_path_stats.snapshot(), expanded=False)
+
+    st.write("**🗃️ Tool Result Cache**")
+    st.json(tool_cache_stats.snapshot(), expanded=False)
+
+    st.write("**🔀 Coalesced In-Flight Calls**")
+    st.json(single_flight_stats(), expanded=False)
+
+with col2:
+    observability_panel()
@@ -0,0 +1,64 @@
+"""Cold start: fresh interpreter -> `import marriage_council` -> first tool call -> first broker turn.
+
+Each run is a new process in an empty working directory, so the database is
+created and seeded on first use exactly as in a new container.
+Run from the repo root:  python -m benchmarks.bench_coldstart --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PHASES = ("import_package", "import_tools", "first_tool_call", "build_broker", "first_turn")
+
+# Runs in the child process; prints one JSON line of cumulative milliseconds per phase
+CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+marks = {}
+def mark(name):
+    marks[name] = (time.perf_counter() - start) * 1000
+import marriage_council; mark("import_package")
+from marriage_council import tools; mark("import_tools")
+tools.get_profile_details("G-1"); mark("first_tool_call")
+from marriage_council.registry import registry
+agent = registry.get_agent(); mark("build_broker")
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+service = InMemorySessionService()
+session = registry.run(service.create_session(app_name="cold", user_id="u"))
+for _ in registry.iter_events("cold", service, user_id="u", session_id=session.id, new_message=types.Content(
+        role="user", parts=[types.Part(text="Identify Groom G-1 and Bride B-1. Run vetting.")])):
+    pass
+mark("first_turn")
+print("COLDSTART " + json.dumps(marks))
+"""
+
+def one_run(repo: str) -> dict:
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(os.environ, PYTHONPATH=repo, MARRIAGE_COUNCIL_MODEL_BACKEND="offline")
+        out = subprocess.run([sys.executable, "-c", CHILD], cwd=workdir, env=env,
+                             capture_output=True, text=True, check=True).stdout
+    line = next(l for l in out.splitlines() if l.startswith("COLDSTART "))
+    return json.loads(line[len("COLDSTART "):])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold-start time in fresh processes.")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    repo = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    runs = [one_run(repo) for _ in range(args.runs)]
+    print(f"{'phase':<18}{'cumulative p50':>16}{'phase p50':>12}   (ms, {args.runs} fresh processes)")
+    previous = 0.0
+    for phase in PHASES:
+        p50 = statistics.median(r[phase] for r in runs)
+        print(f"{phase:<18}{p50:>16.0f}{p50 - previous:>12.0f}")
+        previous = p50
+    return runs
+
+if __name__ == "__main__":
+    main()
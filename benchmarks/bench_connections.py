@@ -0,0 +1,67 @@
+"""Tool calls per second: connect-per-call (legacy) vs the pooled connection layer.
+
+Run from the repo root:  python -m benchmarks.bench_connections
+"""
+import os
+import sqlite3
+import time
+import uuid
+from marriage_council.config import conf
+from marriage_council.database import setup_database, close_connections, flush_logs
+from marriage_council.log_store import append_logs
+from marriage_council import tools
+
+# --- Legacy implementations (one sqlite3.connect per call) ---
+def legacy_get_random_profile_id(gender):
+    conn = sqlite3.connect(conf.db_name)
+    rows = conn.execute("SELECT id FROM profiles WHERE gender = ?", (gender,)).fetchall()
+    conn.close()
+    return rows[0][0]
+
+def legacy_get_profile_details(profile_id):
+    conn = sqlite3.connect(conf.db_name)
+    row = conn.execute("SELECT * FROM profiles WHERE id = ?", (profile_id,)).fetchone()
+    conn.close()
+    return row
+
+def legacy_perform_background_check(profile_id):
+    conn = sqlite3.connect(conf.db_name)
+    row = conn.execute("SELECT name, risk_factor FROM profiles WHERE id = ?", (profile_id,)).fetchone()
+    conn.close()
+    conn = sqlite3.connect(conf.db_name)
+    append_logs(conn, [("bench", "Detective", "Background Check", row[0])])
+    conn.close()
+    return row
+
+CASES = [
+    ("get_random_profile_id", legacy_get_random_profile_id, tools.get_random_profile_id, "Male"),
+    ("get_profile_details", legacy_get_profile_details, tools.get_profile_details, "G-1"),
+    ("perform_background_check", legacy_perform_background_check, tools.perform_background_check, "G-1"),
+]
+
+def calls_per_second(fn, arg, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(arg)
+    return iterations / (time.perf_counter() - start)
+
+def main(iterations: int = 2000):
+    original_db = conf.db_name
+    conf.db_name = f"bench_db_{uuid.uuid4().hex}.sqlite"
+    try:
+        setup_database()
+        print(f"{'tool':<28}{'before (calls/s)':>18}{'after (calls/s)':>18}{'speedup':>10}")
+        for name, legacy, pooled, arg in CASES:
+            before = calls_per_second(legacy, arg, iterations)
+            after = calls_per_second(pooled, arg, iterations)
+            print(f"{name:<28}{before:>18,.0f}{after:>18,.0f}{after / before:>9.1f}x")
+    finally:
+        flush_logs()
+        close_connections(conf.db_name)
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(conf.db_name + suffix):
+                os.remove(conf.db_name + suffix)
+        conf.db_name = original_db
+
+if __name__ == "__main__":
+    main()
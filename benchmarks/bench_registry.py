@@ -0,0 +1,67 @@
+"""Per-turn latency: rebuilding the broker graph + Runner every turn vs the shared registry.
+
+Uses a canned in-process model so only construction, client setup and orchestration
+are timed. The canned model still builds its google-genai client (with a dummy key),
+which is the per-instance setup cost a real turn pays.
+Run from the repo root:  python -m benchmarks.bench_registry
+"""
+import asyncio
+import os
+import statistics
+import time
+from unittest.mock import patch
+from google.adk.models.google_llm import Gemini
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+from marriage_council import broker
+from marriage_council.registry import AgentRegistry
+
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-dummy-key")
+os.environ["GOOGLE_GENAI_USE_VERTEXAI"] = "false"
+
+class CannedGemini(Gemini):
+    async def generate_content_async(self, llm_request, stream=False):
+        self.api_client  # client construction, as on a real call
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="VERDICT: VETTING PASSED")]))
+
+def message(text):
+    return types.Content(role="user", parts=[types.Part(text=text)])
+
+async def turn(runner, session_id):
+    async for _ in runner.run_async(user_id="u", session_id=session_id, new_message=message("Vet G-1 and B-1.")):
+        pass
+
+def per_turn_ms(turns: int, shared: bool):
+    service = InMemorySessionService()
+    registry = AgentRegistry()
+    timings = []
+
+    async def session():
+        s = await service.create_session(app_name="bench", user_id="u")
+        return s.id
+    session_id = registry.run(session())
+
+    for _ in range(turns):
+        start = time.perf_counter()
+        if shared:
+            for _ in registry.iter_events("bench", service, user_id="u", session_id=session_id,
+                                          new_message=message("Vet G-1 and B-1.")):
+                pass
+        else:
+            runner = Runner(agent=broker.get_broker_agent(), app_name="bench", session_service=service)
+            registry.run(turn(runner, session_id))
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def main(turns: int = 50):
+    with patch.object(broker, "build_model", lambda name: CannedGemini(model=name)), \
+         patch("marriage_council.agents.build_model", lambda name: CannedGemini(model=name)), \
+         patch("marriage_council.sub_agents.vetting.build_model", lambda name: CannedGemini(model=name)):
+        for label, shared in (("rebuild per turn", False), ("shared registry", True)):
+            t = per_turn_ms(turns, shared)
+            print(f"{label:<18} p50 {statistics.median(t):7.2f} ms   mean {statistics.mean(t):7.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Time to first visible output in the console: whole events vs SSE streaming with agent progress.
+
+Uses the offline model backend with simulated network latency and per-word
+generation time, so the numbers reflect orchestration, not a live API.
+Run from the repo root:  python -m benchmarks.bench_streaming
+"""
+import statistics
+import time
+from unittest.mock import patch
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+from marriage_council.config import conf
+from marriage_council.registry import AgentRegistry
+
+PROMPTS = {
+    "negotiation": ("Couple details: Groom (Location: Delhi, Job: Banker), Bride (Location: Bangalore, Career: Doctor). "
+                    "Propose the optimal compromise: Live in Delhi, Bride keeps her Doctor career."),
+    "vetting": "Identify Groom G-1 and Bride B-1. Run vetting.",
+}
+
+def one_turn(registry, service, prompt, streaming: bool) -> dict:
+    session = registry.run(service.create_session(app_name="bench", user_id="u"))
+    marks = {}
+    start = time.perf_counter()
+
+    def on_progress(update):
+        marks.setdefault("first_progress", time.perf_counter() - start)
+
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE) if streaming else None
+    for event in registry.iter_events("bench", service, user_id="u", session_id=session.id,
+                                      new_message=types.Content(role="user", parts=[types.Part(text=prompt)]),
+                                      run_config=run_config, on_progress=on_progress if streaming else None):
+        if event.content and event.content.parts and event.content.parts[0].text:
+            marks.setdefault("first_text", time.perf_counter() - start)
+    marks["total"] = time.perf_counter() - start
+    return {k: v * 1000 for k, v in marks.items()}
+
+def main(turns: int = 10, latency_ms: float = 300, word_ms: float = 30):
+    with patch.object(conf, "model_backend", "offline"), patch.object(conf, "tracing_enabled", False), \
+         patch.object(conf, "offline_latency_ms", latency_ms), patch.object(conf, "offline_stream_chunk_ms", word_ms):
+        registry, service = AgentRegistry(), InMemorySessionService()
+        print(f"{'prompt':<13}{'mode':<12}{'first visible':>15}{'first text':>13}{'total':>10}   (p50 ms)")
+        for name, prompt in PROMPTS.items():
+            for streaming in (False, True):
+                runs = [one_turn(registry, service, prompt, streaming) for _ in range(turns)]
+                p50 = lambda key: statistics.median(r.get(key, r["total"]) for r in runs)
+                visible = min(p50("first_progress"), p50("first_text")) if streaming else p50("first_text")
+                print(f"{name:<13}{'streaming' if streaming else 'whole':<12}{visible:>15.0f}{p50('first_text'):>13.0f}{p50('total'):>10.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""Microbenchmarks for the tools, database and orchestration hot paths.
+
+Every benchmark runs once per database size. Results are written as JSON; pass
+a previous results file with --baseline to flag p50 regressions.
+Run from the repo root:
+
+    python -m benchmarks.bench_suite --sizes 20 10000 100000 --output bench.json
+    python -m benchmarks.bench_suite --baseline bench.json --output bench_new.json
+
+The broker turn uses the offline model backend, so no network or credentials are needed.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime
+import numpy as np
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+from marriage_council.config import conf
+from marriage_council.database import setup_database, close_connections, flush_logs, get_connection, log_event
+from marriage_council.seeding import seed_profiles
+from marriage_council.sampling import ProfileFilter
+from marriage_council.snapshot import ProfileSnapshot, get_snapshot, snapshot_path
+from marriage_council import tools
+
+# --- Fixtures ---
+def grow_profiles(size: int):
+    """Pads the seeded profiles table up to `size` rows (half grooms, half brides)."""
+    seed_profiles(size, seed=size)
+
+def remove_db(db_name: str):
+    flush_logs()
+    close_connections(db_name)
+    for suffix in ("", "-wal", "-shm", ".profiles.snap"):
+        if os.path.exists(db_name + suffix):
+            os.remove(db_name + suffix)
+
+# --- Measurement ---
+def summarize(name: str, size: int, samples_ns: list, ops_per_sample: int = 1) -> dict:
+    us = np.asarray(samples_ns, dtype=float) / 1000 / ops_per_sample
+    return {
+        "name": name, "size": size, "samples": len(us),
+        "mean_us": float(us.mean()), "p50_us": float(np.percentile(us, 50)),
+        "p95_us": float(np.percentile(us, 95)), "ops_per_s": float(1e6 / us.mean()) if us.mean() else 0.0,
+    }
+
+def time_calls(fn, args_list) -> list:
+    samples = []
+    for args in args_list:
+        start = time.perf_counter_ns()
+        fn(*args)
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+# --- Benchmarks ---
+def bench_setup_database(size: int, repeats: int) -> dict:
+    samples = []
+    for _ in range(repeats):
+        db_name = f"bench_db_{uuid.uuid4().hex}.sqlite"
+        original, conf.db_name = conf.db_name, db_name
+        try:
+            start = time.perf_counter_ns()
+            setup_database()
+            grow_profiles(size)
+            samples.append(time.perf_counter_ns() - start)
+        finally:
+            remove_db(db_name)
+            conf.db_name = original
+    return summarize("setup_database", size, samples)
+
+def bench_tools(size: int, iterations: int) -> list:
+    rng = random.Random(0)
+    ids = [(f"{rng.choice('GB')}-{rng.randint(1, max(1, size // 2))}",) for _ in range(iterations)]
+    genders = [(rng.choice(["groom", "bride"]),) for _ in range(iterations)]
+    locations = ["Bangalore", "Mumbai", "Delhi", "Chennai"]
+    proposals = [(rng.choice(locations), rng.choice(locations), rng.choice(locations), rng.choice(["Keep Job", "Quit Job"]))
+                 for _ in range(iterations)]
+    results = [
+        summarize("calculate_utility_score", size, time_calls(tools.calculate_utility_score, proposals)),
+        summarize("get_profile_details", size, time_calls(tools.get_profile_details, ids)),
+        summarize("perform_background_check", size, time_calls(tools.perform_background_check, ids)),
+        summarize("get_random_profile_id", size, time_calls(tools.get_random_profile_id, genders)),
+    ]
+    get_snapshot()  # the export is measured in bench_snapshot, not per call
+    results.append(summarize("recommend_matches", size, time_calls(tools.recommend_matches, ids)))
+    flush_logs()
+    return results
+
+def bench_log_event(size: int, iterations: int, batch: int = 100) -> dict:
+    samples = []
+    for _ in range(max(1, iterations // batch)):
+        start = time.perf_counter_ns()
+        for i in range(batch):
+            log_event("Benchmark", "Throughput", f"event {i}")
+        flush_logs()
+        samples.append(time.perf_counter_ns() - start)
+    return summarize("log_event", size, samples, ops_per_sample=batch)
+
+def bench_snapshot(size: int, iterations: int) -> list:
+    """Columnar snapshot: full export, mmap open, one-row refresh, and a filtered scan vs SQL."""
+    path = snapshot_path()
+    export, refresh = [], []
+    for _ in range(3):
+        start = time.perf_counter_ns()
+        with get_connection() as conn:
+            ProfileSnapshot.build(conn).save(path)
+        export.append(time.perf_counter_ns() - start)
+    opens = time_calls(ProfileSnapshot.open, [(path,)] * iterations)
+    for i in range(3):
+        get_snapshot()
+        with get_connection() as conn:
+            conn.execute("UPDATE profiles SET age = age WHERE id = ?", (f"G-{i + 1}",))
+            conn.commit()
+        start = time.perf_counter_ns()
+        get_snapshot()
+        refresh.append(time.perf_counter_ns() - start)
+
+    snapshot = get_snapshot()
+    profile_filter = ProfileFilter("Male", "Delhi", None, True)
+    def sql_count():
+        with get_connection() as conn:
+            return conn.execute("SELECT count(*) FROM profiles WHERE gender='Male' AND location='Delhi'"
+                                " AND risk_factor='Clean'").fetchone()[0]
+    return [
+        summarize("snapshot_export", size, export),
+        summarize("snapshot_open", size, opens),
+        summarize("snapshot_refresh", size, refresh),
+        summarize("snapshot_scan", size, time_calls(lambda: int(snapshot.mask(profile_filter).sum()), [()] * 20)),
+        summarize("sql_scan", size, time_calls(sql_count, [()] * 20)),
+    ]
+
+def bench_broker_turn(size: int, turns: int, fast_path: bool) -> dict:
+    from marriage_council.broker import get_broker_agent
+    original = (conf.model_backend, conf.vetting_fast_path)
+    conf.model_backend, conf.vetting_fast_path = "offline", fast_path
+    try:
+        service = InMemorySessionService()
+        runner = Runner(agent=get_broker_agent(), app_name="bench", session_service=service)
+        rng = random.Random(1)
+
+        async def run():
+            samples = []
+            for _ in range(turns):
+                session = await service.create_session(app_name="bench", user_id="u")
+                n = rng.randint(1, max(1, size // 2))
+                prompt = f"Identify Groom G-{n} and Bride B-{n}. Run vetting."
+                start = time.perf_counter_ns()
+                async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=types.Content(
+                        role="user", parts=[types.Part(text=prompt)])):
+                    pass
+                samples.append(time.perf_counter_ns() - start)
+            return samples
+        samples = asyncio.run(run())
+    finally:
+        conf.model_backend, conf.vetting_fast_path = original
+    flush_logs()
+    return summarize("broker_turn" if fast_path else "broker_turn_llm_pipeline", size, samples)
+
+def bench_burst(size: int, rounds: int, sessions: int = 8, model_ms: float = 20.0) -> list:
+    """Identical LLM-pipeline turns started together, with and without single-flight coalescing.
+
+    The two variants take turns round by round, each going first every other
+    round, so warm-up and drift do not favour either one.
+    """
+    from marriage_council.broker import get_broker_agent
+    from marriage_council.single_flight import model_flights
+    original = (conf.model_backend, conf.vetting_fast_path, conf.offline_latency_ms, conf.single_flight_enabled)
+    conf.model_backend, conf.vetting_fast_path, conf.offline_latency_ms = "offline", False, model_ms
+    conf.single_flight_enabled = True  # builds the CoalescingGemini layer; each round then switches it on or off
+    try:
+        service = InMemorySessionService()
+        runner = Runner(agent=get_broker_agent(), app_name="bench", session_service=service)
+
+        async def turn(prompt):
+            session = await service.create_session(app_name="bench", user_id="u")
+            async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=types.Content(
+                    role="user", parts=[types.Part(text=prompt)])):
+                pass
+
+        async def run():
+            samples = {True: [], False: []}
+            for i in range(rounds):
+                prompt = f"Identify Groom G-{i % size + 1} and Bride B-{i % size + 1}. Run vetting."
+                for coalesce in ((True, False) if i % 2 == 0 else (False, True)):
+                    conf.single_flight_enabled = coalesce  # read per call by CoalescingGemini
+                    start = time.perf_counter_ns()
+                    await asyncio.gather(*[turn(prompt) for _ in range(sessions)])
+                    samples[coalesce].append(time.perf_counter_ns() - start)
+            return samples
+        model_flights.stats.reset()
+        samples = asyncio.run(run())
+    finally:
+        conf.model_backend, conf.vetting_fast_path, conf.offline_latency_ms, conf.single_flight_enabled = original
+    flush_logs()
+    coalesced = summarize("broker_burst_coalesced", size, samples[True])
+    coalesced["model_calls_collapsed"] = model_flights.stats.collapsed  # the uncoalesced rounds bypass the flights
+    uncoalesced = summarize("broker_burst_uncoalesced", size, samples[False])
+    uncoalesced["model_calls_collapsed"] = 0
+    return [coalesced, uncoalesced]
+
+def run_size(size: int, iterations: int, turns: int) -> list:
+    results = [bench_setup_database(size, repeats=3)]
+    db_name = f"bench_db_{uuid.uuid4().hex}.sqlite"
+    original, conf.db_name = conf.db_name, db_name
+    try:
+        setup_database()
+        grow_profiles(size)
+        results += bench_tools(size, iterations)
+        results.append(bench_log_event(size, iterations))
+        results += bench_snapshot(size, iterations)
+        results.append(bench_broker_turn(size, turns, fast_path=True))
+        results.append(bench_broker_turn(size, turns, fast_path=False))
+        results += bench_burst(size, max(1, turns // 4))
+    finally:
+        remove_db(db_name)
+        conf.db_name = original
+    return results
+
+# --- Reporting ---
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+def compare(results: list, baseline: list, threshold: float) -> list:
+    """(name, size, baseline_p50, p50, ratio) for every benchmark slower than `threshold` x baseline."""
+    previous = {(r["name"], r["size"]): r for r in baseline}
+    regressions = []
+    print(f"\n{'benchmark':<28}{'size':>9}{'baseline p50':>15}{'p50':>12}{'ratio':>8}")
+    for r in results:
+        old = previous.get((r["name"], r["size"]))
+        if old is None or not old["p50_us"]:
+            continue
+        ratio = r["p50_us"] / old["p50_us"]
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{r['name']:<28}{r['size']:>9}{old['p50_us']:>13.1f}us{r['p50_us']:>10.1f}us{ratio:>7.2f}x{flag}")
+        if flag:
+            regressions.append((r["name"], r["size"], old["p50_us"], r["p50_us"], ratio))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark tools, database and orchestration hot paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 10_000, 100_000], help="Profile counts.")
+    parser.add_argument("--iterations", type=int, default=500, help="Calls per tool benchmark.")
+    parser.add_argument("--turns", type=int, default=20, help="Broker turns per size.")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="Earlier results file to compare against.")
+    parser.add_argument("--threshold", type=float, default=1.2, help="p50 ratio that counts as a regression.")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        print(f"⏱️  size={size:,}")
+        for r in run_size(size, args.iterations, args.turns):
+            print(f"   {r['name']:<28} p50 {r['p50_us']:>10.1f} us   p95 {r['p95_us']:>10.1f} us   {r['ops_per_s']:>12,.0f} ops/s")
+            results.append(r)
+
+    report = {
+        "meta": {"timestamp": datetime.now().isoformat(), "commit": git_commit(),
+                 "python": platform.python_version(), "platform": platform.platform(),
+                 "iterations": args.iterations, "turns": args.turns},
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) above {args.threshold:.2f}x")
+            return 1
+        print("\n✅ No regressions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
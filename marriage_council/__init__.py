@@ -1,2 +1,9 @@
-from .agent import root_agent
 __all__ = ["root_agent"]
+
+def __getattr__(name):
+    # Importing the package stays cheap: the broker graph (and ADK, auth and the
+    # database behind it) is only built when root_agent is first accessed.
+    if name == "root_agent":
+        from .agent import root_agent
+        return root_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
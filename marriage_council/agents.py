@@ -1,7 +1,7 @@
 from google.adk.agents import LlmAgent, ParallelAgent
-from google.adk.models.google_llm import Gemini
 from google.adk.tools import FunctionTool
 from .config import conf
+from .models import build_model
 from .tools import *
 from pydantic import BaseModel, Field
 
@@ -11,11 +11,21 @@ class VettingVerdict(BaseModel):
     status: str = Field(..., description="Must be 'PASS' or 'FAIL'.")
     summary: str = Field(..., description="A brief reason for the PASS/FAIL verdict.")
 
+class NegotiationDemands(BaseModel):
+    """Both sides' opening positions, merged for the Broker (Phase 2)."""
+    groom_id: str = ""
+    bride_id: str = ""
+    groom_location: str = ""
+    bride_location: str = ""
+    bride_career: str = ""
+    groom_demands: str = Field("", description="The groom representative's stated demands.")
+    bride_demands: str = Field("", description="The bride representative's stated demands.")
+
 # --- Context Parser Agent ---
 def get_parser_agent():
     return LlmAgent(
         name="parser_agent",
-        model=Gemini(model=conf.model_fast),
+        model=build_model(conf.model_fast),
         instruction="""You are the Data Extractor. 
         Check the history for profile IDs (G-X, B-X). 
         Output ONLY the IDs found, or "None".""",
@@ -26,7 +36,7 @@ def get_parser_agent():
 def get_vetting_council():
     detective = LlmAgent(
         name="detective_agent",
-        model=Gemini(model=conf.model_fast),
+        model=build_model(conf.model_fast),
         tools=[FunctionTool(perform_background_check)],
         # MODIFIED INSTRUCTION BELOW:
         instruction="""Receive IDs. Check background using tool `perform_background_check`. 
@@ -35,7 +45,7 @@ def get_vetting_council():
     )
     astrologer = LlmAgent(
         name="astrologer_agent",
-        model=Gemini(model=conf.model_fast),
+        model=build_model(conf.model_fast),
         tools=[FunctionTool(check_horoscope_compatibility)],
         instruction="Extract signs. Check compatibility using tool `check_horoscope_compatibility`. If score < 18, warn broker."
     )
@@ -52,7 +62,7 @@ def get_vetting_council():
 def get_synthesizer_agent():
     return LlmAgent(
         name="synthesizer_agent",
-        model=Gemini(model=conf.model_smart),
+        model=build_model(conf.model_smart),
         instruction="""You are the Synthesis Agent. Analyze the output from the Detective and Astrologer. 
         Your task is to provide a single, clean JSON verdict strictly matching the VettingVerdict schema.
         
@@ -63,25 +73,33 @@ def get_synthesizer_agent():
         output_schema=VettingVerdict,
         output_key="verdict"
     )
+# Reps read the profile prefetched by the negotiation stage (state `groom_profile` /
+# `bride_profile`) and only fall back to the tool when it is missing.
 def get_groom_rep():
     return LlmAgent(
         name="groom_rep",
-        model=Gemini(model=conf.model_fast),
+        model=build_model(conf.model_fast),
         tools=[FunctionTool(get_profile_details)],
-        instruction="Represent Groom. Prefer his location. Be stubborn but polite. Use tool `get_profile_details`."
+        instruction="""Represent Groom. Prefer his location. Be stubborn but polite.
+        Groom profile: {groom_profile?}
+        If the profile above is empty, use tool `get_profile_details`.""",
+        output_key="groom_demands"
     )
 
 def get_bride_rep():
     return LlmAgent(
         name="bride_rep",
-        model=Gemini(model=conf.model_fast),
+        model=build_model(conf.model_fast),
         tools=[FunctionTool(get_profile_details)],
-        instruction="Represent Bride. Career is non-negotiable. Prefer her location. Use tool `get_profile_details`."
+        instruction="""Represent Bride. Career is non-negotiable. Prefer her location.
+        Bride profile: {bride_profile?}
+        If the profile above is empty, use tool `get_profile_details`.""",
+        output_key="bride_demands"
     )
 
 def get_judge_agent():
     return LlmAgent(
         name="judge_agent",
-        model=Gemini(model=conf.model_smart),
+        model=build_model(conf.model_smart),
         instruction="Evaluate the final deal string. Rate 1-5 on Fairness."
     )
@@ -0,0 +1,203 @@
+"""Headless HTTP API for the broker (ASGI).
+
+    uvicorn marriage_council.api:app --port 8080
+    MARRIAGE_COUNCIL_MODEL_BACKEND=offline uvicorn marriage_council.api:app   # no credentials needed
+
+All sessions share one Runner and the SQLite session service on the server's
+event loop; turns within one session are serialized, turns across sessions
+run concurrently.
+"""
+import asyncio
+import json
+import time
+import weakref
+from typing import Optional
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.runners import Runner
+from google.genai import types
+from pydantic import BaseModel
+from .config import conf
+from .database import setup_database
+from .progress import progress_listener, turn_started
+from .sessions import SqliteSessionService
+
+APP_NAME = "MarriageAPI"
+_DONE = object()
+
+# --- Request / Response Models ---
+class SessionRef(BaseModel):
+    user_id: str = "api"
+    session_id: Optional[str] = None  # omitted: a new session is created
+
+class VetRequest(SessionRef):
+    groom_id: str
+    bride_id: str
+
+class NegotiateRequest(SessionRef):
+    groom_location: str
+    bride_location: str
+    bride_career: str
+    proposal_location: str
+    bride_keeps_career: bool = True
+
+class ChatRequest(SessionRef):
+    message: str
+
+class TurnResponse(BaseModel):
+    session_id: str
+    reply: str
+    tool_calls: list[str] = []
+    verdict: Optional[dict] = None
+
+# --- Broker Service ---
+class BrokerService:
+    """One shared Runner; a lock per session keeps each conversation ordered."""
+
+    def __init__(self, agent=None, session_service=None, plugins=None):
+        self._agent = agent
+        self._plugins = plugins
+        self.session_service = session_service or SqliteSessionService()
+        self._runner = None
+        self._session_locks = weakref.WeakValueDictionary()
+
+    @property
+    def runner(self) -> Runner:
+        if self._runner is None:
+            from .registry import registry
+            from .tracing import default_plugins
+            setup_database()
+            self._runner = Runner(agent=self._agent or registry.get_agent(), app_name=APP_NAME,
+                                  session_service=self.session_service,
+                                  plugins=default_plugins() if self._plugins is None else self._plugins)
+        return self._runner
+
+    async def session_id(self, ref: SessionRef) -> str:
+        runner = self.runner
+        if ref.session_id is None:
+            session = await self.session_service.create_session(app_name=runner.app_name, user_id=ref.user_id)
+            return session.id
+        session = await self.session_service.get_session(app_name=runner.app_name, user_id=ref.user_id,
+                                                         session_id=ref.session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail=f"Unknown session {ref.session_id}")
+        return session.id
+
+    def _lock(self, user_id: str, session_id: str) -> asyncio.Lock:
+        key = f"{user_id}/{session_id}"
+        lock = self._session_locks.get(key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._session_locks[key] = lock
+        return lock
+
+    async def events(self, user_id: str, session_id: str, message: str, streaming: bool = False):
+        """Runs one broker turn, yielding ADK events."""
+        run_config = RunConfig(streaming_mode=StreamingMode.SSE) if streaming else None
+        async with self._lock(user_id, session_id):
+            async for event in self.runner.run_async(
+                user_id=user_id, session_id=session_id, run_config=run_config,
+                new_message=types.Content(role="user", parts=[types.Part(text=message)])
+            ):
+                yield event
+
+    async def turn(self, ref: SessionRef, message: str) -> TurnResponse:
+        session_id = await self.session_id(ref)
+        response = TurnResponse(session_id=session_id, reply="")
+        async for event in self.events(ref.user_id, session_id, message):
+            response.tool_calls += [call.name for call in event.get_function_calls()]
+            for result in event.get_function_responses():
+                verdict = _parse_verdict(result)
+                if verdict is not None:
+                    response.verdict = verdict
+                    response.reply = response.reply or json.dumps(verdict)
+            if event.content and event.content.parts and event.content.parts[0].text and not event.partial:
+                response.reply = event.content.parts[0].text
+        return response
+
+def _parse_verdict(function_response) -> Optional[dict]:
+    if function_response.name != "VettingPipeline":
+        return None
+    try:
+        verdict = json.loads((function_response.response or {}).get("result", ""))
+    except (TypeError, ValueError):
+        return None
+    return verdict if isinstance(verdict, dict) and "status" in verdict else None
+
+def _sse(kind: str, data: dict) -> str:
+    return f"event: {kind}\ndata: {json.dumps(data)}\n\n"
+
+# --- App ---
+def create_app(service: BrokerService = None) -> FastAPI:
+    service = service or BrokerService()
+    api = FastAPI(title="Marriage Council Broker API")
+    api.state.broker = service
+
+    @api.get("/health")
+    async def health():
+        return {"status": "ok", "model_backend": conf.model_backend}
+
+    @api.post("/sessions")
+    async def create_session(ref: SessionRef):
+        return {"session_id": await service.session_id(SessionRef(user_id=ref.user_id))}
+
+    @api.post("/vet", response_model=TurnResponse)
+    async def vet(request: VetRequest):
+        return await service.turn(request, f"Identify Groom {request.groom_id} and Bride {request.bride_id}. Run vetting.")
+
+    @api.post("/negotiate", response_model=TurnResponse)
+    async def negotiate(request: NegotiateRequest):
+        career = (f"Bride keeps her {request.bride_career} career" if request.bride_keeps_career
+                  else f"Bride quits her {request.bride_career} career")
+        prompt = (f"Couple details: Groom (Location: {request.groom_location}), "
+                  f"Bride (Location: {request.bride_location}, Career: {request.bride_career}). "
+                  f"Propose the compromise: Live in {request.proposal_location}, {career}. "
+                  "Verify the final utility score to finalize the deal.")
+        return await service.turn(request, prompt)
+
+    @api.post("/chat", response_model=TurnResponse)
+    async def chat(request: ChatRequest):
+        return await service.turn(request, request.message)
+
+    @api.post("/chat/stream")
+    async def chat_stream(request: ChatRequest):
+        """Server-sent events: session, progress, tool_call, partial, final, done."""
+        session_id = await service.session_id(request)
+        updates = asyncio.Queue()
+
+        async def produce():
+            progress_listener.set(lambda update: updates.put_nowait(("progress", update.__dict__)))
+            turn_started.set(time.perf_counter())
+            try:
+                async for event in service.events(request.user_id, session_id, request.message, streaming=True):
+                    for call in event.get_function_calls():
+                        updates.put_nowait(("tool_call", {"name": call.name, "args": call.args}))
+                    if event.content and event.content.parts and event.content.parts[0].text:
+                        kind = "partial" if event.partial else "final"
+                        updates.put_nowait((kind, {"author": event.author, "text": event.content.parts[0].text}))
+                    for result in event.get_function_responses():
+                        verdict = _parse_verdict(result)
+                        if verdict is not None:
+                            updates.put_nowait(("final", {"author": result.name, "text": json.dumps(verdict),
+                                                          "verdict": verdict}))
+            except Exception as e:
+                updates.put_nowait(("error", {"message": f"{type(e).__name__}: {e}"}))
+            finally:
+                updates.put_nowait(_DONE)
+
+        async def stream():
+            yield _sse("session", {"session_id": session_id})
+            task = asyncio.create_task(produce())
+            try:
+                while (item := await updates.get()) is not _DONE:
+                    yield _sse(*item)
+                yield _sse("done", {})
+            finally:
+                task.cancel()
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    return api
+
+app = create_app()
@@ -0,0 +1,243 @@
+"""Overnight cohort vetting: runs the VettingPipeline over many couples concurrently.
+
+    python -m marriage_council.batch --run-id nightly --all --concurrency 16 --rate 5
+    python -m marriage_council.batch --run-id adhoc --pairs G-1:B-1 G-8:B-2
+
+Progress is checkpointed into `vetting_results`, so re-running the same
+--run-id resumes where an interrupted run stopped.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+import numpy as np
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+from .broker import get_vetting_pipeline
+from .database import get_connection, setup_database
+from .tracing import default_plugins
+
+# --- Rate Limiting ---
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+class RateLimitPlugin(BasePlugin):
+    """Makes every model call (including AgentTool sub-runs) wait for a token."""
+
+    def __init__(self, bucket: TokenBucket):
+        super().__init__(name="rate_limit")
+        self.bucket = bucket
+
+    async def before_model_callback(self, *, callback_context, llm_request):
+        await self.bucket.acquire()
+        return None
+
+# --- Couple Sources ---
+CHUNK_SIZE = 256  # pairs taken from the source, and checked against vetting_results, per thread hop
+
+def _page_sql(clean_only: bool) -> str:
+    # One side at a time, in id order: an index seek per page instead of sorting grooms x brides
+    risk = " AND risk_factor = 'Clean'" if clean_only else ""
+    return f"SELECT id FROM profiles WHERE gender = ?{risk} AND id > ? ORDER BY id LIMIT ?"
+
+def pairs_from_profiles(clean_only: bool = False, limit: int = None, page_size: int = 10_000):
+    """Lazily yields every (groom_id, bride_id) pairing in `profiles`.
+
+    Grooms are paged in id order and, for each groom, the brides after the
+    last one yielded; (last_groom, last_bride) is the keyset cursor, so no
+    connection or read snapshot is held open for the whole (possibly
+    hours-long) run.
+    """
+    sql = _page_sql(clean_only)
+
+    def page(gender: str, after: str, size: int) -> list:
+        with get_connection() as conn:
+            return [row[0] for row in conn.execute(sql, (gender, after, size))]
+
+    last_groom, remaining = "", limit
+    while True:
+        grooms = page("Male", last_groom, page_size)
+        for groom in grooms:
+            last_bride = ""
+            while True:
+                size = page_size if remaining is None else min(page_size, remaining)
+                if size <= 0:
+                    return
+                brides = page("Female", last_bride, size)
+                for bride in brides:
+                    yield groom, bride
+                if remaining is not None:
+                    remaining -= len(brides)
+                if len(brides) < size:
+                    break
+                last_bride = brides[-1]
+        if len(grooms) < page_size:
+            return
+        last_groom = grooms[-1]
+
+def completed_pairs(run_id: str, pairs: list) -> set:
+    """Those of `pairs` that `run_id` already finished, looked up by primary key."""
+    if not pairs:
+        return set()
+    values = ",".join(["(?,?)"] * len(pairs))
+    with get_connection() as conn:
+        rows = conn.execute(
+            f"WITH page(groom_id, bride_id) AS (VALUES {values})"
+            " SELECT r.groom_id, r.bride_id FROM page JOIN vetting_results r"
+            " ON r.run_id = ? AND r.groom_id = page.groom_id AND r.bride_id = page.bride_id"
+            " WHERE r.status IN ('PASS', 'FAIL')",
+            (*(v for pair in pairs for v in pair), run_id)).fetchall()
+    return set(rows)
+
+def _next_chunk(pairs, run_id: str, size: int) -> tuple:
+    chunk = [tuple(pair) for pair in islice(pairs, size)]
+    return chunk, completed_pairs(run_id, chunk)
+
+def save_result(run_id: str, groom_id: str, bride_id: str, status: str, summary: str, latency_ms: float):
+    with get_connection() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO vetting_results VALUES (?,?,?,?,?,?,?)",
+            (run_id, groom_id, bride_id, status, summary, latency_ms, datetime.now().isoformat()))
+        conn.commit()
+
+# --- Report ---
+@dataclass
+class BatchReport:
+    run_id: str
+    vetted: int = 0
+    errors: int = 0
+    skipped: int = 0
+    elapsed_s: float = 0.0
+    verdicts: dict = field(default_factory=dict)
+    stage_ms: dict = field(default_factory=dict)  # stage (agent name) -> [latency_ms, ...]
+
+    @property
+    def couples_per_second(self) -> float:
+        return self.vetted / self.elapsed_s if self.elapsed_s else 0.0
+
+    def stage_percentiles(self) -> dict:
+        return {
+            stage: {"count": len(v), "p50_ms": float(np.percentile(v, 50)), "p95_ms": float(np.percentile(v, 95))}
+            for stage, v in sorted(self.stage_ms.items())
+        }
+
+    def format(self) -> str:
+        lines = [
+            f"Run {self.run_id}: {self.vetted} vetted, {self.errors} errors, {self.skipped} resumed/skipped "
+            f"in {self.elapsed_s:.1f}s ({self.couples_per_second:.2f} couples/s)",
+            f"Verdicts: {self.verdicts}",
+        ]
+        for stage, p in self.stage_percentiles().items():
+            lines.append(f"  {stage:<22} n={p['count']:<6} p50={p['p50_ms']:8.1f} ms  p95={p['p95_ms']:8.1f} ms")
+        return "\n".join(lines)
+
+# --- Engine ---
+async def _vet_one(runner: Runner, run_id: str, groom_id: str, bride_id: str, report: BatchReport):
+    service = runner.session_service
+    session = await service.create_session(app_name=runner.app_name, user_id="batch")
+    prompt = f"Identify Groom {groom_id} and Bride {bride_id}. Run full vetting pipeline."
+    start = last = time.perf_counter()
+    try:
+        async for event in runner.run_async(
+            user_id="batch", session_id=session.id,
+            new_message=types.Content(role="user", parts=[types.Part(text=prompt)])
+        ):
+            now = time.perf_counter()
+            report.stage_ms.setdefault(event.author, []).append((now - last) * 1000)
+            last = now
+        session = await service.get_session(app_name=runner.app_name, user_id="batch", session_id=session.id)
+        verdict = session.state.get("verdict") or {}
+        status, summary = verdict.get("status", "ERROR"), verdict.get("summary", "No verdict produced.")
+    except Exception as e:
+        status, summary = "ERROR", f"{type(e).__name__}: {e}"
+    finally:
+        await service.delete_session(app_name=runner.app_name, user_id="batch", session_id=session.id)
+
+    latency_ms = (time.perf_counter() - start) * 1000
+    report.stage_ms.setdefault("total", []).append(latency_ms)
+    save_result(run_id, groom_id, bride_id, status, summary, latency_ms)
+    report.verdicts[status] = report.verdicts.get(status, 0) + 1
+    if status in ("PASS", "FAIL"):
+        report.vetted += 1
+    else:
+        report.errors += 1
+
+async def vet_couples(pairs, run_id: str = None, concurrency: int = 8, rate: float = None,
+                      burst: float = None, agent=None) -> BatchReport:
+    """Vets (groom_id, bride_id) pairs concurrently, resuming any earlier progress of `run_id`."""
+    setup_database()
+    run_id = run_id or uuid.uuid4().hex[:12]
+    plugins = default_plugins() + ([RateLimitPlugin(TokenBucket(rate, burst))] if rate else [])
+    runner = Runner(agent=agent or get_vetting_pipeline(), app_name="BatchVetting",
+                    session_service=InMemorySessionService(), plugins=plugins)
+    report = BatchReport(run_id=run_id)
+    pairs = iter(pairs)
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = set()
+
+    start = time.perf_counter()
+    while True:
+        # Reading profiles and checkpoints (one chunk at a time) stays off the loop
+        chunk, done = await asyncio.to_thread(_next_chunk, pairs, run_id, CHUNK_SIZE)
+        if not chunk:
+            break
+        for groom_id, bride_id in chunk:
+            if (groom_id, bride_id) in done:
+                report.skipped += 1
+                continue
+            await semaphore.acquire()  # bounds in-flight couples without materializing the cohort
+            task = asyncio.create_task(_vet_one(runner, run_id, groom_id, bride_id, report))
+            tasks.add(task)
+            task.add_done_callback(lambda t: (tasks.discard(t), semaphore.release()))
+    if tasks:
+        await asyncio.gather(*tasks)
+    report.elapsed_s = time.perf_counter() - start
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-vet couples from the profiles table.")
+    parser.add_argument("--run-id", help="Checkpoint key; reuse it to resume an interrupted run.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--pairs", nargs="+", metavar="G-X:B-Y", help="Explicit couples to vet.")
+    source.add_argument("--all", action="store_true", help="Every groom x bride pairing in profiles.")
+    parser.add_argument("--clean-only", action="store_true", help="With --all: skip profiles with a known risk.")
+    parser.add_argument("--limit", type=int, help="With --all: vet at most this many pairings.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, help="Max model calls per second.")
+    parser.add_argument("--burst", type=float, help="Token bucket capacity (defaults to --rate).")
+    args = parser.parse_args(argv)
+
+    setup_database()
+    if args.pairs:
+        pairs = [tuple(p.split(":", 1)) for p in args.pairs]
+    else:
+        pairs = pairs_from_profiles(args.clean_only, args.limit)
+    report = asyncio.run(vet_couples(pairs, args.run_id, args.concurrency, args.rate, args.burst))
+    print(report.format())
+    return report
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,59 @@
 from google.adk.agents import Agent, SequentialAgent
-from google.adk.models.google_llm import Gemini
 from google.adk.tools import AgentTool, FunctionTool
 from .config import conf
-from .agents import get_groom_rep, get_bride_rep, get_synthesizer_agent, get_parser_agent
-from .tools import calculate_utility_score, get_random_profile_id, get_profile_details
-from .sub_agents.vetting import get_vetting_workflow
+from .models import build_model
+from .agents import get_synthesizer_agent, get_parser_agent
+from .tools import calculate_utility_score, find_optimal_compromise, get_random_profile_id, find_candidate_profiles, get_profile_details, recommend_matches
+from .sub_agents.vetting import get_vetting_workflow, FastVettingAgent
+from .sub_agents.negotiation import get_negotiation_stage
 
-def get_broker_agent():
-    # Instantiate fresh agents
+def get_vetting_pipeline():
+    """Phase 1 graph: deterministic fast path in front of parser -> council -> synthesizer."""
     synthesizer_agent = get_synthesizer_agent() 
     parser_agent = get_parser_agent()
-    groom_rep = get_groom_rep()
-    bride_rep = get_bride_rep()
     vetting_workflow = get_vetting_workflow() 
 
     vetting_pipeline = SequentialAgent(
-        name="VettingPipeline",
+        name="LlmVettingPipeline" if conf.vetting_fast_path else "VettingPipeline",
         sub_agents=[
             parser_agent,         # Step 1: Extract IDs
             vetting_workflow,     # Step 2: Parallel Checks
             synthesizer_agent     # Step 3: Final Verdict (JSON)
         ]
     )
+    if conf.vetting_fast_path:
+        # Step 0: Deterministic verdict for unambiguous ids; LLM pipeline otherwise
+        vetting_pipeline = FastVettingAgent(
+            name="VettingPipeline",
+            description="Vets a couple directly from the database, falling back to the LLM pipeline.",
+            sub_agents=[vetting_pipeline]
+        )
+    return vetting_pipeline
+
+def get_broker_agent():
+    # Instantiate fresh agents
+    vetting_pipeline = get_vetting_pipeline()
+    negotiation_stage = get_negotiation_stage()
 
     return Agent(
         name="marriage_broker_agent",
-        model=Gemini(model=conf.model_smart),
+        model=build_model(conf.model_smart),
         tools=[
             AgentTool(vetting_pipeline, "Phase 1: Run ID parsing, background checks, and synthesize the final verdict."),
-            AgentTool(groom_rep, "Phase 2: Get Groom's demands."),
-            AgentTool(bride_rep, "Phase 2: Get Bride's demands."),
+            AgentTool(negotiation_stage),
             FunctionTool(calculate_utility_score),
+            FunctionTool(find_optimal_compromise),
             FunctionTool(get_random_profile_id),
+            FunctionTool(find_candidate_profiles),
+            FunctionTool(recommend_matches),
             FunctionTool(get_profile_details)
         ],
         instruction="""You are the Chief Marriage Broker. Your job is to enforce strict rules.
 
+        **MATCHMAKING**
+        If the user names only one profile and asks for a match, call `recommend_matches` with that ID
+        and offer the top candidate. Vet the chosen couple before negotiating.
+
         **PHASE 1: VETTING (CRITICAL SECURITY GATE)**
         1. Call `VettingPipeline` to check the profiles.
         2. **STRICT RULE:** If the Vetting Pipeline returns a verdict containing "FAIL" or "REJECTED":
@@ -46,8 +64,8 @@ def get_broker_agent():
 
         **PHASE 2: NEGOTIATION**
         1. Only proceed here if Vetting was "PASS".
-        2. Consult Reps.
-        3. Propose compromise.
+        2. Consult Reps: call `NegotiationStage` once, naming both profile IDs. It returns both sides' demands merged as JSON.
+        3. Propose compromise. Call `find_optimal_compromise` once with both locations and the career options to get the best proposal.
         4. Verify with `calculate_utility_score`.
         5. If Score > 60, declare MATCH SUCCESSFUL.
         6. If Score <= 60, declare NEGOTIATION FAILED.
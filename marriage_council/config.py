@@ -1,39 +1,86 @@
 import os
 import logging
-from dataclasses import dataclass
-import google.auth
+import threading
+from dataclasses import dataclass, field
 
 # Logging Setup
 logging.getLogger("google_genai").setLevel(logging.ERROR)
 logging.getLogger("google.adk").setLevel(logging.ERROR)
 
 # --- AUTH SETUP: ROBUST DETECTION ---
-# 1. Try getting from Environment Variable first (Most reliable in Cloud Shell)
-project_id = os.environ.get("GOOGLE_CLOUD_PROJECT")
-
-# 2. If not in env, try Google Auth Default
-if not project_id:
-    try:
-        _, project_id = google.auth.default()
-    except google.auth.exceptions.DefaultCredentialsError:
-        print("⚠️ Auth Warning: Default credentials not found.")
-        print("   Please run 'gcloud auth application-default login' for local development.")
-
-# 3. Configure Environment
-if project_id:
-    os.environ["GOOGLE_CLOUD_PROJECT"] = project_id
-    os.environ["GOOGLE_CLOUD_LOCATION"] = "us-central1"
-    os.environ["GOOGLE_GENAI_USE_VERTEXAI"] = "true"
-    print(f"✅ Auth: Using Vertex AI (Project: {project_id})")
-else:
-    print("⚠️ Auth Warning: Could not determine Project ID.")
-    print("   Please run: export GOOGLE_CLOUD_PROJECT=your-project-id")
+# Deferred until the first live model is built (models.build_model): google.auth.default()
+# can spend seconds probing for credentials, which every import would otherwise pay.
+project_id = None
+_auth_done = False
+_auth_lock = threading.Lock()
+
+def ensure_auth():
+    """Detects the Vertex AI project once per process and configures the environment."""
+    global project_id, _auth_done
+    if _auth_done:
+        return project_id
+    with _auth_lock:
+        if _auth_done:
+            return project_id
+        import google.auth
+
+        # 1. Try getting from Environment Variable first (Most reliable in Cloud Shell)
+        project_id = os.environ.get("GOOGLE_CLOUD_PROJECT")
+
+        # 2. If not in env, try Google Auth Default
+        if not project_id:
+            try:
+                _, project_id = google.auth.default()
+            except google.auth.exceptions.DefaultCredentialsError:
+                print("⚠️ Auth Warning: Default credentials not found.")
+                print("   Please run 'gcloud auth application-default login' for local development.")
+
+        # 3. Configure Environment
+        if project_id:
+            os.environ["GOOGLE_CLOUD_PROJECT"] = project_id
+            os.environ["GOOGLE_CLOUD_LOCATION"] = "us-central1"
+            os.environ["GOOGLE_GENAI_USE_VERTEXAI"] = "true"
+            print(f"✅ Auth: Using Vertex AI (Project: {project_id})")
+        else:
+            print("⚠️ Auth Warning: Could not determine Project ID.")
+            print("   Please run: export GOOGLE_CLOUD_PROJECT=your-project-id")
+        _auth_done = True
+    return project_id
 
 @dataclass
 class AgentConfig:
     db_name: str = "matrimony_council.sqlite"
+    seed_size: int = 20  # Synthetic profiles generated for an empty database (see seeding.py)
+    seed_random_state: int = 7
     model_fast: str = "gemini-2.5-flash"
     model_smart: str = "gemini-2.5-pro"
+    vetting_fast_path: bool = True  # Answer unambiguous couples without LLM calls
+    horoscope_table_path: str = ""  # Optional JSON score table; built in-process if empty
+    # LLM response cache (see llm_cache.py)
+    llm_cache_enabled: bool = False
+    llm_cache_path: str = "llm_cache.sqlite"
+    llm_cache_ttl_seconds: int = 24 * 3600
+    llm_cache_max_memory_entries: int = 512
+    llm_cache_max_disk_entries: int = 50_000
+    tool_cache_enabled: bool = True  # Per-session memo of profile reads by the tools (see tool_cache.py)
+    tool_cache_max_entries: int = 256
+    single_flight_enabled: bool = False  # Share identical in-flight model calls (see single_flight.py)
+    # agent_logs retention in days, today included; 0 keeps everything (see log_store.py)
+    log_retention_days: int = 30
+    log_rollup_retention_days: int = 90
+    tracing_enabled: bool = True  # Per-agent/model/tool spans into agent_spans (see tracing.py)
+    ui_streaming: bool = True  # Stream partial broker text and sub-agent progress to the console
+    dashboard_refresh_seconds: float = 5.0  # Observability panel auto-refresh; 0 disables
+    # Durable sessions (see sessions.py)
+    session_keep_turns: int = 4  # Most recent turns kept verbatim; older ones are summarized
+    session_summary_max_chars: int = 4000
+    # Model backend: "gemini" (live API) or "offline" (rule-based, see offline.py)
+    model_backend: str = field(default_factory=lambda: os.environ.get("MARRIAGE_COUNCIL_MODEL_BACKEND", "gemini"))
+    offline_latency_ms: float = 0.0
+    offline_jitter_ms: float = 0.0
+    offline_error_rate: float = 0.0
+    offline_stream_chunk_ms: float = 0.0  # Per-word generation time
+    offline_seed: int = 42
 
 # CRITICAL FIX: Ensure 'conf' is defined at the module level
 conf = AgentConfig()
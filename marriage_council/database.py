@@ -1,53 +1,416 @@
 import sqlite3
-import random
-import os
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime
 from .config import conf
+from .log_store import append_logs, partition_existing
 
-def setup_database():
-    """Idempotent Database Initialization."""
-    db_exists = os.path.exists(conf.db_name)
-    conn = sqlite3.connect(conf.db_name)
-    cursor = conn.cursor()
-    
-    # Schema
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS profiles (
+# --- Connection Pool ---
+# Tuned once per connection instead of paying connect/close on every tool call.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=134217728",
+    "PRAGMA busy_timeout=5000",
+)
+
+class ConnectionPool:
+    """Thread-safe pool of long-lived SQLite connections for one database file."""
+
+    def __init__(self, db_name: str, max_idle: int = 8, cached_statements: int = 256):
+        self.db_name = db_name
+        self.max_idle = max_idle
+        self.cached_statements = cached_statements
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        # check_same_thread=False: a connection is only ever used by the thread
+        # that borrowed it, but it may be returned to (and closed by) another.
+        conn = sqlite3.connect(self.db_name, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._connect()
+
+    def release(self, conn: sqlite3.Connection):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if not self._closed and len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+        for conn in idle:
+            conn.close()
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(db_name: str = None) -> ConnectionPool:
+    """Returns the shared pool for `db_name` (defaults to the configured database)."""
+    db_name = db_name or conf.db_name
+    pool = _pools.get(db_name)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(db_name)
+            if pool is None:
+                pool = _pools[db_name] = ConnectionPool(db_name)
+    return pool
+
+@contextmanager
+def get_connection(db_name: str = None):
+    """Borrows a pooled connection for the duration of the `with` block.
+
+    The first use of the application database creates, migrates and seeds it.
+    """
+    db_name = db_name or conf.db_name
+    if db_name == conf.db_name:
+        ensure_database(db_name)
+    pool = get_pool(db_name)
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+def close_connections(db_name: str = None):
+    """Shutdown hook: closes pooled connections (all pools if no name is given)."""
+    with _pools_lock:
+        names = [db_name] if db_name else list(_pools)
+        pools = [_pools.pop(name) for name in names if name in _pools]
+        _ready.difference_update(names)  # the file may be replaced before its next use
+    for pool in pools:
+        pool.close()
+
+atexit.register(close_connections)
+
+# --- Schema Migrations ---
+# PRAGMA user_version holds the last applied step. Version 1 is the original
+# schema created by setup_database; every step runs in its own transaction, so
+# existing database files are upgraded in place and an interrupted upgrade
+# leaves the previous version intact.
+PROFILE_COLUMNS = ("id", "name", "gender", "age", "location", "job", "salary_lpa",
+                   "family_type", "horoscope_sign", "risk_factor")
+
+def _typed_profiles(conn: sqlite3.Connection):
+    """v2: salary "30 LPA" (TEXT) becomes salary_lpa REAL; rowids and the change feed are kept."""
+    conn.execute("""
+    CREATE TABLE profiles_v2 (
         id TEXT PRIMARY KEY, name TEXT, gender TEXT, age INTEGER,
-        location TEXT, job TEXT, salary TEXT, family_type TEXT,
+        location TEXT, job TEXT, salary_lpa REAL, family_type TEXT,
         horoscope_sign TEXT, risk_factor TEXT
     );""")
-    
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS agent_logs (
-        id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT,
-        agent_name TEXT, action TEXT, details TEXT
-    );""")
-    
-    # Seed Data
-    cursor.execute("SELECT count(*) FROM profiles")
-    if cursor.fetchone()[0] == 0:
-        print("⚡ Seeding Database...")
-        locations = ["Bangalore", "Mumbai", "Delhi", "Chennai"]
-        jobs = ["Engineer", "Doctor", "Banker", "Artist"]
-        risks = ["Clean"] * 8 + ["High Debt", "Fake Job"]
-        signs = ["Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo", "Libra", "Scorpio"]
-        
-        data = []
-        for i in range(1, 11):
-            data.append((f"G-{i}", f"Groom_{i}", "Male", 29, random.choice(locations), random.choice(jobs), "30 LPA", "Joint", random.choice(signs), random.choice(risks)))
-            data.append((f"B-{i}", f"Bride_{i}", "Female", 27, random.choice(locations), random.choice(jobs), "25 LPA", "Nuclear", random.choice(signs), random.choice(risks)))
-        cursor.executemany("INSERT INTO profiles VALUES (?,?,?,?,?,?,?,?,?,?)", data)
+    conn.execute("""
+    INSERT INTO profiles_v2 (rowid, id, name, gender, age, location, job, salary_lpa, family_type, horoscope_sign, risk_factor)
+    SELECT rowid, id, name, gender, CAST(age AS INTEGER), location, job,
+           CAST(NULLIF(TRIM(REPLACE(UPPER(salary), 'LPA', '')), '') AS REAL), family_type, horoscope_sign, risk_factor
+    FROM profiles ORDER BY rowid""")
+    conn.execute("DROP TABLE profiles")  # also drops its triggers; setup_database recreates them
+    conn.execute("ALTER TABLE profiles_v2 RENAME TO profiles")
+
+def _query_indexes(conn: sqlite3.Connection):
+    """v3: covering indexes for the sampler, batch pairing and log dashboard queries."""
+    # gender [+ risk_factor] -> id: sampling, get_random_profile_id and clean-only batch pairing
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_profiles_gender_risk ON profiles(gender, risk_factor, id)")
+    # gender + location / horoscope_sign filters of find_candidate_profiles
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_profiles_gender_location"
+                 " ON profiles(gender, location, horoscope_sign, risk_factor, id)")
+    # WHERE agent_name = ? ORDER BY id DESC, and time-range scans
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_agent_logs_agent ON agent_logs(agent_name, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_agent_logs_timestamp ON agent_logs(timestamp)")
+
+def _partitioned_logs(conn: sqlite3.Connection):
+    """v4: agent_logs becomes a view over day partitions, with per-minute rollups (see log_store.py)."""
+    partition_existing(conn)
+
+def _pairing_index(conn: sqlite3.Connection):
+    """v5: gender -> id in id order, so batch.pairs_from_profiles pages each side with a seek."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_profiles_gender_id ON profiles(gender, id)")
+
+MIGRATIONS = (
+    (2, _typed_profiles),
+    (3, _query_indexes),
+    (4, _partitioned_logs),
+    (5, _pairing_index),
+)
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Applies every pending migration; returns the resulting schema version."""
+    for target, step in MIGRATIONS:
+        if schema_version(conn) >= target:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if schema_version(conn) < target:  # another process may have upgraded meanwhile
+                step(conn)
+                conn.execute(f"PRAGMA user_version = {target}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    return schema_version(conn)
+
+# --- Lazy Initialization ---
+_ready = set()        # database files set up in this process
+_setting_up = {}      # db_name -> id of the thread running setup_database for it
+_setup_lock = threading.RLock()
+
+def ensure_database(db_name: str = None):
+    """Runs setup_database once per process for the application database, on first use."""
+    db_name = db_name or conf.db_name
+    if db_name in _ready or _setting_up.get(db_name) == threading.get_ident():
+        return
+    with _setup_lock:
+        if db_name not in _ready and db_name == conf.db_name:
+            setup_database()
+
+def setup_database():
+    """Idempotent Database Initialization."""
+    db_name = conf.db_name
+    with _setup_lock:
+        _setting_up[db_name] = threading.get_ident()
+        try:
+            _setup_schema()
+            _ready.add(db_name)
+        finally:
+            _setting_up.pop(db_name, None)
+
+def _setup_schema():
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        # Schema
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS profiles (
+            id TEXT PRIMARY KEY, name TEXT, gender TEXT, age INTEGER,
+            location TEXT, job TEXT, salary TEXT, family_type TEXT,
+            horoscope_sign TEXT, risk_factor TEXT
+        );""")
+
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS agent_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT,
+            agent_name TEXT, action TEXT, details TEXT
+        );""")
+
+        # Batch vetting checkpoints (batch.py): one row per vetted couple per run
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS vetting_results (
+            run_id TEXT, groom_id TEXT, bride_id TEXT, status TEXT, summary TEXT,
+            latency_ms REAL, completed_at TEXT,
+            PRIMARY KEY (run_id, groom_id, bride_id)
+        );""")
+
+        # Tracing spans (tracing.py): one row per agent run, model call or tool call
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS agent_spans (
+            span_id TEXT PRIMARY KEY, parent_id TEXT, trace_id TEXT, kind TEXT, name TEXT,
+            agent_name TEXT, model TEXT, start_ts REAL, end_ts REAL, duration_ms REAL,
+            prompt_tokens INTEGER, response_tokens INTEGER, cache_hit INTEGER, status TEXT
+        );""")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_agent_spans_kind_start ON agent_spans(kind, start_ts)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_agent_spans_trace ON agent_spans(trace_id)")
+        # Dashboard reads (tracing.py): latest spans, and latest root spans (one per turn)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_agent_spans_start ON agent_spans(start_ts)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_agent_spans_root ON agent_spans(parent_id, start_ts)")
+
+        # Durable chat sessions (sessions.py): older turns are folded into `summary`
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS chat_sessions (
+            app_name TEXT, user_id TEXT, id TEXT, state TEXT, summary TEXT,
+            create_time REAL, update_time REAL,
+            PRIMARY KEY (app_name, user_id, id)
+        );""")
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS session_events (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT, app_name TEXT, user_id TEXT, session_id TEXT,
+            id TEXT, invocation_id TEXT, timestamp REAL, event_data TEXT
+        );""")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_session_events_session ON session_events(app_name, user_id, session_id, seq)")
+
+        # Change feed: one row per touched profile, consumed by incremental caches (sampling.py)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS profile_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT, profile_id TEXT NOT NULL
+        );""")
         conn.commit()
-    conn.close()
 
-def log_event(agent, action, details):
-    try:
-        conn = sqlite3.connect(conf.db_name)
-        conn.execute("INSERT INTO agent_logs (timestamp, agent_name, action, details) VALUES (?,?,?,?)",
-                     (datetime.now().isoformat(), agent, action, details))
+        # The tables above are schema version 1; later versions are applied as migrations
+        migrate(conn)
+        # Change-feed triggers come after the migrations, which may rebuild profiles
+        cursor.executescript("""
+        CREATE TRIGGER IF NOT EXISTS profiles_changes_ai AFTER INSERT ON profiles BEGIN
+            INSERT INTO profile_changes (profile_id) VALUES (NEW.id);
+        END;
+        CREATE TRIGGER IF NOT EXISTS profiles_changes_au AFTER UPDATE ON profiles BEGIN
+            INSERT INTO profile_changes (profile_id) SELECT OLD.id UNION SELECT NEW.id;
+        END;
+        CREATE TRIGGER IF NOT EXISTS profiles_changes_ad AFTER DELETE ON profiles BEGIN
+            INSERT INTO profile_changes (profile_id) VALUES (OLD.id);
+        END;
+        """)
         conn.commit()
-        conn.close()
-    except: pass
 
-setup_database()
+    # Seed Data (see seeding.py)
+    with get_connection() as conn:
+        empty = conn.execute("SELECT count(*) FROM profiles").fetchone()[0] == 0
+    if empty:
+        from .seeding import seed_profiles
+        print("⚡ Seeding Database...")
+        seed_profiles(conf.seed_size)
+
+def profiles_version(conn: sqlite3.Connection) -> int:
+    """Sequence number of the latest profile change (0 if none)."""
+    return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM profile_changes").fetchone()[0]
+
+def profile_changes_since(conn: sqlite3.Connection, seq: int) -> list:
+    """(seq, profile_id) rows recorded after `seq`, oldest first."""
+    return conn.execute("SELECT seq, profile_id FROM profile_changes WHERE seq > ? ORDER BY seq", (seq,)).fetchall()
+
+# --- Asynchronous Log Sink ---
+logger = logging.getLogger(__name__)
+
+class LogSink:
+    """Bounded queue of telemetry rows drained by a background writer thread.
+
+    Rows are grouped into one transaction per target per batch (or per
+    `flush_interval` window). The default target (`sql=None`) is agent_logs,
+    written through log_store.append_logs; any other INSERT passed as `sql`
+    runs as an executemany. When the queue is full, `submit` waits at most
+    `put_timeout` seconds and then drops the row, counting it in `stats()`.
+    """
+
+    def __init__(self, max_queue: int = 10000, batch_size: int = 256,
+                 flush_interval: float = 0.2, put_timeout: float = 0.05):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._counters = {"queued": 0, "written": 0, "batches": 0, "dropped": 0, "failed": 0}
+
+    def _count(self, key: str, n: int = 1):
+        with self._lock:
+            self._counters[key] += n
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._counters, pending=self._queue.qsize())
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="agent-log-sink", daemon=True)
+                    self._thread.start()
+
+    def submit(self, db_name: str, row: tuple, sql: str = None) -> bool:
+        """Queues one row for `db_name`; returns False if it was dropped."""
+        self._ensure_started()
+        try:
+            self._queue.put(("row", (db_name, sql), row), timeout=self.put_timeout)
+        except queue.Full:
+            self._count("dropped")
+            return False
+        self._count("queued")
+        return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Blocks until every row queued so far has been written (or failed)."""
+        if self._thread is None or not self._thread.is_alive():
+            return self._queue.empty()
+        done = threading.Event()
+        try:
+            self._queue.put(("flush", done, None), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0):
+        """Flushes pending rows and stops the writer thread."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        done = threading.Event()
+        try:
+            self._queue.put(("stop", done, None), timeout=timeout)
+        except queue.Full:
+            return
+        done.wait(timeout)
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            batch, marker = [self._queue.get()], None
+            deadline = time.monotonic() + self.flush_interval
+            while batch[-1][0] == "row" and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            if batch[-1][0] != "row":
+                marker = batch.pop()
+            self._write(batch)
+            if marker:
+                marker[1].set()
+                if marker[0] == "stop":
+                    return
+
+    def _write(self, batch: list):
+        by_target = {}
+        for _, target, row in batch:
+            by_target.setdefault(target, []).append(row)
+        for (db_name, sql), rows in by_target.items():
+            try:
+                with get_connection(db_name) as conn:
+                    if sql is None:
+                        append_logs(conn, rows)  # day partition + rollups
+                    else:
+                        conn.executemany(sql, rows)
+                        conn.commit()
+            except Exception as e:
+                # Any failure drops just this batch; the writer thread must outlive bad rows
+                self._count("failed", len(rows))
+                logger.warning("Dropped %d telemetry rows for %s: %s", len(rows), db_name, e)
+            else:
+                self._count("written", len(rows))
+                self._count("batches")
+
+log_sink = LogSink()
+# atexit runs LIFO: pending rows are flushed before the pools close.
+atexit.register(log_sink.close)
+
+def log_event(agent, action, details, latency_ms: float = None, error: bool = False):
+    """Queues one agent_logs row; latency and error feed the per-minute rollups."""
+    log_sink.submit(conf.db_name, (datetime.now().isoformat(), agent, action, details, latency_ms, error))
+
+def flush_logs(timeout: float = 5.0) -> bool:
+    """Waits for queued log_event rows to reach the database."""
+    return log_sink.flush(timeout)
@@ -0,0 +1,79 @@
+import json
+import threading
+import numpy as np
+from .config import conf
+
+# --- Compatibility Engine ---
+# Zodiac order matters: sign index % 4 is its element (Fire, Earth, Air, Water).
+SIGNS = ["Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo",
+         "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces"]
+
+BAD_MATCH_THRESHOLD = 18  # Same cut-off the astrologer agent is instructed with (out of 36)
+
+# Score by zodiac distance: trines (same element) score highest, squares lowest.
+DISTANCE_SCORES = {0: 28, 1: 14, 2: 26, 3: 12, 4: 32, 5: 19, 6: 22}
+
+class CompatibilityTable:
+    """Precomputed sign x sign score matrix with O(1) lookups and batch scoring."""
+
+    def __init__(self, signs, scores):
+        self.signs = list(signs)
+        self.scores = np.asarray(scores, dtype=np.uint8)
+        self._index = {sign.lower(): i for i, sign in enumerate(self.signs)}
+
+    @classmethod
+    def build(cls):
+        n = len(SIGNS)
+        idx = np.arange(n)
+        diff = np.abs(idx[:, None] - idx[None, :])
+        distance = np.minimum(diff, n - diff)
+        return cls(SIGNS, np.vectorize(DISTANCE_SCORES.get)(distance))
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data["signs"], data["scores"])
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump({"signs": self.signs, "scores": self.scores.tolist()}, f)
+
+    def index_of(self, sign: str) -> int:
+        return self._index.get((sign or "").strip().lower(), -1)
+
+    def score(self, sign1: str, sign2: str):
+        """Score for one pair, or None if either sign is unknown."""
+        i, j = self.index_of(sign1), self.index_of(sign2)
+        if i < 0 or j < 0:
+            return None
+        return int(self.scores[i, j])
+
+    def score_pairs(self, signs1, signs2) -> np.ndarray:
+        """Scores many pairs in one pass; unknown signs score -1."""
+        i = np.fromiter((self.index_of(s) for s in signs1), dtype=np.int64)
+        j = np.fromiter((self.index_of(s) for s in signs2), dtype=np.int64)
+        known = (i >= 0) & (j >= 0)
+        out = np.full(len(i), -1, dtype=np.int64)
+        out[known] = self.scores[i[known], j[known]]
+        return out
+
+_table = None
+_table_source = None
+_table_lock = threading.Lock()
+
+def get_table() -> CompatibilityTable:
+    """Builds (or loads from conf.horoscope_table_path) the table once per process."""
+    global _table, _table_source
+    source = conf.horoscope_table_path or None
+    if _table is None or _table_source != source:
+        with _table_lock:
+            if _table is None or _table_source != source:
+                _table = CompatibilityTable.load(source) if source else CompatibilityTable.build()
+                _table_source = source
+    return _table
+
+def match_label(score) -> str:
+    if score is None or score < 0:
+        return "UNKNOWN_SIGN"
+    return "BAD_MATCH" if score < BAD_MATCH_THRESHOLD else "GOOD_MATCH"
@@ -0,0 +1,217 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import aclosing
+from functools import lru_cache
+from typing import AsyncGenerator
+from google.adk.models.google_llm import Gemini
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from .config import conf
+from .database import get_connection
+from .single_flight import model_flights
+
+# --- Request Canonicalization ---
+def _canonical_part(part: dict) -> dict:
+    # ADK stamps function calls/responses with random ids; they must not split the cache.
+    for key in ("function_call", "function_response"):
+        if key in part:
+            part[key].pop("id", None)
+    return part
+
+@lru_cache(maxsize=None)
+def _class_schema(schema: type) -> dict:
+    # Building a JSON schema takes over a millisecond; the class never changes, so build it once
+    return schema.model_json_schema()
+
+def _canonical_schema(schema):
+    if schema is None:
+        return None
+    if hasattr(schema, "model_json_schema"):  # Pydantic output_schema class
+        return _class_schema(schema) if isinstance(schema, type) else schema.model_json_schema()
+    if hasattr(schema, "model_dump"):
+        return schema.model_dump(mode="json", exclude_none=True)
+    return schema
+
+def cache_key(model: str, llm_request: LlmRequest) -> str:
+    """Stable hash of the model plus contents, instruction, tools and output schema."""
+    config = llm_request.config
+    contents = []
+    for content in llm_request.contents:
+        dumped = content.model_dump(mode="json", exclude_none=True)
+        dumped["parts"] = [_canonical_part(p) for p in dumped.get("parts", [])]
+        contents.append(dumped)
+    instruction = config.system_instruction if config else None
+    payload = {
+        "model": model,
+        "contents": contents,
+        "system_instruction": instruction.model_dump(mode="json", exclude_none=True)
+        if hasattr(instruction, "model_dump") else instruction,
+        "tools": [t.model_dump(mode="json", exclude_none=True) for t in (config.tools or [])] if config else [],
+        "response_schema": _canonical_schema(config.response_schema) if config else None,
+        "response_json_schema": _canonical_schema(config.response_json_schema) if config else None,
+    }
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+# --- Two-Tier Response Cache ---
+class ResponseCache:
+    """In-memory LRU in front of an on-disk SQLite table, with TTL and size caps."""
+
+    PRUNE_EVERY = 64
+
+    def __init__(self, path: str, ttl_seconds: float, max_memory_entries: int, max_disk_entries: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        with get_connection(self.path) as conn:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY, responses TEXT NOT NULL, created_at REAL NOT NULL
+            );""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_created ON llm_cache(created_at)")
+            conn.commit()
+
+    def _count(self, key: str, n: int = 1):
+        self._counters[key] += n
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["memory_hits"] + self._counters["disk_hits"] + self._counters["misses"]
+            hits = lookups - self._counters["misses"]
+            return dict(self._counters, memory_entries=len(self._memory),
+                        hit_rate=hits / lookups if lookups else 0.0)
+
+    def _remember(self, key: str, created_at: float, blobs: list):
+        self._memory[key] = (created_at, blobs)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._count("evictions")
+
+    def get(self, key: str):
+        """Cached serialized responses for `key`, or None."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self._count("memory_hits")
+                    return entry[1]
+                del self._memory[key]
+                self._count("evictions")
+
+        with get_connection(self.path) as conn:
+            row = conn.execute("SELECT responses, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                conn.commit()
+                row = None
+        with self._lock:
+            if row is None:
+                self._count("misses")
+                return None
+            blobs = json.loads(row[0])
+            self._remember(key, row[1], blobs)
+            self._count("disk_hits")
+            return blobs
+
+    def put(self, key: str, blobs: list):
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, blobs)
+            self._count("stores")
+            self._writes += 1
+            prune = self._writes % self.PRUNE_EVERY == 0
+        with get_connection(self.path) as conn:
+            conn.execute("INSERT OR REPLACE INTO llm_cache (key, responses, created_at) VALUES (?,?,?)",
+                         (key, json.dumps(blobs), now))
+            if prune:
+                self._prune(conn, now)
+            conn.commit()
+
+    def _prune(self, conn, now: float):
+        expired = conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,)).rowcount
+        excess = conn.execute("SELECT count(*) FROM llm_cache").fetchone()[0] - self.max_disk_entries
+        if excess > 0:
+            conn.execute("DELETE FROM llm_cache WHERE key IN "
+                         "(SELECT key FROM llm_cache ORDER BY created_at LIMIT ?)", (excess,))
+        with self._lock:
+            self._count("evictions", expired + max(excess, 0))
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        with get_connection(self.path) as conn:
+            conn.execute("DELETE FROM llm_cache")
+            conn.commit()
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_response_cache() -> ResponseCache:
+    """Shared cache for the configured path (one per process)."""
+    with _caches_lock:
+        cache = _caches.get(conf.llm_cache_path)
+        if cache is None:
+            cache = _caches[conf.llm_cache_path] = ResponseCache(
+                conf.llm_cache_path, conf.llm_cache_ttl_seconds,
+                conf.llm_cache_max_memory_entries, conf.llm_cache_max_disk_entries)
+    return cache
+
+# --- Caching Model Wrapper ---
+class CachedGemini(Gemini):
+    """Gemini that replays stored responses for identical canonical requests."""
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        cache = get_response_cache()
+        key = cache_key(llm_request.model or self.model, llm_request)
+        cached = cache.get(key)
+        if cached is not None:
+            for blob in cached:
+                response = LlmResponse.model_validate_json(blob)
+                response.custom_metadata = {**(response.custom_metadata or {}), "cache_hit": True}
+                yield response
+            return
+
+        complete, cacheable = [], True
+        async for response in super().generate_content_async(llm_request, stream=stream):
+            if response.error_code:
+                cacheable = False
+            elif not response.partial:
+                complete.append(response.model_dump_json(exclude_none=True))
+            yield response
+        if cacheable and complete:
+            cache.put(key, complete)
+
+# --- Coalescing Model Wrapper ---
+class CoalescingGemini(Gemini):
+    """Gemini that shares one backend call among identical concurrent requests.
+
+    Identical means the same canonical key as the response cache plus the same
+    streaming mode. Every caller gets its own copy of each response, since the
+    flow stamps function-call ids onto them.
+    """
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if not conf.single_flight_enabled:
+            async for response in super().generate_content_async(llm_request, stream=stream):
+                yield response
+            return
+        key = (cache_key(llm_request.model or self.model, llm_request), stream)
+        generate = super().generate_content_async
+        async with aclosing(model_flights.stream(key, lambda: generate(llm_request, stream=stream))) as responses:
+            async for response in responses:
+                yield response.model_copy(deep=True)
@@ -0,0 +1,220 @@
+"""Day-partitioned agent_logs with per-minute rollups and retention.
+
+Each day's rows live in their own table (`agent_logs_p20261018`), and the
+`agent_logs` view is a UNION ALL over the partitions, so readers keep using
+`agent_logs`. Old days are pruned by dropping whole tables. Ids come from one
+sequence shared by every partition and stay globally increasing, so a
+high-water mark on `id` (LogTail) still works. Every batch also upserts
+`agent_log_rollups`: one row per (minute, agent, action) with event, error
+and latency aggregates. Dashboards and reports read those instead of
+scanning raw logs.
+
+    python -m marriage_council.log_store --db matrimony_council.sqlite --keep-days 7
+"""
+import argparse
+import re
+import sqlite3
+from datetime import datetime, timedelta
+from .config import conf
+
+PARTITION_PREFIX = "agent_logs_p"
+LOG_COLUMNS = ("id", "timestamp", "agent_name", "action", "details", "latency_ms", "is_error")
+DAY_PATTERN = re.compile(r"^(\d{4})-(\d{2})-(\d{2})")
+
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS agent_log_rollups (
+    minute TEXT, agent_name TEXT, action TEXT,
+    events INTEGER, errors INTEGER,
+    latency_count INTEGER, latency_sum REAL, latency_min REAL, latency_max REAL,
+    PRIMARY KEY (minute, agent_name, action)
+) WITHOUT ROWID"""
+SEQUENCE_SCHEMA = "CREATE TABLE IF NOT EXISTS log_sequence (name TEXT PRIMARY KEY, seq INTEGER)"
+
+UPSERT_ROLLUP_SQL = """
+INSERT INTO agent_log_rollups VALUES (?,?,?,?,?,?,?,?,?)
+ON CONFLICT (minute, agent_name, action) DO UPDATE SET
+    events = events + excluded.events,
+    errors = errors + excluded.errors,
+    latency_count = latency_count + excluded.latency_count,
+    latency_sum = COALESCE(latency_sum, 0) + COALESCE(excluded.latency_sum, 0),
+    latency_min = min(COALESCE(latency_min, excluded.latency_min), COALESCE(excluded.latency_min, latency_min)),
+    latency_max = max(COALESCE(latency_max, excluded.latency_max), COALESCE(excluded.latency_max, latency_max))"""
+
+# --- Partitions ---
+def partition_day(timestamp) -> str:
+    """YYYYMMDD of an ISO timestamp; rows without one are filed under today."""
+    match = DAY_PATTERN.match(str(timestamp or ""))
+    return "".join(match.groups()) if match else datetime.now().strftime("%Y%m%d")
+
+def partitions(conn: sqlite3.Connection) -> list:
+    """Partition table names, oldest first."""
+    return [r[0] for r in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ? ORDER BY name",
+        (PARTITION_PREFIX + "[0-9]*",))]
+
+def _create_partition(conn: sqlite3.Connection, day: str) -> bool:
+    """Creates the day's table and indexes; returns False if it already existed."""
+    table = PARTITION_PREFIX + day
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone():
+        return False
+    conn.execute(f"""
+    CREATE TABLE {table} (
+        id INTEGER PRIMARY KEY, timestamp TEXT, agent_name TEXT, action TEXT, details TEXT,
+        latency_ms REAL, is_error INTEGER DEFAULT 0
+    )""")
+    # Same access paths as the single table had (migration v3)
+    conn.execute(f"CREATE INDEX idx_agent_logs_agent_{day} ON {table}(agent_name, id)")
+    conn.execute(f"CREATE INDEX idx_agent_logs_timestamp_{day} ON {table}(timestamp)")
+    return True
+
+def rebuild_view(conn: sqlite3.Connection):
+    """Points the agent_logs view at the current partitions.
+
+    SQLite caps a compound SELECT at 500 terms, which bounds how many days
+    can be kept online.
+    """
+    columns = ", ".join(LOG_COLUMNS)
+    body = " UNION ALL ".join(f"SELECT {columns} FROM {table}" for table in partitions(conn))
+    conn.execute("DROP VIEW IF EXISTS agent_logs")
+    conn.execute("CREATE VIEW agent_logs AS " + (body or "SELECT " + ", ".join(f"NULL AS {c}" for c in LOG_COLUMNS) + " WHERE 0"))
+
+def latest_log_id(conn: sqlite3.Connection) -> int:
+    """Highest log id still stored (0 if none): one index probe per partition instead of a view scan."""
+    tables = partitions(conn)
+    if not tables:
+        return 0
+    heads = " UNION ALL ".join(f"SELECT MAX(id) AS head FROM {table}" for table in tables)
+    return conn.execute(f"SELECT COALESCE(MAX(head), 0) FROM ({heads})").fetchone()[0]
+
+# --- Writes ---
+def _normalize(row: tuple) -> tuple:
+    """(timestamp, agent, action, details[, latency_ms[, is_error]]) -> all six fields."""
+    timestamp, agent, action, details, *extra = row
+    latency_ms = extra[0] if extra else None
+    is_error = int(bool(extra[1])) if len(extra) > 1 else 0
+    return timestamp, agent, action, details, latency_ms, is_error
+
+def _rollups(rows) -> list:
+    groups = {}
+    for timestamp, agent, action, _, latency_ms, is_error in rows:
+        minute = str(timestamp)[:16] if DAY_PATTERN.match(str(timestamp or "")) else datetime.now().isoformat()[:16]
+        g = groups.setdefault((minute, agent or "", action or ""), [0, 0, 0, None, None, None])
+        g[0] += 1
+        g[1] += is_error
+        if latency_ms is not None:
+            g[2] += 1
+            g[3] = (g[3] or 0) + latency_ms
+            g[4] = latency_ms if g[4] is None else min(g[4], latency_ms)
+            g[5] = latency_ms if g[5] is None else max(g[5], latency_ms)
+    return [key + tuple(values) for key, values in groups.items()]
+
+def append_logs(conn: sqlite3.Connection, rows, retention_days: int = None) -> int:
+    """Writes a batch of log rows and their rollups in one transaction; returns the row count.
+
+    Creating a new day's partition also applies the retention policy, so a
+    long-running writer prunes about once a day.
+    """
+    rows = [_normalize(row) for row in rows]
+    if not rows:
+        return 0
+    by_day = {}
+    for row in rows:
+        by_day.setdefault(partition_day(row[0]), []).append(row)
+
+    created = False
+    conn.execute("BEGIN IMMEDIATE")  # serializes id allocation across processes
+    try:
+        for day in by_day:
+            created |= _create_partition(conn, day)
+        if created:
+            rebuild_view(conn)
+        conn.execute("INSERT OR IGNORE INTO log_sequence VALUES ('agent_logs', 0)")
+        next_id = conn.execute("SELECT seq FROM log_sequence WHERE name = 'agent_logs'").fetchone()[0] + 1
+        conn.execute("UPDATE log_sequence SET seq = seq + ? WHERE name = 'agent_logs'", (len(rows),))
+        for day, day_rows in sorted(by_day.items()):
+            conn.executemany(f"INSERT INTO {PARTITION_PREFIX}{day} VALUES (?,?,?,?,?,?,?)",
+                             [(next_id + i, *row) for i, row in enumerate(day_rows)])
+            next_id += len(day_rows)
+        conn.executemany(UPSERT_ROLLUP_SQL, _rollups(rows))
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    if created:
+        prune_logs(conn, retention_days)
+    return len(rows)
+
+# --- Retention ---
+def prune_logs(conn: sqlite3.Connection, retention_days: int = None, rollup_retention_days: int = None,
+               today: datetime = None) -> dict:
+    """Drops partitions older than `retention_days` (today counts as one) and rollups
+    older than `rollup_retention_days`. 0 keeps everything; None uses conf."""
+    retention_days = conf.log_retention_days if retention_days is None else retention_days
+    rollup_retention_days = conf.log_rollup_retention_days if rollup_retention_days is None else rollup_retention_days
+    today = today or datetime.now()
+    dropped, rollups = [], 0
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if retention_days > 0:
+            oldest_kept = (today - timedelta(days=retention_days - 1)).strftime("%Y%m%d")
+            dropped = [t for t in partitions(conn) if t[len(PARTITION_PREFIX):] < oldest_kept]
+            for table in dropped:
+                conn.execute(f"DROP TABLE {table}")
+            if dropped:
+                rebuild_view(conn)
+        if rollup_retention_days > 0:
+            cutoff = (today - timedelta(days=rollup_retention_days - 1)).strftime("%Y-%m-%d")
+            rollups = conn.execute("DELETE FROM agent_log_rollups WHERE minute < ?", (cutoff,)).rowcount
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return {"partitions_dropped": len(dropped), "rollups_deleted": rollups}
+
+# --- Rollup Queries ---
+def activity_summary(conn: sqlite3.Connection, minutes: int = 60, now: datetime = None) -> list:
+    """(agent_name, action, events, errors, avg/min/max latency ms) over the last `minutes`, busiest first."""
+    since = ((now or datetime.now()) - timedelta(minutes=minutes)).isoformat()[:16]
+    return conn.execute("""
+        SELECT agent_name, action, SUM(events), SUM(errors),
+               SUM(latency_sum) / NULLIF(SUM(latency_count), 0), MIN(latency_min), MAX(latency_max)
+        FROM agent_log_rollups WHERE minute >= ?
+        GROUP BY agent_name, action ORDER BY SUM(events) DESC""", (since,)).fetchall()
+
+# --- Migration ---
+def partition_existing(conn: sqlite3.Connection):
+    """Moves rows of a plain agent_logs table into day partitions, keeping their ids.
+
+    Runs inside the caller's transaction (schema migration v4).
+    """
+    conn.execute(ROLLUP_SCHEMA)
+    conn.execute(SEQUENCE_SCHEMA)
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'agent_logs'").fetchone():
+        rows = conn.execute("SELECT id, timestamp, agent_name, action, details FROM agent_logs ORDER BY id").fetchall()
+        by_day = {}
+        for row in rows:
+            by_day.setdefault(partition_day(row[1]), []).append(row)
+        for day, day_rows in by_day.items():
+            _create_partition(conn, day)
+            conn.executemany(f"INSERT INTO {PARTITION_PREFIX}{day} (id, timestamp, agent_name, action, details)"
+                             " VALUES (?,?,?,?,?)", day_rows)
+        conn.executemany(UPSERT_ROLLUP_SQL, _rollups([(*row[1:], None, 0) for row in rows]))
+        conn.execute("INSERT OR REPLACE INTO log_sequence VALUES ('agent_logs', ?)",
+                     (max([row[0] for row in rows], default=0),))
+        conn.execute("DROP TABLE agent_logs")  # its v3 indexes go with it
+    rebuild_view(conn)
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply the agent_logs retention policy.")
+    parser.add_argument("--db", default=None, help="Database file (default: the configured database)")
+    parser.add_argument("--keep-days", type=int, default=None, help="Days of raw logs to keep (default: conf)")
+    parser.add_argument("--keep-rollup-days", type=int, default=None, help="Days of rollups to keep (default: conf)")
+    args = parser.parse_args()
+
+    from .database import get_connection
+    with get_connection(args.db) as conn:
+        result = prune_logs(conn, args.keep_days, args.keep_rollup_days)
+    print(f"✅ Dropped {result['partitions_dropped']} partitions and {result['rollups_deleted']} rollup rows")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import threading
+from collections import deque
+from .config import conf
+from .database import get_connection
+from .log_store import latest_log_id
+
+class LogTail:
+    """Bounded ring of the newest agent_logs rows, advanced by a high-water mark on `id`.
+
+    Each poll reads only rows written since the previous one (at most
+    `capacity` of them), so refreshing a dashboard costs O(new rows). Once
+    rows have been skipped or evicted, a per-agent view the ring cannot fill
+    falls back to the indexed `(agent_name, id)` lookup.
+    """
+
+    COLUMNS = ("id", "timestamp", "agent_name", "action", "details")
+
+    def __init__(self, db_name: str, capacity: int = 500):
+        self.db_name = db_name
+        self.capacity = capacity
+        self.high_water = 0
+        self.rows_fetched = 0
+        self.fallback_reads = 0
+        self.truncated = False  # the ring no longer holds every row up to high_water
+        self._ring = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def poll(self) -> int:
+        """Pulls rows newer than the high-water mark; returns how many arrived."""
+        with self._lock, get_connection(self.db_name) as conn:
+            latest = latest_log_id(conn)
+            if latest < self.high_water:  # logs pruned or database replaced
+                self._ring.clear()
+                self.high_water = 0
+                self.truncated = False
+            if latest == self.high_water:
+                return 0
+            rows = conn.execute(
+                "SELECT id, timestamp, agent_name, action, details FROM agent_logs"
+                " WHERE id > ? ORDER BY id DESC LIMIT ?", (self.high_water, self.capacity)).fetchall()
+            if latest - self.high_water > len(rows) or len(self._ring) + len(rows) > self.capacity:
+                self.truncated = True
+            self._ring.extend(reversed(rows))
+            self.high_water = rows[0][0]
+            self.rows_fetched += len(rows)
+            return len(rows)
+
+    def recent(self, agent_name: str = None, limit: int = 5) -> list:
+        """Newest-first rows from the ring, optionally for one agent."""
+        with self._lock:
+            out = []
+            for row in reversed(self._ring):
+                if agent_name is None or row[2] == agent_name:
+                    out.append(row)
+                    if len(out) == limit:
+                        break
+            if len(out) < limit and agent_name is not None and self.truncated:
+                # Other agents' bursts pushed this one's rows out of the ring
+                with get_connection(self.db_name) as conn:
+                    out = conn.execute(
+                        "SELECT id, timestamp, agent_name, action, details FROM agent_logs"
+                        " WHERE agent_name = ? AND id <= ? ORDER BY id DESC LIMIT ?",
+                        (agent_name, self.high_water, limit)).fetchall()
+                self.fallback_reads += 1
+            return out
+
+_tails = {}
+_tails_lock = threading.Lock()
+
+def get_log_tail(db_name: str = None) -> LogTail:
+    """Process-wide tail for `db_name` (defaults to conf.db_name)."""
+    db_name = db_name or conf.db_name
+    with _tails_lock:
+        tail = _tails.get(db_name)
+        if tail is None:
+            tail = _tails[db_name] = LogTail(db_name)
+    return tail
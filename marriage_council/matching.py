@@ -0,0 +1,96 @@
+"""Top-K counterpart recommendations over the columnar profile snapshot.
+
+A candidate is every profile of the opposite gender that could pass vetting:
+no High Debt / Fake Job risk and no BAD_MATCH horoscope with the subject.
+Each is scored as the best location compromise from `score_grid` (bride
+keeps her job, couple lives in either partner's city) plus the horoscope
+compatibility score. Both terms depend only on dictionary codes, so they are
+tabulated per code and gathered for all candidates in one NumPy pass, and
+np.argpartition selects the top K without sorting the rest.
+"""
+from functools import lru_cache
+import numpy as np
+from .horoscope import BAD_MATCH_THRESHOLD, get_table
+from .scoring import score_grid
+from .snapshot import get_snapshot
+
+RISKY = ("High Debt", "Fake Job")
+OPPOSITE = {"Male": "Female", "Female": "Male"}
+CAREER = "Keep Job"  # The bride's career is non-negotiable
+
+@lru_cache(maxsize=32)
+def compromise_table(locations: tuple) -> np.ndarray:
+    """Best `score_grid` total for every (groom location, bride location) pair.
+
+    The couple settles in whichever partner's city scores higher, so
+    table[i, j] is what find_optimal_compromise would report as "best".
+    """
+    n = len(locations)
+    table = np.zeros((n, n), dtype=np.int64)
+    for i, groom_loc in enumerate(locations):
+        for j, bride_loc in enumerate(locations):
+            _, _, total = score_grid(groom_loc, bride_loc, [groom_loc, bride_loc], [CAREER])
+            table[i, j] = total.max()
+    table.setflags(write=False)  # shared by every caller through the cache
+    return table
+
+def horoscope_table(signs) -> np.ndarray:
+    """Compatibility score for every pair of snapshot sign codes (-1 where a sign is unknown)."""
+    table = get_table()
+    index = np.array([table.index_of(sign) for sign in signs], dtype=np.int64)
+    known = index >= 0
+    scores = np.full((len(signs), len(signs)), -1, dtype=np.int64)
+    scores[np.ix_(known, known)] = table.scores[np.ix_(index[known], index[known])]
+    return scores
+
+def recommend(profile_id: str, k: int = 5, db_name: str = None) -> dict:
+    """The K best opposite-gender counterparts for `profile_id`, best first."""
+    snapshot = get_snapshot(db_name)
+    at = int(snapshot.positions([profile_id])[0])
+    if at < 0:
+        return {"profile_id": profile_id, "error": "Not Found"}
+    gender = snapshot.dictionaries["gender"][snapshot.codes["gender"][at]]
+    risk = snapshot.dictionaries["risk_factor"][snapshot.codes["risk_factor"][at]]
+    if risk in RISKY or gender not in OPPOSITE:
+        reason = "has a critical risk" if risk in RISKY else "has no gender on record"
+        return {"profile_id": profile_id, "matches": [], "note": f"{profile_id} {reason}; no match can pass vetting."}
+
+    locations, signs = snapshot.codes["location"], snapshot.codes["horoscope_sign"]
+    candidates = snapshot.codes["gender"] == snapshot.code("gender", OPPOSITE[gender])
+    for risky in RISKY:
+        candidates &= snapshot.codes["risk_factor"] != snapshot.code("risk_factor", risky)
+    rows = np.flatnonzero(candidates)
+
+    # Score per (candidate location, candidate sign) code pair; -1 marks a BAD_MATCH
+    utility = compromise_table(tuple(snapshot.dictionaries["location"]))
+    utility = utility[locations[at], :] if gender == "Male" else utility[:, locations[at]]
+    compatibility = horoscope_table(snapshot.dictionaries["horoscope_sign"])[signs[at], :]
+    n_signs = len(compatibility)
+    # Unknown signs are not a BAD_MATCH to the vetting checks; they just add nothing
+    bad = (compatibility >= 0) & (compatibility < BAD_MATCH_THRESHOLD)
+    pair_scores = np.where(bad[None, :], -1, utility[:, None] + np.maximum(compatibility, 0)[None, :]).ravel()
+    totals = pair_scores[locations[rows].astype(np.intp) * n_signs + signs[rows]]
+
+    # Ties go to the earlier row, which also makes the partial sort deterministic
+    keys = totals * (len(snapshot) + 1) + (len(snapshot) - rows)
+    eligible = int((totals >= 0).sum())
+    k = max(0, min(int(k), eligible))
+    top = np.argpartition(-keys, k - 1)[:k] if 0 < k < len(rows) else np.flatnonzero(totals >= 0)[:k]
+    top = top[np.argsort(-keys[top])]
+
+    location_names = snapshot.dictionaries["location"]
+    job_names = snapshot.dictionaries["job"]
+    sign_names = snapshot.dictionaries["horoscope_sign"]
+    return {
+        "profile_id": profile_id,
+        "matches": [{
+            "profile_id": snapshot.profile_id(rows[i]),
+            "location": location_names[locations[rows[i]]],
+            "job": job_names[snapshot.codes["job"][rows[i]]],
+            "horoscope": sign_names[signs[rows[i]]],
+            "utility_score": int(utility[locations[rows[i]]]),
+            "horoscope_score": int(compatibility[signs[rows[i]]]) if compatibility[signs[rows[i]]] >= 0 else None,
+            "total_score": int(totals[i]),
+        } for i in top],
+        "candidates": eligible,
+    }
@@ -0,0 +1,27 @@
+from functools import lru_cache
+from google.adk.models.google_llm import Gemini
+from .config import conf, ensure_auth
+
+@lru_cache(maxsize=None)
+def _layered(layers: tuple, backend: type) -> type:
+    # Outermost layer first: coalescing sits in front of the cache, so one miss reaches the backend
+    return type("".join(layer.__name__.replace("Gemini", "") for layer in layers) + backend.__name__,
+                (*layers, backend), {})
+
+def build_model(model_name: str) -> Gemini:
+    """Single construction point for every agent's model, driven by AgentConfig."""
+    if conf.model_backend == "offline":
+        from .offline import OfflineGemini
+        backend = OfflineGemini
+    else:
+        ensure_auth()
+        backend = Gemini
+    layers = []
+    if conf.single_flight_enabled:
+        from .llm_cache import CoalescingGemini
+        layers.append(CoalescingGemini)
+    if conf.llm_cache_enabled:
+        from .llm_cache import CachedGemini
+        layers.append(CachedGemini)
+    model_class = _layered(tuple(layers), backend) if layers else backend
+    return model_class(model=model_name)
@@ -0,0 +1,249 @@
+"""Rule-based local model backend (AgentConfig.model_backend = "offline").
+
+Answers every agent in the broker graph without network access, including
+real function calls into tools.py, so the orchestration, tool and database
+layers can be load-tested and profiled on an offline machine. Per-call
+latency, jitter and error rate are configurable on AgentConfig.
+"""
+import asyncio
+import json
+import random
+import re
+from dataclasses import dataclass, field
+from typing import AsyncGenerator
+from google.adk.models.google_llm import Gemini
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from .config import conf
+from .tools import get_profile_details
+
+AGENT_NAME_PATTERN = re.compile(r'Your internal name is "(\w+)"')
+GROOM_ID_PATTERN = re.compile(r"\bG-\d+\b", re.IGNORECASE)
+BRIDE_ID_PATTERN = re.compile(r"\bB-\d+\b", re.IGNORECASE)
+
+class OfflineModelError(RuntimeError):
+    """Injected backend failure (see AgentConfig.offline_error_rate)."""
+
+_rng = random.Random(conf.offline_seed)
+
+# --- Request View ---
+@dataclass
+class _Turn:
+    agent: str
+    message: str                                 # latest user text
+    history: str                                 # every text and tool result in the request
+    results: dict = field(default_factory=dict)  # tool name -> result text, current turn only
+    tools: set = field(default_factory=set)
+    instruction: str = ""
+
+    def last_id(self, pattern) -> str:
+        found = pattern.findall(self.message) or pattern.findall(self.history)
+        return found[-1].upper() if found else None
+
+def _result_text(response) -> str:
+    payload = response.response or {}
+    result = payload.get("result", payload)
+    return result if isinstance(result, str) else json.dumps(result)
+
+def _read_turn(llm_request: LlmRequest) -> _Turn:
+    instruction = llm_request.config.system_instruction if llm_request.config else ""
+    instruction = instruction if isinstance(instruction, str) else ""
+    match = AGENT_NAME_PATTERN.search(instruction)
+    turn = _Turn(agent=match.group(1) if match else "", message="", history="",
+                 tools=set(llm_request.tools_dict), instruction=instruction)
+
+    texts, last_user = [], -1
+    for i, content in enumerate(llm_request.contents):
+        for part in content.parts or []:
+            if part.text:
+                texts.append(part.text)
+                if content.role == "user":
+                    last_user = i
+            elif part.function_response:
+                texts.append(_result_text(part.function_response))
+    turn.history = "\n".join(texts)
+    if last_user >= 0:
+        turn.message = " ".join(p.text for p in llm_request.contents[last_user].parts if p.text)
+        for content in llm_request.contents[last_user + 1:]:
+            for part in content.parts or []:
+                if part.function_response:
+                    name = part.function_response.name  # parallel calls to one tool share an entry
+                    turn.results[name] = "\n".join(filter(None, (turn.results.get(name), _result_text(part.function_response))))
+    return turn
+
+def _text(text: str) -> LlmResponse:
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+def _calls(*calls) -> LlmResponse:
+    parts = [types.Part(function_call=types.FunctionCall(name=name, args=args)) for name, args in calls]
+    return LlmResponse(content=types.Content(role="model", parts=parts))
+
+def _profile(profile_id: str) -> dict:
+    return json.loads(get_profile_details(profile_id)) if profile_id else {}
+
+# --- Scripted Agents ---
+def _parser(turn: _Turn) -> LlmResponse:
+    ids = [i.upper() for i in GROOM_ID_PATTERN.findall(turn.history) + BRIDE_ID_PATTERN.findall(turn.history)]
+    return _text(", ".join(dict.fromkeys(ids)) or "None")
+
+def _detective(turn: _Turn) -> LlmResponse:
+    if "perform_background_check" not in turn.results:
+        ids = [i for i in (turn.last_id(GROOM_ID_PATTERN), turn.last_id(BRIDE_ID_PATTERN)) if i]
+        if not ids:
+            return _text("No profile IDs received.")
+        return _calls(*[("perform_background_check", {"profile_id": pid}) for pid in ids])
+    if "RISK_FOUND" in turn.results["perform_background_check"]:
+        return _text("DETECTIVE_CRITICAL_FAILURE")
+    return _text("DETECTIVE_CLEAN_PASS")
+
+def _astrologer(turn: _Turn) -> LlmResponse:
+    if "check_horoscope_compatibility" in turn.results:
+        result = turn.results["check_horoscope_compatibility"]
+        return _text(f"{result}: horoscope compatibility checked." + (" Warning: score below 18." if result == "BAD_MATCH" else ""))
+    groom = _profile(turn.last_id(GROOM_ID_PATTERN))
+    bride = _profile(turn.last_id(BRIDE_ID_PATTERN))
+    if not groom.get("horoscope") or not bride.get("horoscope"):
+        return _text("No horoscope signs available.")
+    return _calls(("check_horoscope_compatibility", {"sign1": groom["horoscope"], "sign2": bride["horoscope"]}))
+
+def _synthesizer(turn: _Turn) -> LlmResponse:
+    failed = "DETECTIVE_CRITICAL_FAILURE" in turn.history or "BAD_MATCH" in turn.history
+    verdict = {"status": "FAIL" if failed else "PASS",
+               "summary": "Critical risk or bad horoscope match found." if failed else "Background and horoscope checks passed."}
+    return _text(json.dumps(verdict))
+
+def _representative(turn: _Turn, side: str) -> LlmResponse:
+    pattern = GROOM_ID_PATTERN if side == "Groom" else BRIDE_ID_PATTERN
+    profile_id = turn.last_id(pattern)
+    prefetched = re.search(side + r" profile: (\{.*\})", turn.instruction)
+    if prefetched:
+        profile = json.loads(prefetched.group(1))
+    elif "get_profile_details" not in turn.results and profile_id and "get_profile_details" in turn.tools:
+        return _calls(("get_profile_details", {"profile_id": profile_id}))
+    else:
+        profile = json.loads(turn.results["get_profile_details"]) if "get_profile_details" in turn.results else _profile(profile_id)
+    if not profile.get("location"):
+        return _text(f"{side} has no profile on record; no demands.")
+    if side == "Groom":
+        return _text(f"Groom ({profile['id']}) demands: live in {profile['location']}.")
+    return _text(f"Bride ({profile['id']}) demands: keep her {profile['job']} career and live in {profile['location']}.")
+
+def _location(label: str, text: str) -> str:
+    match = (re.search(label + r"\s*\(Location:\s*([A-Za-z ]+?)[,)]", text)
+             or re.search(r'"' + label.lower() + r'_location":\s*"([A-Za-z ]+)"', text)
+             or re.search(label + r" \(\w-\d+\) demands:.*?live in ([A-Za-z]+)", text))
+    return match.group(1).strip() if match else None
+
+def _broker(turn: _Turn) -> LlmResponse:
+    results, message = turn.results, turn.message
+
+    # Results of tools called earlier in this turn
+    if "VettingPipeline" in results:
+        if "FAIL" in results["VettingPipeline"] or "REJECTED" in results["VettingPipeline"]:
+            return _text("VERDICT: MATCH REJECTED. Vetting failed due to critical risk.")
+        return _text("VERDICT: VETTING PASSED. PROCEEDING TO NEGOTIATION.")
+    if "calculate_utility_score" in results:
+        score = json.loads(results["calculate_utility_score"])["total_score"]
+        return _text(("MATCH SUCCESSFUL" if score > 60 else "NEGOTIATION FAILED") + f" (utility score {score}).")
+    if "find_optimal_compromise" in results:
+        best = json.loads(results["find_optimal_compromise"])["best"]
+        return _calls(("calculate_utility_score", {
+            "groom_loc": _location("Groom", turn.history), "bride_loc": _location("Bride", turn.history),
+            "proposal_loc": best["proposal_loc"], "bride_career": best["bride_career"]}))
+    if "get_random_profile_id" in results:
+        groom, bride = turn.last_id(GROOM_ID_PATTERN), turn.last_id(BRIDE_ID_PATTERN)
+        return _calls(("VettingPipeline", {"request": f"Identify Groom {groom} and Bride {bride}. Run full vetting pipeline."}))
+    if "recommend_matches" in results:
+        ranked = json.loads(results["recommend_matches"])
+        if not ranked.get("matches"):
+            return _text(ranked.get("note") or f"No eligible matches for {ranked['profile_id']}.")
+        best = ranked["matches"][0]
+        return _text(f"Top matches for {ranked['profile_id']}: "
+                     + ", ".join(f"{m['profile_id']} ({m['total_score']})" for m in ranked["matches"])
+                     + f". Recommended: {best['profile_id']}.")
+    if "NegotiationStage" in results:
+        demands = json.loads(results["NegotiationStage"])
+        return _text(f"Demands gathered. {demands['groom_demands']} {demands['bride_demands']}".strip())
+
+    # A new user message
+    lowered = message.lower()
+    rejected = "MATCH REJECTED" in turn.history or re.search(r'"status":\s*"FAIL"', turn.history)
+    if rejected and "vet" not in lowered:
+        return _text("The decision is final based on safety protocols. MATCH REJECTED.")
+    if "random couple" in lowered:
+        return _calls(("get_random_profile_id", {"gender": "groom"}), ("get_random_profile_id", {"gender": "bride"}))
+
+    named = GROOM_ID_PATTERN.findall(message) + BRIDE_ID_PATTERN.findall(message)
+    if ("recommend" in lowered or "suggest" in lowered) and len(named) == 1:
+        return _calls(("recommend_matches", {"profile_id": named[0].upper(), "k": 5}))
+
+    groom, bride = turn.last_id(GROOM_ID_PATTERN), turn.last_id(BRIDE_ID_PATTERN)
+    proposal = re.search(r"Live in ([A-Z][a-z]+)", message)
+    if "vet" in lowered and groom and bride:
+        return _calls(("VettingPipeline", {"request": f"Identify Groom {groom} and Bride {bride}. Run full vetting pipeline."}))
+    if proposal:
+        career = re.search(r"Career:\s*([A-Za-z ]+?)[,)]", message)
+        return _calls(("calculate_utility_score", {
+            "groom_loc": _location("Groom", message), "bride_loc": _location("Bride", message),
+            "proposal_loc": proposal.group(1),
+            "bride_career": "Quit Job" if re.search(r"\bquits?\b", lowered) else (career.group(1) if career else "Keep Job")}))
+    if ("consult" in lowered or "demands" in lowered) and groom and bride:
+        return _calls(("NegotiationStage", {"request": f"Groom {groom} and Bride {bride}: state your demands."}))
+    if "compromise" in lowered and _location("Groom", turn.history) and _location("Bride", turn.history):
+        return _calls(("find_optimal_compromise", {
+            "groom_loc": _location("Groom", turn.history), "bride_loc": _location("Bride", turn.history),
+            "candidate_locations": [], "career_options": ["Keep Job", "Quit Job"]}))
+    return _text("Please name the Groom and Bride IDs (e.g. G-1 and B-1) to start vetting.")
+
+SCRIPTS = {
+    "parser_agent": _parser,
+    "detective_agent": _detective,
+    "astrologer_agent": _astrologer,
+    "synthesizer_agent": _synthesizer,
+    "groom_rep": lambda turn: _representative(turn, "Groom"),
+    "bride_rep": lambda turn: _representative(turn, "Bride"),
+    "judge_agent": lambda turn: _text("Fairness: 4/5."),
+}
+
+def respond(llm_request: LlmRequest) -> LlmResponse:
+    """The scripted response for whichever agent issued `llm_request`."""
+    turn = _read_turn(llm_request)
+    response = SCRIPTS.get(turn.agent, _broker)(turn)
+    # Only call tools the requesting agent actually has
+    for part in response.content.parts:
+        if part.function_call and part.function_call.name not in turn.tools:
+            return _text(f"Tool {part.function_call.name} is not available to {turn.agent or 'this agent'}.")
+    prompt_tokens = len(turn.history) // 4
+    output_tokens = sum(len(p.text or "") for p in response.content.parts) // 4 + 1
+    response.usage_metadata = types.GenerateContentResponseUsageMetadata(
+        prompt_token_count=prompt_tokens, candidates_token_count=output_tokens,
+        total_token_count=prompt_tokens + output_tokens)
+    return response
+
+# --- Model ---
+class OfflineGemini(Gemini):
+    """Gemini stand-in that answers from SCRIPTS with simulated latency and errors."""
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        delay = conf.offline_latency_ms + _rng.uniform(-1, 1) * conf.offline_jitter_ms
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if conf.offline_error_rate and _rng.random() < conf.offline_error_rate:
+            raise OfflineModelError("Simulated model backend failure (offline_error_rate).")
+
+        response = respond(llm_request)
+        text = response.content.parts[0].text
+        if not stream and text and conf.offline_stream_chunk_ms:
+            # Unstreamed, the whole answer is generated before anything is returned
+            await asyncio.sleep(len(text.split(" ")) * conf.offline_stream_chunk_ms / 1000)
+        if stream and text:
+            words = text.split(" ")
+            for i, word in enumerate(words):
+                yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=word + (" " if i < len(words) - 1 else ""))]),
+                                  partial=True)
+                if conf.offline_stream_chunk_ms:
+                    await asyncio.sleep(conf.offline_stream_chunk_ms / 1000)
+        yield response
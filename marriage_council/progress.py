@@ -0,0 +1,36 @@
+import contextvars
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+from google.adk.plugins.base_plugin import BasePlugin
+
+@dataclass(frozen=True)
+class AgentProgress:
+    agent_name: str
+    phase: str        # "started" | "finished"
+    elapsed_ms: float  # since the turn started
+
+# Set per turn by whoever wants updates (see AgentRegistry.iter_events); inherited by
+# AgentTool sub-runs and ParallelAgent branches, which run in the same or copied contexts.
+progress_listener: contextvars.ContextVar[Optional[Callable[[AgentProgress], None]]] = \
+    contextvars.ContextVar("progress_listener", default=None)
+turn_started: contextvars.ContextVar[float] = contextvars.ContextVar("turn_started", default=0.0)
+
+class ProgressPlugin(BasePlugin):
+    """Reports every agent start/finish, including sub-agents inside AgentTools, to the turn's listener."""
+
+    def __init__(self, name: str = "progress"):
+        super().__init__(name=name)
+
+    def _emit(self, agent_name: str, phase: str):
+        listener = progress_listener.get()
+        if listener is not None:
+            listener(AgentProgress(agent_name, phase, (time.perf_counter() - turn_started.get()) * 1000))
+
+    async def before_agent_callback(self, *, agent, callback_context):
+        self._emit(agent.name, "started")
+        return None
+
+    async def after_agent_callback(self, *, agent, callback_context):
+        self._emit(agent.name, "finished")
+        return None
@@ -0,0 +1,118 @@
+import asyncio
+import dataclasses
+import queue
+import threading
+import time
+import weakref
+from google.adk.runners import Runner
+from .config import conf
+from .progress import AgentProgress, progress_listener, turn_started
+
+_DONE = object()
+
+class AgentRegistry:
+    """Process-wide broker graph and Runner cache, shared by every UI session.
+
+    The graph is built once per AgentConfig fingerprint and rebuilt only when
+    the config changes or `invalidate()` is called. All turns run on one
+    background event loop, so the shared Gemini clients never outlive the loop
+    their connections were opened on.
+    """
+
+    def __init__(self, factory=None, plugins=None):
+        self._factory = factory
+        self._plugins = plugins
+        self._lock = threading.RLock()
+        self._fingerprint = None
+        self._agent = None
+        self._runners = weakref.WeakKeyDictionary()  # session_service -> {app_name: Runner}
+        self._loop = None
+        self.builds = 0
+
+    def _build(self):
+        if self._factory is not None:
+            return self._factory()
+        from .broker import get_broker_agent
+        return get_broker_agent()
+
+    def get_agent(self):
+        """The shared broker graph for the current config."""
+        fingerprint = dataclasses.astuple(conf)
+        with self._lock:
+            if self._agent is None or fingerprint != self._fingerprint:
+                self._agent = self._build()
+                self._fingerprint = fingerprint
+                self._runners = weakref.WeakKeyDictionary()
+                self.builds += 1
+            return self._agent
+
+    def _runner_plugins(self) -> list:
+        if self._plugins is not None:
+            return list(self._plugins)
+        from .tracing import default_plugins
+        return default_plugins()
+
+    def get_runner(self, app_name: str, session_service) -> Runner:
+        """A Runner over the shared graph, cached per session service and app name."""
+        agent = self.get_agent()
+        with self._lock:
+            runners = self._runners.setdefault(session_service, {})
+            runner = runners.get(app_name)
+            if runner is None or runner.agent is not agent:
+                runner = runners[app_name] = Runner(agent=agent, app_name=app_name, session_service=session_service,
+                                                    plugins=self._runner_plugins())
+            return runner
+
+    def invalidate(self):
+        """Controlled rebuild: the next turn constructs a fresh graph."""
+        with self._lock:
+            self._agent = None
+            self._runners = weakref.WeakKeyDictionary()
+
+    # --- Shared Event Loop ---
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="agent-registry-loop", daemon=True).start()
+            return self._loop
+
+    def run(self, coro):
+        """Runs a coroutine on the shared loop and blocks for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def iter_events(self, app_name: str, session_service, user_id: str, session_id: str, new_message,
+                    on_progress=None, **kwargs):
+        """Runs one turn on the shared loop, yielding its events in the calling thread.
+
+        `on_progress(AgentProgress)` is also called in the calling thread as each
+        agent, including sub-agents inside AgentTools, starts and finishes.
+        """
+        runner = self.get_runner(app_name, session_service)
+        events = queue.Queue()
+
+        async def pump():
+            if on_progress is not None:
+                progress_listener.set(events.put)
+                turn_started.set(time.perf_counter())
+            try:
+                async for event in runner.run_async(
+                    user_id=user_id, session_id=session_id, new_message=new_message, **kwargs
+                ):
+                    events.put(event)
+            except BaseException as e:
+                events.put(e)
+            finally:
+                events.put(_DONE)
+
+        asyncio.run_coroutine_threadsafe(pump(), self.loop)
+        while (item := events.get()) is not _DONE:
+            if isinstance(item, BaseException):
+                raise item
+            if isinstance(item, AgentProgress):
+                on_progress(item)
+                continue
+            yield item
+
+registry = AgentRegistry()
@@ -0,0 +1,140 @@
+import random
+import threading
+from dataclasses import dataclass
+from typing import Optional
+from .config import conf
+from .database import get_connection, profiles_version, profile_changes_since
+
+# Above this many pending changes it is cheaper to rebuild a pool than to patch it.
+REBUILD_THRESHOLD = 50_000
+
+@dataclass(frozen=True)
+class ProfileFilter:
+    """Which profiles a sample is drawn from. Unset fields match everything."""
+    gender: Optional[str] = None
+    location: Optional[str] = None
+    horoscope_sign: Optional[str] = None
+    clean_only: bool = False
+
+    def where(self):
+        clauses, params = [], []
+        for column in ("gender", "location", "horoscope_sign"):
+            value = getattr(self, column)
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if self.clean_only:
+            clauses.append("risk_factor = 'Clean'")
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def matches(self, row: tuple) -> bool:
+        gender, location, sign, risk = row
+        return ((not self.gender or gender == self.gender)
+                and (not self.location or location == self.location)
+                and (not self.horoscope_sign or sign == self.horoscope_sign)
+                and (not self.clean_only or risk == "Clean"))
+
+class IdPool:
+    """Dense array of ids with O(1) add, remove and uniform sampling."""
+
+    def __init__(self, ids, seq: int):
+        self.ids = list(ids)
+        self.index = {pid: i for i, pid in enumerate(self.ids)}
+        self.seq = seq
+
+    def add(self, pid: str):
+        if pid not in self.index:
+            self.index[pid] = len(self.ids)
+            self.ids.append(pid)
+
+    def discard(self, pid: str):
+        pos = self.index.pop(pid, None)
+        if pos is None:
+            return
+        last = self.ids.pop()
+        if pos < len(self.ids):
+            self.ids[pos] = last
+            self.index[last] = pos
+
+    def sample(self, k: int) -> list:
+        k = max(0, min(k, len(self.ids)))
+        return [self.ids[i] for i in random.sample(range(len(self.ids)), k)]
+
+class ProfileSampler:
+    """Uniform profile sampling without materializing the table per call.
+
+    Each filter gets an IdPool built once, then patched from the
+    `profile_changes` feed so updates made by any connection are picked up.
+    """
+
+    def __init__(self, db_name: str):
+        self.db_name = db_name
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def _build(self, conn, profile_filter: ProfileFilter) -> IdPool:
+        where, params = profile_filter.where()
+        conn.execute("BEGIN")  # one snapshot for both the ids and their version
+        try:
+            seq = profiles_version(conn)
+            ids = [r[0] for r in conn.execute(f"SELECT id FROM profiles{where}", params)]
+        finally:
+            conn.rollback()
+        return IdPool(ids, seq)
+
+    def _refresh(self, conn):
+        if not self._pools:
+            return
+        current = profiles_version(conn)
+        oldest = min(pool.seq for pool in self._pools.values())
+        if current == oldest:
+            return
+        if current < oldest or current - oldest > REBUILD_THRESHOLD:
+            self._pools.clear()  # database replaced or bulk-loaded
+            return
+
+        changes = profile_changes_since(conn, oldest)
+        touched = {pid for _, pid in changes}
+        rows = {}
+        touched_list = list(touched)
+        for i in range(0, len(touched_list), 500):
+            chunk = touched_list[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            for pid, *row in conn.execute(
+                    f"SELECT id, gender, location, horoscope_sign, risk_factor FROM profiles WHERE id IN ({marks})", chunk):
+                rows[pid] = tuple(row)
+
+        for profile_filter, pool in self._pools.items():
+            for seq, pid in changes:
+                if seq <= pool.seq:
+                    continue
+                row = rows.get(pid)
+                if row is not None and profile_filter.matches(row):
+                    pool.add(pid)
+                else:
+                    pool.discard(pid)
+            pool.seq = current
+
+    def sample(self, profile_filter: ProfileFilter, k: int = 1) -> list:
+        """Draws up to `k` distinct profile ids matching `profile_filter`."""
+        with self._lock, get_connection(self.db_name) as conn:
+            self._refresh(conn)
+            pool = self._pools.get(profile_filter)
+            if pool is None:
+                pool = self._pools[profile_filter] = self._build(conn, profile_filter)
+            return pool.sample(k)
+
+_samplers = {}
+_samplers_lock = threading.Lock()
+
+def get_sampler(db_name: str = None) -> ProfileSampler:
+    db_name = db_name or conf.db_name
+    with _samplers_lock:
+        sampler = _samplers.get(db_name)
+        if sampler is None:
+            sampler = _samplers[db_name] = ProfileSampler(db_name)
+    return sampler
+
+def sample_profile_ids(gender: str = None, k: int = 1, location: str = None,
+                       horoscope_sign: str = None, clean_only: bool = False) -> list:
+    return get_sampler().sample(ProfileFilter(gender, location, horoscope_sign, clean_only), k)
@@ -0,0 +1,57 @@
+import numpy as np
+
+# --- Utility Model ---
+# Shared by calculate_utility_score (one proposal) and find_optimal_compromise (all proposals).
+BASE_SCORE = 100
+GROOM_RELOCATION_PENALTY = 30
+BRIDE_RELOCATION_PENALTY = 20
+QUIT_JOB_PENALTY = 50
+VIABILITY_THRESHOLD = 60
+
+def score_grid(groom_loc: str, bride_loc: str, proposal_locs, career_options):
+    """Scores the full (location x career) cross-product in one NumPy pass.
+
+    Returns (groom_penalty, bride_penalty, total) arrays of shape
+    (len(proposal_locs), len(career_options)).
+    """
+    locs = np.asarray(proposal_locs, dtype=str)
+    careers = np.asarray(career_options, dtype=str)
+    groom_penalty = np.where(locs != groom_loc, GROOM_RELOCATION_PENALTY, 0)[:, None]
+    bride_penalty = (np.where(locs != bride_loc, BRIDE_RELOCATION_PENALTY, 0)[:, None]
+                     + np.where(careers == "Quit Job", QUIT_JOB_PENALTY, 0)[None, :])
+    groom_penalty = np.broadcast_to(groom_penalty, bride_penalty.shape)
+    total = BASE_SCORE - groom_penalty - bride_penalty
+    return groom_penalty, bride_penalty, total
+
+def pareto_mask(groom_penalty: np.ndarray, bride_penalty: np.ndarray) -> np.ndarray:
+    """True for proposals no other proposal beats on both sides' penalties."""
+    g = groom_penalty.ravel()
+    b = bride_penalty.ravel()
+    no_worse = (g[None, :] <= g[:, None]) & (b[None, :] <= b[:, None])
+    better = (g[None, :] < g[:, None]) | (b[None, :] < b[:, None])
+    return ~(no_worse & better).any(axis=1)
+
+def rank_proposals(groom_loc: str, bride_loc: str, proposal_locs, career_options) -> dict:
+    """Ranks every proposal by total score and marks the Pareto frontier."""
+    groom_penalty, bride_penalty, total = score_grid(groom_loc, bride_loc, proposal_locs, career_options)
+    flat_total = total.ravel()
+    on_frontier = pareto_mask(groom_penalty, bride_penalty)
+    n_careers = len(career_options)
+
+    ranked = []
+    for idx in np.argsort(-flat_total, kind="stable"):
+        score = int(flat_total[idx])
+        ranked.append({
+            "proposal_loc": str(proposal_locs[idx // n_careers]),
+            "bride_career": str(career_options[idx % n_careers]),
+            "total_score": score,
+            "groom_penalty": int(groom_penalty.flat[idx]),
+            "bride_penalty": int(bride_penalty.flat[idx]),
+            "viability": "High" if score > VIABILITY_THRESHOLD else "Low",
+            "pareto_optimal": bool(on_frontier[idx]),
+        })
+    return {
+        "best": ranked[0] if ranked else None,
+        "ranked": ranked,
+        "pareto_frontier": [p for p in ranked if p["pareto_optimal"]],
+    }
@@ -0,0 +1,132 @@
+"""Synthetic profile generator for seeding databases of any size.
+
+Columns are drawn in vectorized numpy batches from fixed-seed distributions,
+so a given (size, seed) always produces the same table. Rows are bulk-loaded
+in one transaction with write-optimized pragmas; the profiles indexes and
+change-feed triggers are dropped for the load and rebuilt afterwards.
+
+    python -m marriage_council.seeding --size 1000000 --db big.sqlite
+"""
+import argparse
+import time
+import numpy as np
+from .config import conf
+from .database import PRAGMAS, PROFILE_COLUMNS, get_connection, setup_database
+from .horoscope import SIGNS
+
+# --- Distributions ---
+LOCATIONS = (["Bangalore", "Mumbai", "Delhi", "Chennai"], [0.32, 0.28, 0.25, 0.15])
+JOBS = (["Engineer", "Doctor", "Banker", "Artist"], [0.45, 0.2, 0.2, 0.15])
+RISKS = (["Clean", "High Debt", "Fake Job"], [0.8, 0.1, 0.1])
+FAMILY_TYPES = (["Joint", "Nuclear"], [0.4, 0.6])
+# Median salary (LPA) per job, in JOBS order; salaries are log-normal around it
+MEDIAN_SALARY = np.array([24.0, 30.0, 20.0, 10.0])
+AGE = {"Male": (30.0, 3.5, 23, 45), "Female": (27.0, 3.0, 21, 40)}  # mean, sd, min, max
+
+INSERT_PROFILE_SQL = f"INSERT INTO profiles ({', '.join(PROFILE_COLUMNS)}) VALUES ({','.join('?' * len(PROFILE_COLUMNS))})"
+BULK_PRAGMAS = ("PRAGMA synchronous=OFF", "PRAGMA cache_size=-262144")
+
+def _pick(rng, choices, n):
+    values, weights = choices
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=n, p=weights)]
+
+def _columns(rng, gender: str, n: int) -> tuple:
+    mean, sd, low, high = AGE[gender]
+    ages = np.clip(np.rint(rng.normal(mean, sd, n)), low, high).astype(np.int64)
+    job_idx = rng.choice(len(JOBS[0]), size=n, p=JOBS[1])
+    salary = np.maximum(3.0, np.round(MEDIAN_SALARY[job_idx] * rng.lognormal(0.0, 0.35, n), 1))
+    return (ages.tolist(), _pick(rng, LOCATIONS, n).tolist(), np.asarray(JOBS[0], dtype=object)[job_idx].tolist(),
+            salary.tolist(), _pick(rng, FAMILY_TYPES, n).tolist(),
+            np.asarray(SIGNS, dtype=object)[rng.integers(0, len(SIGNS), n)].tolist(), _pick(rng, RISKS, n).tolist())
+
+def generate_profiles(size: int, seed: int = 0, start: int = 1, chunk_size: int = 50_000):
+    """Yields lists of profile rows: G-i/B-i pairs numbered from `start`, `size` rows in total.
+
+    Chunk k is drawn from its own seeded stream, so output is independent of
+    how many chunks a caller consumes.
+    """
+    pairs = (size + 1) // 2
+    per_chunk = max(1, chunk_size // 2)
+    for k, first in enumerate(range(0, pairs, per_chunk)):
+        rng = np.random.default_rng([seed, start, k])
+        n = min(per_chunk, pairs - first)
+        numbers = range(start + first, start + first + n)
+        grooms = zip([f"G-{i}" for i in numbers], [f"Groom_{i}" for i in numbers], ["Male"] * n, *_columns(rng, "Male", n))
+        brides = zip([f"B-{i}" for i in numbers], [f"Bride_{i}" for i in numbers], ["Female"] * n, *_columns(rng, "Female", n))
+        rows = [row for pair in zip(grooms, brides) for row in pair]
+        remaining = size - 2 * first
+        yield rows[:remaining]
+
+def _next_numbers(conn) -> tuple:
+    """Next free G-/B- numbers, each past the highest existing id of its prefix."""
+    highest = dict(conn.execute(
+        "SELECT SUBSTR(id, 1, 1), MAX(CAST(SUBSTR(id, 3) AS INTEGER)) FROM profiles"
+        " WHERE id GLOB 'G-[0-9]*' OR id GLOB 'B-[0-9]*' GROUP BY 1").fetchall())
+    return highest.get("G", 0) + 1, highest.get("B", 0) + 1
+
+def _fresh_rows(size: int, seed: int, next_groom: int, next_bride: int, chunk_size: int):
+    """`size` generated rows whose ids do not exist yet.
+
+    Pairs are numbered from the lower of the two next numbers; the leading
+    prefix's already-taken ids are skipped, which evens the genders out.
+    """
+    skip = abs(next_groom - next_bride)
+    remaining = size
+    for rows in generate_profiles(size + skip, seed, start=min(next_groom, next_bride), chunk_size=chunk_size):
+        rows = [r for r in rows if int(r[0][2:]) >= (next_groom if r[0][0] == "G" else next_bride)][:remaining]
+        remaining -= len(rows)
+        if rows:
+            yield rows
+        if not remaining:
+            return
+
+def seed_profiles(size: int, seed: int = None, db_name: str = None, chunk_size: int = 50_000) -> int:
+    """Pads the profiles table up to `size` rows; returns the number inserted."""
+    seed = conf.seed_random_state if seed is None else seed
+    with get_connection(db_name) as conn:
+        existing = conn.execute("SELECT count(*) FROM profiles").fetchone()[0]
+        if existing >= size:
+            return 0
+        first_rowid = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM profiles").fetchone()[0]
+        next_groom, next_bride = _next_numbers(conn)
+        # Explicit indexes and triggers (sql IS NULL for the primary key's autoindex)
+        deferred = conn.execute("SELECT type, name, sql FROM sqlite_master WHERE tbl_name='profiles'"
+                                " AND type IN ('index', 'trigger') AND sql IS NOT NULL").fetchall()
+        for pragma in BULK_PRAGMAS:
+            conn.execute(pragma)
+        try:
+            conn.execute("BEGIN")
+            for kind, name, _ in deferred:
+                conn.execute(f"DROP {kind.upper()} {name}")
+            for rows in _fresh_rows(size - existing, seed, next_groom, next_bride, chunk_size):
+                conn.executemany(INSERT_PROFILE_SQL, rows)
+            # The triggers were off: record the new rows in the change feed in one statement
+            conn.execute("INSERT INTO profile_changes (profile_id) SELECT id FROM profiles WHERE rowid > ? ORDER BY rowid",
+                         (first_rowid,))
+            for _, _, sql in deferred:
+                conn.execute(sql)
+            conn.commit()
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            for pragma in PRAGMAS:  # back to the pool's settings
+                conn.execute(pragma)
+    return size - existing
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed the profiles table with synthetic profiles.")
+    parser.add_argument("--size", type=int, required=True, help="Total profiles after seeding.")
+    parser.add_argument("--seed", type=int, help="Random seed (defaults to conf.seed_random_state).")
+    parser.add_argument("--db", help="Database file (defaults to conf.db_name).")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        conf.db_name = args.db
+    setup_database()
+    start = time.perf_counter()
+    inserted = seed_profiles(args.size, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"Inserted {inserted:,} profiles in {elapsed:.2f}s ({inserted / max(elapsed, 1e-9):,.0f} rows/s)")
+
+if __name__ == "__main__":
+    main()
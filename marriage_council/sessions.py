@@ -0,0 +1,211 @@
+"""Durable ADK sessions on the application's SQLite database.
+
+Sessions survive restarts and can be resumed by id. Prompt size stays
+bounded: when a new user turn starts, every turn older than
+`conf.session_keep_turns` is folded into a stored plain-text summary plus
+the structured vetting verdict (`state["verdict"]`), and the folded events
+are deleted. The summary is replayed to the model as one leading event.
+"""
+import json
+import sqlite3
+import time
+import uuid
+from typing import Any, Optional
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events import Event
+from google.adk.sessions.base_session_service import BaseSessionService, GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.session import Session
+from google.genai import types
+from .config import conf
+from .database import get_connection
+
+SUMMARY_AUTHOR = "user"
+SUMMARY_HEADER = "[Summary of earlier conversation]"
+
+# --- Compaction ---
+def _clip(text: str, limit: int = 300) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+def _split_turns(events: list) -> list:
+    """Groups events into turns, each starting at a user text message."""
+    turns = []
+    for event in events:
+        starts_turn = event.author == "user" and event.content and any(p.text for p in event.content.parts or [])
+        if starts_turn or not turns:
+            turns.append([])
+        turns[-1].append(event)
+    return turns
+
+def _verdict_from(events: list) -> Optional[dict]:
+    """The last PASS/FAIL verdict produced by the VettingPipeline in `events`."""
+    verdict = None
+    for event in events:
+        for response in event.get_function_responses():
+            if response.name != "VettingPipeline":
+                continue
+            try:
+                parsed = json.loads((response.response or {}).get("result", ""))
+            except (TypeError, ValueError):
+                continue
+            if isinstance(parsed, dict) and parsed.get("status") in ("PASS", "FAIL"):
+                verdict = parsed
+    return verdict
+
+def summarize_events(events: list) -> list:
+    """Deterministic one-line-per-step digest of folded events (no model call)."""
+    lines = []
+    for event in events:
+        for call in event.get_function_calls():
+            lines.append(f"{event.author} called {call.name}({_clip(json.dumps(call.args or {}), 200)})")
+        for response in event.get_function_responses():
+            lines.append(f"{response.name} returned {_clip(json.dumps(response.response or {}), 200)}")
+        if event.content and not event.partial:
+            text = " ".join(p.text for p in event.content.parts or [] if p.text and not p.thought)
+            if text.strip():
+                lines.append(f"{'User' if event.author == 'user' else event.author}: {_clip(text)}")
+    return lines
+
+def _summary_event(session_id: str, summary: str, verdict: Optional[dict], timestamp: float) -> Event:
+    text = SUMMARY_HEADER + "\n" + summary
+    if verdict:
+        text += "\nVetting verdict: " + json.dumps(verdict)
+    return Event(id=f"summary-{session_id}", invocation_id="compacted", author=SUMMARY_AUTHOR, timestamp=timestamp,
+                 content=types.Content(role="user", parts=[types.Part(text=text)]))
+
+# --- Session Service ---
+class SqliteSessionService(BaseSessionService):
+    """BaseSessionService over the pooled SQLite connections, with history compaction.
+
+    `app:` and `user:` state keys are stored with the session rather than shared.
+    """
+
+    def __init__(self, db_name: str = None):
+        self.db_name = db_name  # None follows conf.db_name
+
+    async def create_session(self, *, app_name: str, user_id: str, state: Optional[dict[str, Any]] = None,
+                             session_id: Optional[str] = None) -> Session:
+        session_id = (session_id or "").strip() or uuid.uuid4().hex
+        now = time.time()
+        state = dict(state or {})
+        with get_connection(self.db_name) as conn:
+            try:
+                conn.execute(
+                    "INSERT INTO chat_sessions (app_name, user_id, id, state, summary, create_time, update_time)"
+                    " VALUES (?,?,?,?,?,?,?)", (app_name, user_id, session_id, json.dumps(state), "", now, now))
+            except sqlite3.IntegrityError:
+                raise AlreadyExistsError(f"Session with id {session_id} already exists.")
+            conn.commit()
+        return Session(app_name=app_name, user_id=user_id, id=session_id, state=state, events=[], last_update_time=now)
+
+    async def get_session(self, *, app_name: str, user_id: str, session_id: str,
+                          config: Optional[GetSessionConfig] = None) -> Optional[Session]:
+        key = (app_name, user_id, session_id)
+        with get_connection(self.db_name) as conn:
+            row = conn.execute(
+                "SELECT state, summary, update_time FROM chat_sessions WHERE app_name=? AND user_id=? AND id=?",
+                key).fetchone()
+            if row is None:
+                return None
+            sql, params = ("SELECT event_data FROM session_events WHERE app_name=? AND user_id=? AND session_id=?",
+                           list(key))
+            if config and config.after_timestamp:
+                sql += " AND timestamp >= ?"
+                params.append(config.after_timestamp)
+            sql += " ORDER BY seq DESC"
+            if config and config.num_recent_events:
+                sql += " LIMIT ?"
+                params.append(config.num_recent_events)
+            blobs = [r[0] for r in conn.execute(sql, params)]
+
+        state = json.loads(row[0])
+        events = [Event.model_validate_json(blob) for blob in reversed(blobs)]
+        if row[1]:
+            first = events[0].timestamp if events else row[2]
+            events.insert(0, _summary_event(session_id, row[1], state.get("verdict"), first - 1e-3))
+        return Session(app_name=app_name, user_id=user_id, id=session_id, state=state, events=events,
+                       last_update_time=row[2])
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        sql, params = "SELECT user_id, id, state, update_time FROM chat_sessions WHERE app_name=?", [app_name]
+        if user_id is not None:
+            sql += " AND user_id=?"
+            params.append(user_id)
+        with get_connection(self.db_name) as conn:
+            rows = conn.execute(sql + " ORDER BY update_time DESC", params).fetchall()
+        return ListSessionsResponse(sessions=[
+            Session(app_name=app_name, user_id=r[0], id=r[1], state=json.loads(r[2]), events=[], last_update_time=r[3])
+            for r in rows])
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        key = (app_name, user_id, session_id)
+        with get_connection(self.db_name) as conn:
+            conn.execute("DELETE FROM session_events WHERE app_name=? AND user_id=? AND session_id=?", key)
+            conn.execute("DELETE FROM chat_sessions WHERE app_name=? AND user_id=? AND id=?", key)
+            conn.commit()
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        event = await super().append_event(session, event)
+        now = time.time()
+        key = (session.app_name, session.user_id, session.id)
+        with get_connection(self.db_name) as conn:
+            conn.execute(
+                "INSERT INTO session_events (app_name, user_id, session_id, id, invocation_id, timestamp, event_data)"
+                " VALUES (?,?,?,?,?,?,?)", (*key, event.id, event.invocation_id, event.timestamp,
+                                            event.model_dump_json(exclude_none=True)))
+            conn.execute("UPDATE chat_sessions SET state=?, update_time=? WHERE app_name=? AND user_id=? AND id=?",
+                         (json.dumps(session.state, default=str), now, *key))
+            if event.author == "user":
+                self._compact(conn, session)
+            conn.commit()
+        session.last_update_time = now
+        return event
+
+    def _compact(self, conn, session: Session):
+        """Folds turns beyond conf.session_keep_turns into the stored summary, in the DB and in memory."""
+        events = [e for e in session.events if e.invocation_id != "compacted"]
+        turns = _split_turns(events)
+        if len(turns) <= conf.session_keep_turns:
+            return
+        folded = [e for turn in turns[:-conf.session_keep_turns] for e in turn]
+        kept = [e for turn in turns[-conf.session_keep_turns:] for e in turn]
+        key = (session.app_name, session.user_id, session.id)
+
+        previous = conn.execute("SELECT summary FROM chat_sessions WHERE app_name=? AND user_id=? AND id=?",
+                                key).fetchone()[0]
+        lines = ([previous] if previous else []) + summarize_events(folded)
+        summary = "\n".join(lines)
+        if len(summary) > conf.session_summary_max_chars:  # keep the most recent history
+            summary = "...\n" + summary[-conf.session_summary_max_chars:].split("\n", 1)[-1]
+
+        verdict = _verdict_from(folded)
+        if verdict is not None:
+            session.state["verdict"] = verdict
+        ids = [e.id for e in folded]
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            conn.execute(f"DELETE FROM session_events WHERE app_name=? AND user_id=? AND session_id=?"
+                         f" AND id IN ({','.join('?' * len(chunk))})", (*key, *chunk))
+        conn.execute("UPDATE chat_sessions SET summary=?, state=? WHERE app_name=? AND user_id=? AND id=?",
+                     (summary, json.dumps(session.state, default=str), *key))
+
+        session.events[:] = [_summary_event(session.id, summary, session.state.get("verdict"),
+                                            kept[0].timestamp - 1e-3)] + kept
+
+def chat_transcript(session: Session) -> list:
+    """[{"role", "content"}] messages for redisplaying a resumed session."""
+    messages = []
+    for event in session.events:
+        if not event.content or event.partial or event.get_function_calls() or event.get_function_responses():
+            continue
+        text = "".join(p.text for p in event.content.parts or [] if p.text and not p.thought).strip()
+        if not text:
+            continue
+        role = "assistant" if event.invocation_id == "compacted" or event.author != "user" else "user"
+        if not messages or messages[-1]["role"] != role or role == "user":
+            messages.append({"role": role, "content": text})
+        else:
+            messages[-1]["content"] = text  # keep the final reply of a turn
+    return messages
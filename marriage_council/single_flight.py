@@ -0,0 +1,158 @@
+"""Coalescing of identical in-flight calls ("single flight").
+
+When several sessions or batch workers vet the same couple at once they send
+the same prompts to the model. A call whose canonical key matches one already
+running does not start its own work; it waits for the running one (the
+leader) and gets the same result or exception.
+Nothing is kept after the flight lands: the next call with that key runs
+again, so this never serves stale results the way a cache could.
+
+`AsyncSingleFlight` shares coroutines and async generators among callers on
+one event loop. Followers replay a stream from the beginning and then follow
+it live. If a caller is cancelled, only that caller stops; the shared work is
+cancelled once every caller has left.
+"""
+import asyncio
+import threading
+from contextlib import aclosing
+
+class SingleFlightStats:
+    """Leader/follower counters for one group of coalesced calls."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.leaders = self.collapsed = self.errors = self.cancelled = self.in_flight = 0
+
+    def record(self, **counts):
+        with self._lock:
+            for key, n in counts.items():
+                setattr(self, key, getattr(self, key) + n)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            calls = self.leaders + self.collapsed
+            return {
+                "leaders": self.leaders,
+                "collapsed": self.collapsed,
+                "collapse_rate": self.collapsed / calls if calls else 0.0,
+                "errors": self.errors,
+                "cancelled": self.cancelled,
+                "in_flight": self.in_flight,
+            }
+
+# --- Event Loop ---
+class _Flight:
+    """Items produced so far by one shared async generator, plus its outcome."""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.items = []
+        self.done = False
+        self.error = None
+        self.waiters = 0
+        self.task = None
+        self.changed = asyncio.Event()
+
+    def notify(self):
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+async def _once(fn):
+    yield await fn()
+
+class AsyncSingleFlight:
+    """Shares one run of a coroutine or async generator among concurrent callers on a loop."""
+
+    def __init__(self, stats: SingleFlightStats = None):
+        self.stats = stats or SingleFlightStats()
+        self._flights = {}  # key -> _Flight
+        self._lock = threading.Lock()
+
+    async def do(self, key, fn):
+        """Result of `await fn()`, shared with identical concurrent calls."""
+        items = self.stream(key, lambda: _once(fn))
+        try:
+            async for value in items:
+                return value
+        finally:
+            await items.aclose()
+
+    async def stream(self, key, fn):
+        """Items of `fn()` (an async generator), shared with identical concurrent calls."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None and flight.loop is not loop:
+                flight = None  # another loop's flight cannot be awaited here
+                joined = started = False
+            elif flight is None:
+                flight = self._flights[key] = _Flight(loop)
+                # The work runs as its own task so that it outlives any single caller
+                flight.task = loop.create_task(self._pump(key, flight, fn))
+                joined, started = True, True
+            else:
+                joined, started = True, False
+
+        if not joined:
+            self.stats.record(leaders=1)
+            async with aclosing(fn()) as items:
+                async for item in items:
+                    yield item
+            return
+        if started:
+            self.stats.record(leaders=1, in_flight=1)
+        else:
+            self.stats.record(collapsed=1)
+
+        flight.waiters += 1
+        try:
+            seen = 0
+            while True:
+                while seen < len(flight.items):
+                    seen += 1
+                    yield flight.items[seen - 1]
+                if flight.done:
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+                await flight.changed.wait()
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.done:
+                # Every caller has gone: stop the shared work and let the next call start afresh
+                self._forget(key, flight)
+                flight.task.cancel()
+                self.stats.record(cancelled=1)
+
+    async def _pump(self, key, flight: _Flight, fn):
+        try:
+            async with aclosing(fn()) as items:
+                async for item in items:
+                    flight.items.append(item)
+                    flight.notify()
+        except asyncio.CancelledError:
+            flight.error = asyncio.CancelledError()
+        except Exception as exc:
+            flight.error = exc
+            self.stats.record(errors=1)
+        finally:
+            flight.done = True
+            self._forget(key, flight)
+            self.stats.record(in_flight=-1)
+            flight.notify()
+
+    def _forget(self, key, flight: _Flight):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+# --- Shared Groups ---
+model_flights = AsyncSingleFlight()  # identical model requests (see llm_cache.CoalescingGemini)
+
+def single_flight_stats() -> dict:
+    """Counters for the observability panel."""
+    return {"model": model_flights.stats.snapshot()}
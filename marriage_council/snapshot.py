@@ -0,0 +1,289 @@
+"""Memory-mapped columnar snapshot of the profiles table.
+
+Bulk analysis (ranking, aggregates) reads whole columns instead of rows, so
+the profiles table is exported per change-feed version into one file:
+
+    MAGIC | header length (uint64) | header JSON | column arrays, 64-byte aligned
+
+age is int16 (-1 for NULL) and salary_lpa float32 (NaN for NULL). The
+categorical columns are stored as small integer codes into per-column
+dictionaries kept in the header; ids are fixed-width bytes plus a sort order
+for lookups. Opening maps the file read-only and wraps each column with
+np.frombuffer, so any number of processes open it in milliseconds and share
+the page cache. A refresh patches the previous snapshot from the
+`profile_changes` feed, writes a temp file and os.replace()s it: readers see
+either the old or the new snapshot, and mappings already open stay valid.
+
+    python -m marriage_council.snapshot --db big.sqlite
+"""
+import argparse
+import json
+import mmap
+import os
+import tempfile
+import threading
+import time
+import numpy as np
+from .config import conf
+from .database import get_connection, profiles_version, profile_changes_since
+from .sampling import ProfileFilter
+
+MAGIC = b"MCSNAP01"
+ALIGN = 64
+CATEGORICAL = ("gender", "location", "job", "family_type", "horoscope_sign", "risk_factor")
+AGE_DTYPE, SALARY_DTYPE = "<i2", "<f4"
+SELECT_COLUMNS = f"SELECT id, age, salary_lpa, {', '.join(CATEGORICAL)} FROM profiles"
+FETCH_ROWS = 100_000
+# Above this many pending changes a full export is cheaper than patching
+REBUILD_THRESHOLD = 50_000
+
+def snapshot_path(db_name: str = None) -> str:
+    return f"{db_name or conf.db_name}.profiles.snap"
+
+def _code_dtype(cardinality: int) -> str:
+    return "<u1" if cardinality <= 0xFF else "<u2" if cardinality <= 0xFFFF else "<u4"
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGN) * ALIGN
+
+def _decode_rows(rows, lookups: dict):
+    """Splits profile rows into (ids, ages, salaries, {col: codes}), growing `lookups`."""
+    columns = list(zip(*rows)) or [()] * (3 + len(CATEGORICAL))
+    n = len(rows)
+    ids = np.array(columns[0], dtype=object)
+    ages = np.fromiter((-1 if v is None else v for v in columns[1]), dtype=AGE_DTYPE, count=n)
+    salaries = np.fromiter((np.nan if v is None else v for v in columns[2]), dtype=SALARY_DTYPE, count=n)
+    codes = {}
+    for col, values in zip(CATEGORICAL, columns[3:]):
+        lookup = lookups[col]
+        codes[col] = np.fromiter((lookup.setdefault(v, len(lookup)) for v in values), dtype=np.int64, count=n)
+    return ids, ages, salaries, codes
+
+class ProfileSnapshot:
+    """Column arrays for every profile at one change-feed `version`.
+
+    `ids` holds fixed-width bytes sorted by `order`; `codes[col]` indexes
+    `dictionaries[col]` (NULL is stored as a None entry). Arrays of an
+    opened snapshot are read-only views onto the mapped file.
+    """
+
+    def __init__(self, version: int, ids, order, age, salary_lpa, codes: dict, dictionaries: dict, buffer=None):
+        self.version = version
+        self.ids = ids
+        self.order = order
+        self.age = age
+        self.salary_lpa = salary_lpa
+        self.codes = codes
+        self.dictionaries = dictionaries
+        self._buffer = buffer  # keeps the mapping alive as long as the snapshot is
+        self._index = {col: {value: i for i, value in enumerate(values)} for col, values in dictionaries.items()}
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def _from_columns(cls, version, ids, age, salary_lpa, codes, lookups):
+        ids = ids.astype("S") if len(ids) else np.empty(0, dtype="S1")
+        return cls(version, ids, np.argsort(ids, kind="stable").astype("<i8"), age, salary_lpa,
+                   {col: codes[col].astype(_code_dtype(len(lookups[col]))) for col in CATEGORICAL},
+                   {col: list(lookups[col]) for col in CATEGORICAL})
+
+    @classmethod
+    def build(cls, conn):
+        """Exports every profile in rowid order within one read transaction."""
+        lookups = {col: {} for col in CATEGORICAL}
+        parts = []
+        conn.execute("BEGIN")  # one snapshot for both the rows and their version
+        try:
+            version = profiles_version(conn)
+            cursor = conn.execute(f"{SELECT_COLUMNS} ORDER BY rowid")
+            while True:
+                rows = cursor.fetchmany(FETCH_ROWS)
+                if not rows:
+                    break
+                parts.append(_decode_rows(rows, lookups))
+        finally:
+            conn.rollback()
+        ids, ages, salaries, codes = _decode_rows([], lookups) if not parts else (
+            np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts]),
+            np.concatenate([p[2] for p in parts]),
+            {col: np.concatenate([p[3][col] for p in parts]) for col in CATEGORICAL})
+        return cls._from_columns(version, ids, ages, salaries, codes, lookups)
+
+    def refreshed(self, conn):
+        """This snapshot brought up to the database's current version.
+
+        Changed profiles are re-read and patched in place of a full export;
+        new profiles are appended and deleted ones dropped.
+        """
+        conn.execute("BEGIN")
+        try:
+            version = profiles_version(conn)
+            if version == self.version:
+                return self
+            rebuild = version < self.version or version - self.version > REBUILD_THRESHOLD
+            if not rebuild:
+                touched = sorted({pid for _, pid in profile_changes_since(conn, self.version)})
+                rows = []
+                for i in range(0, len(touched), 500):
+                    chunk = touched[i:i + 500]
+                    rows += conn.execute(f"{SELECT_COLUMNS} WHERE id IN ({','.join('?' * len(chunk))})", chunk).fetchall()
+        finally:
+            conn.rollback()
+        if rebuild:
+            return ProfileSnapshot.build(conn)  # database replaced or bulk-loaded
+
+        lookups = {col: dict(self._index[col]) for col in CATEGORICAL}
+        ids, ages, salaries, codes = _decode_rows(rows, lookups)
+        at = self.positions(list(ids))
+        found = at >= 0
+        gone = np.setdiff1d(self.positions(touched), at)
+        keep = np.ones(len(self), dtype=bool)
+        keep[gone[gone >= 0]] = False
+
+        age, salary = self.age.copy(), self.salary_lpa.copy()
+        age[at[found]], salary[at[found]] = ages[found], salaries[found]
+        merged = {}
+        for col in CATEGORICAL:
+            column = self.codes[col].astype(np.int64)
+            column[at[found]] = codes[col][found]
+            merged[col] = np.concatenate([column[keep], codes[col][~found]])
+        return self._from_columns(
+            version, np.concatenate([self.ids[keep], np.array(ids[~found].tolist(), dtype="S")]),
+            np.concatenate([age[keep], ages[~found]]), np.concatenate([salary[keep], salaries[~found]]),
+            merged, lookups)
+
+    def _arrays(self) -> dict:
+        return {"ids": self.ids, "order": self.order, "age": self.age, "salary_lpa": self.salary_lpa,
+                **{f"codes.{col}": self.codes[col] for col in CATEGORICAL}}
+
+    def save(self, path: str):
+        """Writes the snapshot to a temp file beside `path` and atomically swaps it in."""
+        arrays = self._arrays()
+        header = {"version": self.version, "rows": len(self), "dictionaries": self.dictionaries, "columns": {}}
+        # The header records the offsets, so size it with placeholder offsets first
+        placeholder = {name: {"dtype": a.dtype.str, "offset": 10 ** 15} for name, a in arrays.items()}
+        offset = _aligned(len(MAGIC) + 8 + len(json.dumps({**header, "columns": placeholder}).encode()))
+        for name, array in arrays.items():
+            header["columns"][name] = {"dtype": array.dtype.str, "offset": offset}
+            offset = _aligned(offset + array.nbytes)
+        encoded = json.dumps(header).encode()
+
+        fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + ".", dir=os.path.dirname(os.path.abspath(path)))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(MAGIC + len(encoded).to_bytes(8, "little") + encoded)
+                for name, array in arrays.items():
+                    f.write(b"\0" * (header["columns"][name]["offset"] - f.tell()))
+                    f.write(np.ascontiguousarray(array).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(tmp, 0o644)  # mkstemp creates 0600; other workers only need to read it
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    @classmethod
+    def open(cls, path: str):
+        """Maps a saved snapshot read-only; no column data is copied."""
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if buffer[:len(MAGIC)] != MAGIC:
+            buffer.close()
+            raise ValueError(f"{path} is not a profile snapshot")
+        start = len(MAGIC) + 8
+        header = json.loads(buffer[start:start + int.from_bytes(buffer[len(MAGIC):start], "little")])
+        expected = {"ids", "order", "age", "salary_lpa", *(f"codes.{col}" for col in CATEGORICAL)}
+        if set(header["columns"]) != expected:
+            buffer.close()
+            raise ValueError(f"{path} has an incompatible column layout")
+        rows = header["rows"]
+        arrays = {name: np.frombuffer(buffer, dtype=spec["dtype"], count=rows, offset=spec["offset"])
+                  for name, spec in header["columns"].items()}
+        return cls(header["version"], arrays["ids"], arrays["order"], arrays["age"], arrays["salary_lpa"],
+                   {col: arrays[f"codes.{col}"] for col in CATEGORICAL}, header["dictionaries"], buffer)
+
+    # --- Column Access ---
+    def positions(self, profile_ids) -> np.ndarray:
+        """Row index of each id (-1 where absent), by binary search over `order`."""
+        keys = np.array([str(pid).encode() for pid in profile_ids], dtype="S") if len(profile_ids) else np.empty(0, "S1")
+        if not len(self):
+            return np.full(len(keys), -1, dtype=np.int64)
+        at = self.order[np.minimum(np.searchsorted(self.ids, keys, sorter=self.order), len(self) - 1)]
+        return np.where(self.ids[at] == keys, at, -1)
+
+    def code(self, column: str, value) -> int:
+        """Dictionary code of `value` in a categorical column, or -1 if no profile has it."""
+        return self._index[column].get(value, -1)
+
+    def column(self, column: str) -> np.ndarray:
+        """Decoded values of a categorical column (an object array; copies)."""
+        return np.asarray(self.dictionaries[column], dtype=object)[self.codes[column]]
+
+    def profile_id(self, i: int) -> str:
+        return self.ids[i].decode()
+
+    def mask(self, profile_filter: ProfileFilter) -> np.ndarray:
+        """Boolean row mask for the same filters the sampler understands."""
+        keep = np.ones(len(self), dtype=bool)
+        for column in ("gender", "location", "horoscope_sign"):
+            value = getattr(profile_filter, column)
+            if value:
+                keep &= self.codes[column] == self.code(column, value)
+        if profile_filter.clean_only:
+            keep &= self.codes["risk_factor"] == self.code("risk_factor", "Clean")
+        return keep
+
+# --- Shared Snapshots ---
+_snapshots = {}  # path -> ProfileSnapshot
+_snapshots_lock = threading.Lock()
+
+def _open_existing(path: str):
+    try:
+        return ProfileSnapshot.open(path)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def get_snapshot(db_name: str = None) -> ProfileSnapshot:
+    """The snapshot for the database's current profiles version.
+
+    Reuses this process's mapping, then the file on disk (possibly refreshed
+    by another process), and only exports when both are behind.
+    """
+    db_name = db_name or conf.db_name
+    path = snapshot_path(db_name)
+    with get_connection(db_name) as conn:
+        version = profiles_version(conn)
+    with _snapshots_lock:
+        snapshot = _snapshots.get(path)
+        if snapshot is None or snapshot.version != version:
+            on_disk = _open_existing(path)
+            snapshot = on_disk if on_disk is not None else snapshot
+        if snapshot is None or snapshot.version != version:
+            with get_connection(db_name) as conn:
+                fresh = snapshot.refreshed(conn) if snapshot is not None else ProfileSnapshot.build(conn)
+            fresh.save(path)
+            # Serve the mapped file rather than `fresh`, so the pages are shared with other processes
+            snapshot = ProfileSnapshot.open(path)
+        _snapshots[path] = snapshot
+        return snapshot
+
+def close_snapshots():
+    """Drops this process's mappings (each closes once nothing references its arrays)."""
+    with _snapshots_lock:
+        _snapshots.clear()
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the profiles table to a memory-mapped snapshot.")
+    parser.add_argument("--db", default=None, help="Database file (default: the configured database)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    snapshot = get_snapshot(args.db)
+    print(f"✅ {len(snapshot):,} profiles at version {snapshot.version} -> {snapshot_path(args.db)} "
+          f"in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
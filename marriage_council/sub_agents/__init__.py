@@ -1,4 +1,11 @@
 from .vetting import get_vetting_workflow
-from .negotiators import groom_rep, bride_rep
+from .negotiation import get_negotiation_stage
 
-__all__ = ["get_vetting_workflow", "groom_rep", "bride_rep"]
+__all__ = ["get_vetting_workflow", "get_negotiation_stage", "groom_rep", "bride_rep"]
+
+def __getattr__(name):
+    # The module-level negotiators build their models on import; only do that if asked for
+    if name in ("groom_rep", "bride_rep"):
+        from . import negotiators
+        return getattr(negotiators, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,71 @@
+import asyncio
+import json
+from typing import AsyncGenerator
+from google.adk.agents import BaseAgent, ParallelAgent, SequentialAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+from ..agents import NegotiationDemands, get_groom_rep, get_bride_rep
+from ..tools import get_profile_details
+from .vetting import extract_couple_ids
+
+def _couple_from(ctx: InvocationContext):
+    text = " ".join(p.text for p in (ctx.user_content.parts if ctx.user_content else []) if p.text)
+    # The vetting fast path leaves the ids in state when the request itself does not name them
+    return extract_couple_ids(text) or extract_couple_ids(str(ctx.session.state.get("extracted_ids", "")))
+
+class ProfilePrefetchAgent(BaseAgent):
+    """Looks both profiles up once and shares them with the reps through state."""
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        couple = _couple_from(ctx)
+        if couple is None:
+            # Clear an earlier turn's couple; the reps fall back to get_profile_details themselves
+            ids, profiles = ("", ""), ("", "")
+        else:
+            ids = couple
+            profiles = await asyncio.gather(*[asyncio.to_thread(get_profile_details, pid) for pid in couple])
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={
+                "groom_id": ids[0], "bride_id": ids[1],
+                "groom_profile": profiles[0], "bride_profile": profiles[1],
+            }),
+        )
+
+class DemandMergerAgent(BaseAgent):
+    """Folds both reps' replies and the prefetched profiles into one NegotiationDemands."""
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        groom = json.loads(state.get("groom_profile") or "{}")
+        bride = json.loads(state.get("bride_profile") or "{}")
+        demands = NegotiationDemands(
+            groom_id=state.get("groom_id", ""), bride_id=state.get("bride_id", ""),
+            groom_location=groom.get("location") or "", bride_location=bride.get("location") or "",
+            bride_career=bride.get("job") or "",
+            groom_demands=str(state.get("groom_demands", "")).strip(),
+            bride_demands=str(state.get("bride_demands", "")).strip(),
+        )
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=demands.model_dump_json())]),
+            actions=EventActions(state_delta={"demands": demands.model_dump()}),
+        )
+
+def get_negotiation_stage():
+    """Phase 2 graph: one profile prefetch -> both reps in parallel -> merged demands."""
+    return SequentialAgent(
+        name="NegotiationStage",
+        description="Phase 2: Gathers the Groom's and Bride's demands concurrently and returns them merged as JSON.",
+        sub_agents=[
+            ProfilePrefetchAgent(name="profile_prefetch"),
+            ParallelAgent(name="negotiation_council", sub_agents=[get_groom_rep(), get_bride_rep()],
+                          description="Runs both representatives simultaneously."),
+            DemandMergerAgent(name="demand_merger"),
+        ],
+    )
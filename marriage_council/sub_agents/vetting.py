@@ -1,21 +1,127 @@
-from google.adk.agents import LlmAgent, ParallelAgent, SequentialAgent
-from google.adk.models.google_llm import Gemini
+import asyncio
+import json
+import re
+import threading
+import time
+from typing import AsyncGenerator
+from google.adk.agents import BaseAgent, LlmAgent, ParallelAgent, SequentialAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
 from google.adk.tools import FunctionTool
+from google.genai import types
 from ..config import conf
-from ..tools import perform_background_check, check_horoscope_compatibility
+from ..models import build_model
+from ..agents import VettingVerdict
+from ..tools import perform_background_check, check_horoscope_compatibility, get_profile_details
 
 def get_vetting_workflow():
     """Factory function to create a fresh vetting agent."""
     detective = LlmAgent(
         name="detective_agent",
-        model=Gemini(model=conf.model_fast),
+        model=build_model(conf.model_fast),
         tools=[FunctionTool(perform_background_check)],
         instruction="Receive IDs. Check background using tool `perform_background_check`. If 'High Debt' or 'Fake Job', report CRITICAL FAIL."
     )
     astrologer = LlmAgent(
         name="astrologer_agent",
-        model=Gemini(model=conf.model_fast),
+        model=build_model(conf.model_fast),
         tools=[FunctionTool(check_horoscope_compatibility)],
         instruction="Extract signs. Check compatibility using tool `check_horoscope_compatibility`. If score < 18, warn broker."
     )
-    return ParallelAgent(name="vetting_council", sub_agents=[detective, astrologer])
\ No newline at end of file
+    return ParallelAgent(name="vetting_council", sub_agents=[detective, astrologer])
+
+# --- Deterministic Fast Path ---
+PROFILE_ID_PATTERN = re.compile(r"\b([GB])-(\d+)\b", re.IGNORECASE)
+
+def extract_couple_ids(text: str):
+    """Returns (groom_id, bride_id) if the text names exactly one of each, else None."""
+    grooms, brides = set(), set()
+    for prefix, number in PROFILE_ID_PATTERN.findall(text or ""):
+        (grooms if prefix.upper() == "G" else brides).add(f"{prefix.upper()}-{int(number)}")
+    if len(grooms) != 1 or len(brides) != 1:
+        return None
+    return grooms.pop(), brides.pop()
+
+def vet_couple(groom_id: str, bride_id: str):
+    """Runs the detective and astrologer checks directly. Returns a VettingVerdict, or None if a profile is unknown."""
+    checks = {pid: perform_background_check(pid) for pid in (groom_id, bride_id)}
+    if "Error" in checks.values():
+        return None
+    groom_sign = json.loads(get_profile_details(groom_id)).get("horoscope")
+    bride_sign = json.loads(get_profile_details(bride_id)).get("horoscope")
+    horoscope = check_horoscope_compatibility(groom_sign, bride_sign)
+
+    risky = [pid for pid, result in checks.items() if result == "RISK_FOUND"]
+    status = "FAIL" if risky or horoscope == "BAD_MATCH" else "PASS"
+    reasons = [f"critical risk found for {', '.join(risky)}"] if risky else ["background checks clean"]
+    reasons.append(f"horoscope {groom_sign}/{bride_sign}: {horoscope}")
+    return VettingVerdict(status=status, summary="; ".join(reasons).capitalize() + ".")
+
+class FastPathStats:
+    """How often the zero-LLM path answers, and the latency it saves."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.fast = self.fallback = 0
+            self.fast_ms = self.fallback_ms = 0.0
+
+    def record(self, fast: bool, elapsed_ms: float):
+        with self._lock:
+            if fast:
+                self.fast += 1
+                self.fast_ms += elapsed_ms
+            else:
+                self.fallback += 1
+                self.fallback_ms += elapsed_ms
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            total = self.fast + self.fallback
+            fast_mean = self.fast_ms / self.fast if self.fast else 0.0
+            llm_mean = self.fallback_ms / self.fallback if self.fallback else None
+            return {
+                "fast_path": self.fast,
+                "llm_fallback": self.fallback,
+                "fast_path_rate": self.fast / total if total else 0.0,
+                "fast_mean_ms": fast_mean,
+                "llm_mean_ms": llm_mean,
+                # Savings are estimated against the observed LLM pipeline latency.
+                "saved_ms": self.fast * max(0.0, llm_mean - fast_mean) if llm_mean is not None else None,
+            }
+
+fast_path_stats = FastPathStats()
+
+class FastVettingAgent(BaseAgent):
+    """Answers vetting requests without model calls when the couple ids are unambiguous.
+
+    Falls back to its single sub-agent (the LLM VettingPipeline) otherwise.
+    """
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        start = time.perf_counter()
+        text = " ".join(p.text for p in (ctx.user_content.parts if ctx.user_content else []) if p.text)
+        couple = extract_couple_ids(text) if conf.vetting_fast_path else None
+        # The checks are blocking SQLite reads; keep them off the loop other sessions share
+        verdict = await asyncio.to_thread(vet_couple, *couple) if couple else None
+
+        if verdict is not None:
+            yield Event(
+                invocation_id=ctx.invocation_id,
+                author=self.name,
+                branch=ctx.branch,
+                content=types.Content(role="model", parts=[types.Part(text=verdict.model_dump_json())]),
+                actions=EventActions(state_delta={
+                    "extracted_ids": ", ".join(couple),
+                    "verdict": verdict.model_dump(),
+                }),
+            )
+            fast_path_stats.record(True, (time.perf_counter() - start) * 1000)
+            return
+
+        async for event in self.sub_agents[0].run_async(ctx):
+            yield event
+        fast_path_stats.record(False, (time.perf_counter() - start) * 1000)
@@ -0,0 +1,165 @@
+"""Per-session memoization of profile reads made by the tools.
+
+Within one chat session the broker, both reps and the vetting checks keep
+asking for the same few profile rows. ToolCachePlugin scopes a bounded LRU
+to the session for the duration of each run (AgentTool sub-runs inherit it
+through the context). The first read of each invocation compares the cache
+with the `profile_changes` feed and evicts just the profiles changed since,
+so an `UPDATE profiles ...` from any connection is seen from the next turn
+on. Later reads in the same turn are served without touching the database,
+except `fresh` reads (the background check's risk gate), which check the
+feed every time and so see a change made earlier in the turn.
+"""
+import contextvars
+import threading
+from collections import OrderedDict
+from functools import lru_cache, wraps
+from typing import Optional
+from .config import conf
+from .database import get_connection, profiles_version, profile_changes_since
+
+# Beyond this many pending changes, dropping the whole cache is cheaper than picking entries out
+CLEAR_THRESHOLD = 1000
+_MISSING = object()
+
+class ToolCacheStats:
+    """Hit/miss counters across every session cache, for the observability panel."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hits = self.misses = self.invalidated = self.evicted = 0
+
+    def record(self, **counts):
+        with self._lock:
+            for key, n in counts.items():
+                setattr(self, key, getattr(self, key) + n)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidated": self.invalidated,
+                "evicted": self.evicted,
+                "sessions": len(_sessions),
+            }
+
+tool_cache_stats = ToolCacheStats()
+
+class SessionToolCache:
+    """Bounded LRU of profile reads, kept consistent with the profile change feed."""
+
+    def __init__(self, db_name: str, max_entries: int):
+        self.db_name = db_name
+        self.max_entries = max_entries
+        self.seq = None  # change-feed position the entries are valid at
+        self.synced_for = None  # invocation whose first read last checked the feed
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _sync(self):
+        with get_connection(self.db_name) as conn:
+            current = profiles_version(conn)
+            if current == self.seq:
+                return
+            if self.seq is None or current < self.seq or current - self.seq > CLEAR_THRESHOLD:
+                stale = list(self._entries)  # first use, replaced database, or a bulk load
+            else:
+                changed = {pid for _, pid in profile_changes_since(conn, self.seq)}
+                stale = [key for key in self._entries if key[1] in changed]
+        for key in stale:
+            del self._entries[key]
+        if self.seq is not None:
+            tool_cache_stats.record(invalidated=len(stale))
+        self.seq = current
+
+    def get_or_load(self, kind: str, profile_id: str, load, invocation_id: str = None, fresh: bool = False):
+        key = (kind, profile_id)
+        with self._lock:
+            if fresh or invocation_id is None or invocation_id != self.synced_for:
+                self._sync()
+                self.synced_for = invocation_id
+            value = self._entries.get(key, _MISSING)
+            if value is not _MISSING:
+                self._entries.move_to_end(key)
+                tool_cache_stats.record(hits=1)
+                return value
+            # Loaded after the version check, so the value is at least as new as self.seq
+            value = load(profile_id)
+            self._entries[key] = value
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                tool_cache_stats.record(evicted=1)
+            tool_cache_stats.record(misses=1)
+            return value
+
+# --- Session Scope ---
+_sessions = OrderedDict()  # (db_name, app_name, user_id, session_id) -> SessionToolCache
+_sessions_lock = threading.Lock()
+MAX_SESSIONS = 1024
+
+# (cache, invocation_id that installed it); inherited by AgentTool sub-runs and parallel branches
+_current: contextvars.ContextVar[Optional[tuple]] = contextvars.ContextVar("tool_cache", default=None)
+
+def session_cache(app_name: str, user_id: str, session_id: str) -> SessionToolCache:
+    key = (conf.db_name, app_name, user_id, session_id)
+    with _sessions_lock:
+        cache = _sessions.get(key)
+        if cache is None:
+            cache = _sessions[key] = SessionToolCache(conf.db_name, conf.tool_cache_max_entries)
+            if len(_sessions) > MAX_SESSIONS:
+                _sessions.popitem(last=False)
+        _sessions.move_to_end(key)
+        return cache
+
+def clear_session_caches():
+    with _sessions_lock:
+        _sessions.clear()
+
+def profile_cached(kind: str):
+    """Memoizes a `fn(profile_id)` read in the current session's cache, if one is active.
+
+    Call the result with `fresh=True` to check the change feed first even if
+    this turn already has, for reads that must not miss an in-turn update.
+    """
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(profile_id, fresh: bool = False):
+            scope = _current.get()
+            if scope is None or scope[0].db_name != conf.db_name:
+                return fn(profile_id)
+            return scope[0].get_or_load(kind, profile_id, fn, scope[1], fresh)
+        return wrapper
+    return decorate
+
+@lru_cache(maxsize=None)
+def _plugin_class():
+    # Defined on first use so that importing tools (and this module) does not load ADK
+    from google.adk.plugins.base_plugin import BasePlugin
+
+    class ToolCachePlugin(BasePlugin):
+        """Activates the session's cache for each run; nested AgentTool runs keep the outer one."""
+
+        async def before_run_callback(self, *, invocation_context):
+            if _current.get() is None:
+                session = invocation_context.session
+                cache = session_cache(session.app_name, session.user_id, session.id)
+                _current.set((cache, invocation_context.invocation_id))
+            return None
+
+        async def after_run_callback(self, *, invocation_context):
+            scope = _current.get()
+            if scope is not None and scope[1] == invocation_context.invocation_id:
+                _current.set(None)
+
+    return ToolCachePlugin
+
+def tool_cache_plugin(name: str = "tool_cache"):
+    """Runner plugin that scopes profile reads to the running session (see default_plugins)."""
+    return _plugin_class()(name=name)
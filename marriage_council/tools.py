@@ -1,44 +1,75 @@
-import sqlite3
 import json
-import random
-from .config import conf
-from .database import log_event
+import time
+from .database import get_connection, log_event
+from .sampling import sample_profile_ids
+from .horoscope import get_table, match_label
+from .scoring import score_grid, rank_proposals, VIABILITY_THRESHOLD
+from .tool_cache import profile_cached
+from .matching import recommend
 
-def get_random_profile_id(gender: str) -> str:
-    conn = sqlite3.connect(conf.db_name)
-    cursor = conn.cursor()
+def _normalize_gender(gender: str) -> str:
     g_map = {"groom": "Male", "bride": "Female"}
-    search = g_map.get(gender.lower(), gender)
-    cursor.execute("SELECT id FROM profiles WHERE gender = ?", (search,))
-    rows = cursor.fetchall()
-    conn.close()
-    return random.choice(rows)[0] if rows else "None"
+    return g_map.get(gender.lower(), gender)
+
+def get_random_profile_id(gender: str) -> str:
+    ids = sample_profile_ids(_normalize_gender(gender), 1)
+    return ids[0] if ids else "None"
+
+def find_candidate_profiles(gender: str, k: int = 5, location: str = "", horoscope_sign: str = "", clean_only: bool = False) -> str:
+    """Draws up to k distinct random profile ids of a gender ("groom"/"bride").
+
+    Optionally restricted to a location, a horoscope sign, and profiles whose
+    risk_factor is 'Clean'.
+    """
+    ids = sample_profile_ids(_normalize_gender(gender), k, location or None, horoscope_sign or None, clean_only)
+    return json.dumps(ids)
+
+def recommend_matches(profile_id: str, k: int = 5) -> str:
+    """Ranks the k best counterparts for a groom or bride id.
+
+    Profiles with a High Debt / Fake Job risk or a BAD_MATCH horoscope are
+    excluded; the rest are scored by the best location compromise plus
+    horoscope compatibility.
+    """
+    return json.dumps(recommend(profile_id, k))
+
+@profile_cached("profile")
+def _profile_row(profile_id: str):
+    """The columns both profile tools need, memoized per session (see tool_cache.py)."""
+    with get_connection() as conn:
+        return conn.execute("SELECT id, name, age, location, job, horoscope_sign, risk_factor FROM profiles WHERE id = ?",
+                            (profile_id,)).fetchone()
 
 def get_profile_details(profile_id: str) -> str:
-    conn = sqlite3.connect(conf.db_name)
-    row = conn.execute("SELECT * FROM profiles WHERE id = ?", (profile_id,)).fetchone()
-    conn.close()
+    row = _profile_row(profile_id)
     if not row: return json.dumps({"error": "Not Found"})
     return json.dumps({
-        "id": row[0], "name": row[1], "age": row[3], "location": row[4],
-        "job": row[5], "horoscope": row[8]
+        "id": row[0], "name": row[1], "age": row[2], "location": row[3],
+        "job": row[4], "horoscope": row[5]
     })
 
 def perform_background_check(profile_id: str) -> str:
-    conn = sqlite3.connect(conf.db_name)
-    row = conn.execute("SELECT name, risk_factor FROM profiles WHERE id = ?", (profile_id,)).fetchone()
-    conn.close()
+    started = time.perf_counter()
+    row = _profile_row(profile_id, fresh=True)  # the risk gate must see a flag raised earlier in the turn
     if not row: return "Error"
-    log_event("Detective", "Background Check", f"Checked {row[0]}: {row[1]}")
-    return "RISK_FOUND" if row[1] in ["High Debt", "Fake Job"] else "CLEAN"
+    log_event("Detective", "Background Check", f"Checked {row[1]}: {row[6]}",
+              latency_ms=(time.perf_counter() - started) * 1000)
+    return "RISK_FOUND" if row[6] in ["High Debt", "Fake Job"] else "CLEAN"
 
 def check_horoscope_compatibility(sign1: str, sign2: str) -> str:
-    score = random.randint(10, 36)
-    return "BAD_MATCH" if score < 18 else "GOOD_MATCH"
+    return match_label(get_table().score(sign1, sign2))
 
 def calculate_utility_score(groom_loc: str, bride_loc: str, proposal_loc: str, bride_career: str) -> str:
-    score = 100
-    if proposal_loc != groom_loc: score -= 30
-    if proposal_loc != bride_loc: score -= 20
-    if bride_career == "Quit Job": score -= 50 
-    return json.dumps({"total_score": score, "viability": "High" if score > 60 else "Low"})
+    _, _, total = score_grid(groom_loc, bride_loc, [proposal_loc], [bride_career])
+    score = int(total[0, 0])
+    return json.dumps({"total_score": score, "viability": "High" if score > VIABILITY_THRESHOLD else "Low"})
+
+def find_optimal_compromise(groom_loc: str, bride_loc: str, candidate_locations: list[str], career_options: list[str]) -> str:
+    """Scores every (location, career) proposal in one call.
+
+    Both partners' locations are always considered. Returns the best proposal,
+    the full ranking and the Pareto frontier of groom/bride concessions.
+    """
+    locations = list(dict.fromkeys([groom_loc, bride_loc, *candidate_locations]))
+    careers = list(dict.fromkeys(career_options)) or ["Keep Job"]
+    return json.dumps(rank_proposals(groom_loc, bride_loc, locations, careers))
@@ -0,0 +1,170 @@
+"""Span tracing for the broker graph: agent runs, model calls and tool calls.
+
+TracingPlugin is installed on the Runner, so it also sees AgentTool sub-runs.
+Finished spans are queued on the shared LogSink and land in `agent_spans`
+in batches, keeping the hot path to a dict update and a queue put.
+"""
+import contextvars
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+import numpy as np
+from google.adk.plugins.base_plugin import BasePlugin
+from .config import conf
+from .database import log_sink
+from .progress import ProgressPlugin
+from .tool_cache import tool_cache_plugin
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+INSERT_SPAN_SQL = (
+    "INSERT OR REPLACE INTO agent_spans (span_id, parent_id, trace_id, kind, name, agent_name, model,"
+    " start_ts, end_ts, duration_ms, prompt_tokens, response_tokens, cache_hit, status)"
+    " VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)"
+)
+
+@dataclass
+class Span:
+    span_id: str
+    parent_id: Optional[str]
+    trace_id: str
+    kind: str              # "agent" | "model" | "tool"
+    name: str
+    agent_name: str
+    start_ts: float
+    model: Optional[str] = None
+    prompt_tokens: int = 0
+    response_tokens: int = 0
+    cache_hit: bool = False
+    parent: Optional["Span"] = field(default=None, repr=False)
+
+    def row(self, status: str) -> tuple:
+        end = time.time()
+        return (self.span_id, self.parent_id, self.trace_id, self.kind, self.name, self.agent_name, self.model,
+                self.start_ts, end, (end - self.start_ts) * 1000, self.prompt_tokens, self.response_tokens,
+                int(self.cache_hit), status)
+
+# The innermost open span of the running task; copied into ParallelAgent branches and tool tasks.
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+def _context_key(callback_context, kind: str) -> tuple:
+    ctx = callback_context._invocation_context
+    return (kind, ctx.invocation_id, ctx.branch, callback_context.agent_name)
+
+class TracingPlugin(BasePlugin):
+    """Records one span per agent invocation, model call and tool call."""
+
+    def __init__(self, name: str = "tracing"):
+        super().__init__(name=name)
+        self._open = {}
+
+    def _start(self, key, kind: str, name: str, agent_name: str) -> Span:
+        parent = _current_span.get()
+        span_id = uuid.uuid4().hex[:16]
+        span = Span(span_id=span_id, parent_id=parent.span_id if parent else None,
+                    trace_id=parent.trace_id if parent else span_id, kind=kind, name=name,
+                    agent_name=agent_name, start_ts=time.time(), parent=parent)
+        self._open[key] = span
+        _current_span.set(span)
+        return span
+
+    def _finish(self, key, status: str = "OK") -> Optional[Span]:
+        span = self._open.pop(key, None)
+        if span is None:
+            return None
+        log_sink.submit(conf.db_name, span.row(status), INSERT_SPAN_SQL)
+        if _current_span.get() is span:
+            _current_span.set(span.parent)
+        return span
+
+    # --- Agents ---
+    async def before_agent_callback(self, *, agent, callback_context):
+        self._start(_context_key(callback_context, "agent"), "agent", agent.name, agent.name)
+        return None
+
+    async def after_agent_callback(self, *, agent, callback_context):
+        self._finish(_context_key(callback_context, "agent"))
+        return None
+
+    # --- Models ---
+    async def before_model_callback(self, *, callback_context, llm_request):
+        span = self._start(_context_key(callback_context, "model"), "model",
+                           llm_request.model or "", callback_context.agent_name)
+        span.model = llm_request.model
+        return None
+
+    async def after_model_callback(self, *, callback_context, llm_response):
+        if llm_response.partial:
+            return None
+        key = _context_key(callback_context, "model")
+        span = self._open.get(key)
+        if span is not None:
+            usage = llm_response.usage_metadata
+            if usage is not None:
+                span.prompt_tokens = usage.prompt_token_count or 0
+                span.response_tokens = usage.candidates_token_count or 0
+            span.cache_hit = bool((llm_response.custom_metadata or {}).get("cache_hit"))
+        self._finish(key, "ERROR" if llm_response.error_code else "OK")
+        return None
+
+    async def on_model_error_callback(self, *, callback_context, llm_request, error):
+        self._finish(_context_key(callback_context, "model"), "ERROR")
+        return None
+
+    # --- Tools ---
+    async def before_tool_callback(self, *, tool, tool_args, tool_context):
+        self._start(("tool", tool_context.function_call_id), "tool", tool.name, tool_context.agent_name)
+        return None
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result):
+        self._finish(("tool", tool_context.function_call_id))
+        return None
+
+    async def on_tool_error_callback(self, *, tool, tool_args, tool_context, error):
+        self._finish(("tool", tool_context.function_call_id), "ERROR")
+        return None
+
+def default_plugins() -> list:
+    """Runner plugins implied by the current config."""
+    plugins = [ProgressPlugin()]
+    if conf.tool_cache_enabled:
+        plugins.append(tool_cache_plugin())
+    if conf.tracing_enabled:
+        plugins.append(TracingPlugin())
+    return plugins
+
+# --- Dashboard Queries ---
+# Both walk an index backwards (idx_agent_spans_start / idx_agent_spans_root) instead of sorting the table
+LATEST_SPANS_SQL = "SELECT kind, name, duration_ms FROM agent_spans ORDER BY start_ts DESC LIMIT ?"
+TURN_TOTALS_SQL = """
+    SELECT datetime(MIN(start_ts), 'unixepoch', 'localtime') AS started,
+           MAX(duration_ms) AS turn_ms,
+           SUM(kind = 'model') AS model_calls,
+           SUM(prompt_tokens) AS prompt_tokens,
+           SUM(response_tokens) AS response_tokens,
+           SUM(cache_hit) AS cache_hits
+    FROM agent_spans
+    WHERE trace_id IN (SELECT span_id FROM agent_spans WHERE parent_id IS NULL
+                       ORDER BY start_ts DESC LIMIT ?)
+    GROUP BY trace_id ORDER BY MIN(start_ts) DESC"""
+
+# pandas is imported on first use: only the dashboard needs it, not the Runner hot path
+def agent_latency_percentiles(conn, window: int = 5000) -> "pd.DataFrame":
+    """p50/p95 duration per (kind, name) over the most recent `window` spans."""
+    import pandas as pd
+    spans = pd.read_sql(LATEST_SPANS_SQL, conn, params=(window,))
+    if spans.empty:
+        return pd.DataFrame(columns=["kind", "name", "count", "p50_ms", "p95_ms"])
+    grouped = spans.groupby(["kind", "name"])["duration_ms"]
+    return pd.DataFrame({
+        "count": grouped.size(),
+        "p50_ms": grouped.agg(lambda d: np.percentile(d, 50)),
+        "p95_ms": grouped.agg(lambda d: np.percentile(d, 95)),
+    }).reset_index().sort_values(["kind", "p95_ms"], ascending=[True, False])
+
+def tokens_per_turn(conn, turns: int = 20) -> "pd.DataFrame":
+    """Model calls and token totals for each of the latest `turns` traces."""
+    import pandas as pd
+    return pd.read_sql(TURN_TOTALS_SQL, conn, params=(turns,))
@@ -20,7 +20,7 @@ from google.adk.models.google_llm import Gemini
 
 # Import system components
 from marriage_council.broker import get_broker_agent
-from marriage_council.database import setup_database
+from marriage_council.database import setup_database, close_connections, flush_logs
 from marriage_council.config import conf
 from marriage_council.tools import perform_background_check
 
@@ -84,11 +84,14 @@ class AgentLogicTest(unittest.IsolatedAsyncioTestCase):
 
    async def asyncTearDown(self):
        conf.db_name = self.original_db_name
+       flush_logs()
+       close_connections(self.test_db_file)
        gc.collect()
-       if os.path.exists(self.test_db_file):
-           try:
-               os.remove(self.test_db_file)
-           except OSError: pass
+       for path in (self.test_db_file, f"{self.test_db_file}-wal", f"{self.test_db_file}-shm"):
+           if os.path.exists(path):
+               try:
+                   os.remove(path)
+               except OSError: pass
 
    # --- 1. UNIT TEST: DETECTIVE LOGIC ---
    async def test_detective_tool_logic(self):
@@ -121,7 +124,9 @@ class AgentLogicTest(unittest.IsolatedAsyncioTestCase):
       
        mock_agent = build_mock_vetting_agent("PASS")
       
-       with patch('marriage_council.broker.SequentialAgent', return_value=mock_agent):
+       # The deterministic fast path would bypass the mocked pipeline
+       with patch('marriage_council.broker.SequentialAgent', return_value=mock_agent), \
+            patch.object(conf, 'vetting_fast_path', False):
            await self.run_broker_scenario(
                "Identify Groom G-1 and Bride B-1. Run vetting.",
                "VERDICT: VETTING PASSED"
@@ -133,7 +138,9 @@ class AgentLogicTest(unittest.IsolatedAsyncioTestCase):
       
        mock_agent = build_mock_vetting_agent("FAIL")
       
-       with patch('marriage_council.broker.SequentialAgent', return_value=mock_agent):
+       # The deterministic fast path would bypass the mocked pipeline
+       with patch('marriage_council.broker.SequentialAgent', return_value=mock_agent), \
+            patch.object(conf, 'vetting_fast_path', False):
            await self.run_broker_scenario(
                "Identify Groom G-8 and Bride B-1. Run vetting.",
                "VERDICT: MATCH REJECTED"
@@ -0,0 +1,105 @@
+import asyncio
+import json
+import os
+import sqlite3
+import time
+import unittest
+import uuid
+from unittest.mock import patch
+
+import httpx
+
+from marriage_council.api import BrokerService, create_app
+from marriage_council.config import conf
+from marriage_council.database import setup_database, close_connections, flush_logs
+
+
+class BrokerApiTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.test_db_file = f"test_db_{uuid.uuid4().hex}.sqlite"
+        self.original_db_name = conf.db_name
+        conf.db_name = self.test_db_file
+        setup_database()
+
+        conn = sqlite3.connect(conf.db_name)
+        conn.execute("UPDATE profiles SET risk_factor='Clean'")
+        conn.execute("UPDATE profiles SET risk_factor='Fake Job' WHERE id='G-8'")
+        conn.execute("UPDATE profiles SET horoscope_sign='Leo'")
+        conn.commit()
+        conn.close()
+
+        self.patches = [patch.object(conf, "model_backend", "offline"),
+                        patch.object(conf, "tracing_enabled", False)]
+        for p in self.patches:
+            p.start()
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=create_app(BrokerService())),
+                                        base_url="http://test")
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        for p in reversed(self.patches):
+            p.stop()
+        conf.db_name = self.original_db_name
+        flush_logs()
+        close_connections(self.test_db_file)
+        for path in (self.test_db_file, f"{self.test_db_file}-wal", f"{self.test_db_file}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    async def test_vet_then_negotiate_in_one_session(self):
+        print("\n🔵 TEST: API Vet and Negotiate")
+        vet = (await self.client.post("/vet", json={"groom_id": "G-8", "bride_id": "B-1"})).json()
+        self.assertEqual(vet["verdict"]["status"], "FAIL")
+        self.assertIn("VettingPipeline", vet["tool_calls"])
+
+        deal = (await self.client.post("/negotiate", json={
+            "groom_location": "Delhi", "bride_location": "Bangalore", "bride_career": "Doctor",
+            "proposal_location": "Delhi"})).json()
+        self.assertIn("MATCH SUCCESSFUL", deal["reply"])
+
+        plea = (await self.client.post("/chat", json={"session_id": vet["session_id"],
+                                                      "message": "Please reconsider!"})).json()
+        self.assertEqual(plea["session_id"], vet["session_id"])
+        self.assertIn("decision is final", plea["reply"])
+
+        missing = await self.client.post("/chat", json={"session_id": "nope", "message": "hi"})
+        self.assertEqual(missing.status_code, 404)
+        print("✅ PASS")
+
+    async def test_sessions_run_concurrently(self):
+        print("\n🔵 TEST: API Concurrency")
+        with patch.object(conf, "offline_latency_ms", 100):
+            start = time.perf_counter()
+            responses = await asyncio.gather(*[
+                self.client.post("/vet", json={"groom_id": f"G-{i}", "bride_id": f"B-{i}"}) for i in range(1, 11)])
+            elapsed = time.perf_counter() - start
+        self.assertTrue(all(r.status_code == 200 for r in responses))
+        self.assertEqual(len({r.json()["session_id"] for r in responses}), 10)
+        # Each turn makes at least one 100 ms model call; serial execution would take >= 1 s
+        self.assertLess(elapsed, 0.8)
+        print(f"   10 sessions in {elapsed * 1000:.0f} ms")
+        print("✅ PASS")
+
+    async def test_chat_stream_emits_server_sent_events(self):
+        print("\n🔵 TEST: API Event Stream")
+        with patch.object(conf, "vetting_fast_path", False):
+            async with self.client.stream("POST", "/chat/stream", json={
+                    "message": "Identify Groom G-1 and Bride B-1. Run vetting."}) as response:
+                kinds, payloads = [], []
+                async for line in response.aiter_lines():
+                    if line.startswith("event: "):
+                        kinds.append(line[7:])
+                    elif line.startswith("data: "):
+                        payloads.append(json.loads(line[6:]))
+        self.assertEqual((kinds[0], kinds[-1]), ("session", "done"))
+        progress = [p["agent_name"] for k, p in zip(kinds, payloads) if k == "progress"]
+        self.assertIn("detective_agent", progress)
+        self.assertIn("tool_call", kinds)
+        final = [p for k, p in zip(kinds, payloads) if k == "final"]
+        self.assertEqual(final[-1]["verdict"]["status"], "PASS")
+        print("✅ PASS")
+
+
+if __name__ == "__main__":
+    unittest.main()
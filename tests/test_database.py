@@ -0,0 +1,330 @@
+import json
+import os
+import sqlite3
+import unittest
+import uuid
+from datetime import datetime, timedelta
+
+from marriage_council.config import conf
+from marriage_council.database import (
+    setup_database, get_connection, close_connections, LogSink, log_event, flush_logs, log_sink,
+    schema_version, SCHEMA_VERSION
+)
+from marriage_council.log_store import activity_summary, append_logs, partitions, prune_logs
+from marriage_council.log_tail import LogTail
+from marriage_council.sampling import get_sampler, ProfileFilter
+from marriage_council.seeding import generate_profiles, seed_profiles
+from marriage_council.tools import get_random_profile_id, find_candidate_profiles
+
+
+class DatabaseTest(unittest.TestCase):
+
+    def setUp(self):
+        self.test_db_file = f"test_db_{uuid.uuid4().hex}.sqlite"
+        self.original_db_name = conf.db_name
+        conf.db_name = self.test_db_file
+        setup_database()
+
+    def tearDown(self):
+        flush_logs()
+        close_connections(self.test_db_file)
+        conf.db_name = self.original_db_name
+        for path in (self.test_db_file, f"{self.test_db_file}-wal", f"{self.test_db_file}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    # --- 1. CONNECTION POOL ---
+    def test_pool_reuses_connections(self):
+        print("\n🔵 TEST: Pooled Connection Reuse")
+        with get_connection() as first:
+            mode = first.execute("PRAGMA journal_mode").fetchone()[0]
+        with get_connection() as second:
+            self.assertIs(first, second)
+        self.assertEqual(mode, "wal")
+        print("✅ PASS")
+
+    # --- 2. LOG SINK ---
+    def test_log_event_is_batched_and_flushed(self):
+        print("\n🔵 TEST: Batched Log Sink")
+        before = log_sink.stats()["written"]
+        for i in range(50):
+            log_event("Detective", "Background Check", f"row {i}")
+        self.assertTrue(flush_logs())
+
+        with get_connection() as conn:
+            count = conn.execute("SELECT count(*) FROM agent_logs").fetchone()[0]
+        self.assertEqual(count, 50)
+        self.assertEqual(log_sink.stats()["written"] - before, 50)
+        print("✅ PASS")
+
+    def test_full_queue_counts_drops(self):
+        print("\n🔵 TEST: Log Sink Backpressure")
+        sink = LogSink(max_queue=1, put_timeout=0)
+        sink._ensure_started = lambda: None  # Keep the writer stopped so the queue stays full
+        row = ("now", "Detective", "Background Check", "x")
+        self.assertTrue(sink.submit(self.test_db_file, row))
+        self.assertFalse(sink.submit(self.test_db_file, row))
+        self.assertEqual(sink.stats()["dropped"], 1)
+        print("✅ PASS")
+
+    def test_failed_writes_are_counted(self):
+        print("\n🔵 TEST: Log Sink Write Failures")
+        sink = LogSink()
+        missing_dir_db = os.path.join(f"missing_{uuid.uuid4().hex}", "x.sqlite")
+        sink.submit(missing_dir_db, ("now", "Detective", "Background Check", "x"))
+        sink.close()
+        self.assertEqual(sink.stats()["failed"], 1)
+        close_connections(missing_dir_db)
+        print("✅ PASS")
+
+    def test_writer_survives_malformed_rows(self):
+        print("\n🔵 TEST: Log Sink Survives Bad Rows")
+        sink = LogSink()
+        sink.submit(self.test_db_file, ("now", "Detective"))  # too short to unpack: not a sqlite3.Error
+        self.assertTrue(sink.flush())
+        self.assertEqual(sink.stats()["failed"], 1)
+        sink.submit(self.test_db_file, ("now", "Detective", "Background Check", "after"))
+        self.assertTrue(sink.flush())
+        sink.close()
+        self.assertEqual(sink.stats()["written"], 1)
+        print("✅ PASS")
+
+    def test_log_tail_reads_only_new_rows(self):
+        print("\n🔵 TEST: Incremental Log Tail")
+        tail = LogTail(self.test_db_file, capacity=10)
+        for i in range(25):
+            log_event("Detective" if i % 2 else "Broker", "Background Check", f"row {i}")
+        flush_logs()
+        self.assertEqual(tail.poll(), 10)  # only the newest `capacity` rows are read
+        self.assertEqual(tail.recent(limit=1)[0][4], "row 24")
+        self.assertEqual([r[4] for r in tail.recent("Detective", limit=2)], ["row 23", "row 21"])
+
+        self.assertEqual(tail.poll(), 0)
+        log_event("Detective", "Background Check", "row 25")
+        flush_logs()
+        self.assertEqual(tail.poll(), 1)
+        self.assertEqual(tail.rows_fetched, 11)
+
+        with get_connection() as conn:
+            prune_logs(conn, retention_days=1, today=datetime.now() + timedelta(days=2))  # every partition expires
+        tail.poll()
+        self.assertEqual(tail.recent(), [])
+        print("✅ PASS")
+
+    def test_log_tail_falls_back_when_an_agent_is_evicted(self):
+        print("\n🔵 TEST: Log Tail Per-Agent Fallback")
+        tail = LogTail(self.test_db_file, capacity=10)
+        for i in range(3):
+            log_event("Detective", "Background Check", f"check {i}")
+        flush_logs()
+        tail.poll()
+        self.assertEqual(len(tail.recent("Detective", limit=5)), 3)
+        self.assertEqual(tail.fallback_reads, 0)  # the ring still holds every row
+
+        for i in range(30):
+            log_event("Broker", "Turn", f"turn {i}")
+        flush_logs()
+        tail.poll()
+        self.assertEqual([r[4] for r in tail.recent("Detective", limit=2)], ["check 2", "check 1"])
+        self.assertEqual(tail.fallback_reads, 1)
+        self.assertEqual(len(tail.recent("Broker", limit=5)), 5)
+        self.assertEqual(tail.fallback_reads, 1)
+        print("✅ PASS")
+
+    # --- 3. PROFILE SAMPLING ---
+    def test_sampling_by_gender_and_k_distinct(self):
+        print("\n🔵 TEST: Profile Sampling")
+        self.assertTrue(get_random_profile_id("groom").startswith("G-"))
+        self.assertTrue(get_random_profile_id("Female").startswith("B-"))
+
+        brides = json.loads(find_candidate_profiles("bride", k=25))
+        self.assertEqual(len(brides), 10)
+        self.assertEqual(len(set(brides)), 10)
+        print("✅ PASS")
+
+    def test_sampler_follows_external_updates(self):
+        print("\n🔵 TEST: Incremental Sampler Refresh")
+        clean = ProfileFilter(gender="Male", clean_only=True)
+        get_sampler().sample(clean, 10)  # build the pool
+
+        # Writes from an unrelated connection must show up via the change feed
+        conn = sqlite3.connect(conf.db_name)
+        conn.execute("UPDATE profiles SET risk_factor='Clean' WHERE gender='Male'")
+        conn.execute("UPDATE profiles SET risk_factor='Fake Job' WHERE id='G-8'")
+        conn.execute("INSERT INTO profiles VALUES ('G-11','Groom_11','Male',30,'Delhi','Doctor',30.0,'Joint','Leo','Clean')")
+        conn.commit()
+        conn.close()
+
+        ids = set(get_sampler().sample(clean, 100))
+        self.assertNotIn("G-8", ids)
+        self.assertIn("G-11", ids)
+        self.assertEqual(len(ids), 10)
+        print("✅ PASS")
+
+    # --- 4. SYNTHETIC SEEDING ---
+    def test_seeding_is_deterministic_and_keeps_change_feed(self):
+        print("\n🔵 TEST: Bulk Profile Seeding")
+        first = [r for chunk in generate_profiles(1000, seed=3, chunk_size=128) for r in chunk]
+        again = [r for chunk in generate_profiles(1000, seed=3, chunk_size=128) for r in chunk]
+        self.assertEqual(first, again)
+        self.assertEqual(len({r[0] for r in first}), 1000)
+
+        clean = ProfileFilter(gender="Female", clean_only=True)
+        before = len(get_sampler().sample(clean, 100))
+        self.assertEqual(seed_profiles(20_001, seed=3), 19_981)
+        with get_connection() as conn:
+            counts = dict(conn.execute("SELECT gender, count(*) FROM profiles GROUP BY gender").fetchall())
+            clean_share = conn.execute("SELECT avg(risk_factor = 'Clean') FROM profiles").fetchone()[0]
+            triggers = conn.execute("SELECT count(*) FROM sqlite_master WHERE type='trigger' AND tbl_name='profiles'").fetchone()[0]
+        self.assertEqual(counts, {"Male": 10_001, "Female": 10_000})
+        self.assertAlmostEqual(clean_share, 0.8, delta=0.02)
+        self.assertEqual(triggers, 3)
+        # The sampler sees the bulk load through the change feed
+        self.assertGreater(len(get_sampler().sample(clean, 100)), before)
+        print("✅ PASS")
+
+    def test_seeding_grows_from_an_odd_count(self):
+        print("\n🔵 TEST: Seeding Past Unpaired Profiles")
+        self.assertEqual(seed_profiles(21, seed=3), 1)  # G-11 has no bride yet
+        self.assertEqual(seed_profiles(30, seed=3), 9)
+        conn = sqlite3.connect(conf.db_name)
+        conn.execute("INSERT INTO profiles (id, name, gender) VALUES ('B-40', 'Bride_40', 'Female')")
+        conn.commit()
+        conn.close()
+        self.assertEqual(seed_profiles(41, seed=3), 10)  # brides now lead; grooms catch up first
+        with get_connection() as conn:
+            ids = [r[0] for r in conn.execute("SELECT id FROM profiles")]
+            counts = dict(conn.execute("SELECT gender, count(*) FROM profiles GROUP BY gender").fetchall())
+        self.assertEqual(len(ids), 41)
+        self.assertIn("B-15", ids)
+        self.assertIn("G-25", ids)
+        self.assertEqual(counts, {"Male": 25, "Female": 16})
+        print("✅ PASS")
+
+
+class LogStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.test_db_file = f"test_db_{uuid.uuid4().hex}.sqlite"
+        self.original_db_name = conf.db_name
+        conf.db_name = self.test_db_file
+        setup_database()
+
+    def tearDown(self):
+        flush_logs()
+        close_connections(self.test_db_file)
+        conf.db_name = self.original_db_name
+        for path in (self.test_db_file, f"{self.test_db_file}-wal", f"{self.test_db_file}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_rows_land_in_day_partitions_behind_the_view(self):
+        print("\n🔵 TEST: Day-Partitioned Logs")
+        with get_connection() as conn:
+            append_logs(conn, [("2026-10-16T23:59:59", "Detective", "Background Check", "late"),
+                               ("2026-10-17T00:00:01", "Detective", "Background Check", "early")], retention_days=0)
+            append_logs(conn, [("2026-10-17T09:30:00", "Broker", "Turn", "x")], retention_days=0)
+            self.assertEqual(partitions(conn), ["agent_logs_p20261016", "agent_logs_p20261017"])
+            rows = conn.execute("SELECT id, details FROM agent_logs ORDER BY id").fetchall()
+            self.assertEqual([r[1] for r in rows], ["late", "early", "x"])
+            self.assertEqual([r[0] for r in rows], sorted(r[0] for r in rows))
+
+        # log_event keeps its signature and LogTail keeps following the newest ids
+        tail = LogTail(self.test_db_file, capacity=10)
+        tail.poll()
+        log_event("Detective", "Background Check", "today")
+        flush_logs()
+        self.assertEqual(tail.poll(), 1)
+        self.assertEqual(tail.recent(limit=1)[0][4], "today")
+        print("✅ PASS")
+
+    def test_rollups_aggregate_per_minute(self):
+        print("\n🔵 TEST: Per-Minute Log Rollups")
+        now = datetime.now().replace(second=0, microsecond=0)
+        stamp = lambda s: (now + timedelta(seconds=s)).isoformat()
+        with get_connection() as conn:
+            append_logs(conn, [(stamp(1), "Detective", "Background Check", "a", 10.0, False),
+                               (stamp(2), "Detective", "Background Check", "b", 30.0, True)])
+            append_logs(conn, [(stamp(3), "Detective", "Background Check", "c"),
+                               (stamp(4), "Broker", "Turn", "d", 5.0)])
+            minute = conn.execute("SELECT events, errors, latency_count, latency_sum, latency_min, latency_max"
+                                  " FROM agent_log_rollups WHERE agent_name = 'Detective'").fetchall()
+            self.assertEqual(minute, [(3, 1, 2, 40.0, 10.0, 30.0)])
+            summary = activity_summary(conn, minutes=5, now=now + timedelta(minutes=1))
+        self.assertEqual(summary, [("Detective", "Background Check", 3, 1, 20.0, 10.0, 30.0),
+                                   ("Broker", "Turn", 1, 0, 5.0, 5.0, 5.0)])
+        print("✅ PASS")
+
+    def test_retention_drops_old_partitions(self):
+        print("\n🔵 TEST: Log Retention")
+        today = datetime.now()
+        days = [(today - timedelta(days=n)).isoformat() for n in (40, 10, 1)]
+        with get_connection() as conn:
+            append_logs(conn, [(ts, "Detective", "Background Check", ts) for ts in days], retention_days=0)
+            result = prune_logs(conn, retention_days=7, rollup_retention_days=30)
+            self.assertEqual(result, {"partitions_dropped": 2, "rollups_deleted": 1})
+            self.assertEqual([r[0] for r in conn.execute("SELECT details FROM agent_logs")], [days[2]])
+            self.assertEqual(conn.execute("SELECT count(*) FROM agent_log_rollups").fetchone()[0], 2)
+
+            # A writer opening a new day's partition applies the policy by itself
+            append_logs(conn, [((today - timedelta(days=20)).isoformat(), "Detective", "x", "old")], retention_days=0)
+            append_logs(conn, [(today.isoformat(), "Detective", "x", "new")], retention_days=7)
+            self.assertEqual(len(partitions(conn)), 2)
+        print("✅ PASS")
+
+
+class MigrationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.test_db_file = f"test_db_{uuid.uuid4().hex}.sqlite"
+        self.original_db_name = conf.db_name
+        conf.db_name = self.test_db_file
+
+    def tearDown(self):
+        flush_logs()
+        close_connections(self.test_db_file)
+        conf.db_name = self.original_db_name
+        for path in (self.test_db_file, f"{self.test_db_file}-wal", f"{self.test_db_file}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_legacy_database_is_upgraded_in_place(self):
+        print("\n🔵 TEST: Schema Migration")
+        # A version-1 file as written by earlier releases
+        conn = sqlite3.connect(self.test_db_file)
+        conn.execute("CREATE TABLE profiles (id TEXT PRIMARY KEY, name TEXT, gender TEXT, age INTEGER, location TEXT,"
+                     " job TEXT, salary TEXT, family_type TEXT, horoscope_sign TEXT, risk_factor TEXT)")
+        conn.execute("CREATE TABLE agent_logs (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT,"
+                     " agent_name TEXT, action TEXT, details TEXT)")
+        conn.executemany("INSERT INTO profiles (rowid, id, name, gender, age, location, job, salary, family_type,"
+                         " horoscope_sign, risk_factor) VALUES (?,?,?,?,?,?,?,?,?,?,?)", [
+                             (5, "G-1", "Groom_1", "Male", 29, "Delhi", "Engineer", "30 LPA", "Joint", "Leo", "Clean"),
+                             (9, "B-1", "Bride_1", "Female", 27, "Mumbai", "Doctor", "", "Nuclear", "Aries", "High Debt")])
+        conn.execute("INSERT INTO agent_logs (timestamp, agent_name, action, details) VALUES ('t', 'Detective', 'a', 'd')")
+        conn.commit()
+        conn.close()
+
+        setup_database()
+        setup_database()  # idempotent
+        with get_connection() as conn:
+            self.assertEqual(schema_version(conn), SCHEMA_VERSION)
+            rows = conn.execute("SELECT rowid, id, salary_lpa FROM profiles ORDER BY rowid").fetchall()
+            self.assertEqual(rows, [(5, "G-1", 30.0), (9, "B-1", None)])  # not re-seeded
+            self.assertEqual(conn.execute("SELECT count(*) FROM agent_logs").fetchone()[0], 1)
+
+            plan = " ".join(r[-1] for r in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM agent_logs WHERE agent_name = 'Detective' ORDER BY id DESC LIMIT 5"))
+            self.assertIn("idx_agent_logs_agent", plan)
+            plan = " ".join(r[-1] for r in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM profiles WHERE gender = 'Male' AND risk_factor = 'Clean'"))
+            self.assertIn("COVERING INDEX idx_profiles_gender_risk", plan)
+
+            # The change-feed triggers were rebuilt on the new table
+            conn.execute("UPDATE profiles SET risk_factor = 'Clean' WHERE id = 'B-1'")
+            conn.commit()
+            self.assertEqual(conn.execute("SELECT profile_id FROM profile_changes").fetchall(), [("B-1",)])
+        print("✅ PASS")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import unittest
+import uuid
+from unittest.mock import patch
+
+from google.adk.models.google_llm import Gemini
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from marriage_council.config import conf
+from marriage_council.database import close_connections
+from marriage_council.llm_cache import CachedGemini, cache_key, get_response_cache
+from marriage_council.models import build_model
+
+
+def make_request(text, call_id=None):
+    parts = [types.Part(text=text)]
+    if call_id:
+        parts.append(types.Part(function_response=types.FunctionResponse(
+            id=call_id, name="perform_background_check", response={"result": "CLEAN"})))
+    return LlmRequest(
+        model=conf.model_fast,
+        contents=[types.Content(role="user", parts=parts)],
+        config=types.GenerateContentConfig(system_instruction="You are the Data Extractor."),
+    )
+
+
+class LlmCacheTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.cache_file = f"test_cache_{uuid.uuid4().hex}.sqlite"
+        self.patches = [patch.object(conf, "llm_cache_path", self.cache_file),
+                        patch.object(conf, "llm_cache_enabled", True),
+                        patch.object(conf, "model_backend", "gemini")]
+        for p in self.patches:
+            p.start()
+        self.backend_calls = 0
+
+        async def fake_backend(model, llm_request, stream=False):
+            self.backend_calls += 1
+            yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="G-1, B-1")]))
+
+        self.patches.append(patch.object(Gemini, "generate_content_async", fake_backend))
+        self.patches[-1].start()
+
+    async def asyncTearDown(self):
+        for p in reversed(self.patches):
+            p.stop()
+        close_connections(self.cache_file)
+        for path in (self.cache_file, f"{self.cache_file}-wal", f"{self.cache_file}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    async def generate(self, model, request):
+        return [r async for r in model.generate_content_async(request)]
+
+    async def test_identical_requests_hit_the_cache(self):
+        print("\n🔵 TEST: LLM Response Cache")
+        model = build_model(conf.model_fast)
+        self.assertIsInstance(model, CachedGemini)
+
+        first = await self.generate(model, make_request("Find ids", call_id="adk-1"))
+        second = await self.generate(model, make_request("Find ids", call_id="adk-2"))
+        self.assertEqual(self.backend_calls, 1)
+        self.assertEqual(second[0].content.parts[0].text, first[0].content.parts[0].text)
+        self.assertTrue(second[0].custom_metadata["cache_hit"])
+
+        await self.generate(model, make_request("Something else"))
+        self.assertEqual(self.backend_calls, 2)
+        stats = get_response_cache().stats()
+        self.assertEqual((stats["memory_hits"], stats["misses"]), (1, 2))
+        print("✅ PASS")
+
+    async def test_disk_tier_and_ttl(self):
+        print("\n🔵 TEST: LLM Cache Disk Tier + TTL")
+        model = build_model(conf.model_fast)
+        request = make_request("Find ids")
+        await self.generate(model, request)
+
+        cache = get_response_cache()
+        cache._memory.clear()
+        await self.generate(model, request)
+        self.assertEqual(cache.stats()["disk_hits"], 1)
+
+        with patch.object(cache, "ttl_seconds", -1):
+            self.assertIsNone(cache.get(cache_key(conf.model_fast, request)))
+        print("✅ PASS")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import json
+import os
+import time
+import unittest
+import uuid
+from unittest.mock import patch
+
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from marriage_council.config import conf
+from marriage_council.database import setup_database, close_connections, flush_logs, get_connection
+from marriage_council.sub_agents.negotiation import get_negotiation_stage
+
+
+class NegotiationStageTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.test_db_file = f"test_db_{uuid.uuid4().hex}.sqlite"
+        self.original_db_name = conf.db_name
+        conf.db_name = self.test_db_file
+        setup_database()
+        with get_connection() as conn:
+            conn.execute("UPDATE profiles SET location='Delhi' WHERE id='G-1'")
+            conn.execute("UPDATE profiles SET location='Bangalore', job='Doctor' WHERE id='B-1'")
+            conn.commit()
+
+        self.patches = [patch.object(conf, "model_backend", "offline"),
+                        patch.object(conf, "offline_latency_ms", 100)]
+        for p in self.patches:
+            p.start()
+
+    async def asyncTearDown(self):
+        for p in reversed(self.patches):
+            p.stop()
+        conf.db_name = self.original_db_name
+        flush_logs()
+        close_connections(self.test_db_file)
+        for path in (self.test_db_file, f"{self.test_db_file}-wal", f"{self.test_db_file}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    async def test_reps_run_concurrently_on_one_prefetch(self):
+        print("\n🔵 TEST: Parallel Negotiation Stage")
+        service = InMemorySessionService()
+        session = await service.create_session(app_name="test_app", user_id="u")
+        runner = Runner(agent=get_negotiation_stage(), app_name="test_app", session_service=service)
+
+        start = time.perf_counter()
+        calls, final = [], None
+        async for event in runner.run_async(user_id="u", session_id=session.id, new_message=types.Content(
+                role="user", parts=[types.Part(text="Groom G-1 and Bride B-1: state your demands.")])):
+            calls += [call.name for call in event.get_function_calls()]
+            if event.author == "demand_merger":
+                final = json.loads(event.content.parts[0].text)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self.assertEqual(calls, [], "Reps should use the prefetched profiles, not the tool")
+        self.assertEqual((final["groom_id"], final["bride_id"]), ("G-1", "B-1"))
+        self.assertEqual((final["groom_location"], final["bride_location"], final["bride_career"]),
+                         ("Delhi", "Bangalore", "Doctor"))
+        self.assertIn("live in Delhi", final["groom_demands"])
+        self.assertIn("Doctor career", final["bride_demands"])
+        # Two 100 ms rep calls run side by side; sequential reps would take at least 200 ms
+        self.assertLess(elapsed_ms, 190)
+
+        state = (await service.get_session(app_name="test_app", user_id="u", session_id=session.id)).state
+        self.assertEqual(state["demands"], final)
+        print(f"   Stage took {elapsed_ms:.0f} ms")
+        print("✅ PASS")
+
+    async def test_turn_without_ids_drops_the_previous_couple(self):
+        print("\n🔵 TEST: Prefetch Clears a Stale Couple")
+        service = InMemorySessionService()
+        session = await service.create_session(app_name="test_app", user_id="u")
+        runner = Runner(agent=get_negotiation_stage(), app_name="test_app", session_service=service)
+
+        async def turn(text):
+            final = None
+            async for event in runner.run_async(user_id="u", session_id=session.id, new_message=types.Content(
+                    role="user", parts=[types.Part(text=text)])):
+                if event.author == "demand_merger":
+                    final = json.loads(event.content.parts[0].text)
+            return final
+
+        self.assertEqual((await turn("Groom G-1 and Bride B-1: state your demands."))["groom_id"], "G-1")
+        final = await turn("Now state your demands again.")
+        self.assertEqual((final["groom_id"], final["bride_id"], final["groom_location"]), ("", "", ""))
+        state = (await service.get_session(app_name="test_app", user_id="u", session_id=session.id)).state
+        self.assertEqual([state[k] for k in ("groom_id", "bride_id", "groom_profile", "bride_profile")], [""] * 4)
+        print("✅ PASS")
+
+
+if __name__ == "__main__":
+    unittest.main()
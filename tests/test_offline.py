@@ -0,0 +1,114 @@
+import os
+import sqlite3
+import unittest
+import uuid
+from unittest.mock import patch
+
+from google.adk.models.llm_request import LlmRequest
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from marriage_council.broker import get_broker_agent
+from marriage_council.config import conf
+from marriage_council.database import setup_database, close_connections, flush_logs
+from marriage_council.models import build_model
+from marriage_council.offline import OfflineGemini, OfflineModelError
+
+
+class OfflineBackendTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.test_db_file = f"test_db_{uuid.uuid4().hex}.sqlite"
+        self.original_db_name = conf.db_name
+        conf.db_name = self.test_db_file
+        setup_database()
+
+        conn = sqlite3.connect(conf.db_name)
+        conn.execute("UPDATE profiles SET risk_factor='Clean'")
+        conn.execute("UPDATE profiles SET risk_factor='Fake Job' WHERE id='G-8'")
+        conn.execute("UPDATE profiles SET horoscope_sign='Leo'")
+        conn.commit()
+        conn.close()
+
+        self.patches = [patch.object(conf, "model_backend", "offline"),
+                        patch.object(conf, "vetting_fast_path", False)]
+        for p in self.patches:
+            p.start()
+        self.service = InMemorySessionService()
+        await self.service.create_session(app_name="test_app", user_id="u", session_id="s")
+        self.runner = Runner(agent=get_broker_agent(), app_name="test_app", session_service=self.service)
+
+    async def asyncTearDown(self):
+        for p in reversed(self.patches):
+            p.stop()
+        conf.db_name = self.original_db_name
+        flush_logs()
+        close_connections(self.test_db_file)
+        for path in (self.test_db_file, f"{self.test_db_file}-wal", f"{self.test_db_file}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    async def turn(self, prompt, session_id="s"):
+        final, calls = "", []
+        async for event in self.runner.run_async(
+            user_id="u", session_id=session_id, new_message=types.Content(role="user", parts=[types.Part(text=prompt)])
+        ):
+            calls += [c.name for c in event.get_function_calls()]
+            # The vetting AgentTool skips summarization, so its verdict can be the final output
+            for response in event.get_function_responses():
+                final = str(response.response.get("result", ""))
+            if event.content and event.content.parts and event.content.parts[0].text:
+                final = event.content.parts[0].text
+        return final, calls
+
+    async def test_build_model_selects_backend(self):
+        print("\n🔵 TEST: Offline Backend Selection")
+        self.assertIsInstance(build_model(conf.model_fast), OfflineGemini)
+        self.assertIsInstance(self.runner.agent.model, OfflineGemini)
+        print("✅ PASS")
+
+    async def test_full_vetting_turn_runs_offline(self):
+        print("\n🔵 TEST: Offline Vetting Turn")
+        final, calls = await self.turn("Identify Groom G-1 and Bride B-1. Run vetting.")
+        print(f"   Got: {final} via {calls}")
+        self.assertIn('"status": "PASS"', final)
+        self.assertIn("VettingPipeline", calls)
+
+        # A fresh session so the earlier verdict is not in the history
+        await self.service.create_session(app_name="test_app", user_id="u", session_id="s2")
+        final, _ = await self.turn("Identify Groom G-8 and Bride B-1. Run vetting.", "s2")
+        self.assertIn('"status": "FAIL"', final)
+        final, _ = await self.turn("Please reconsider, he is a good person!", "s2")
+        self.assertIn("decision is final", final)
+        print("✅ PASS")
+
+    async def test_negotiation_calls_the_scoring_tool(self):
+        print("\n🔵 TEST: Offline Negotiation")
+        prompt = ("Couple details: Groom (Location: Delhi, Job: Banker), Bride (Location: Bangalore, Career: Doctor). "
+                  "Propose the optimal compromise: Live in Mumbai, Bride quits her Doctor career.")
+        final, calls = await self.turn(prompt)
+        self.assertEqual(calls, ["calculate_utility_score"])
+        self.assertIn("NEGOTIATION FAILED", final)
+        print("✅ PASS")
+
+    async def test_latency_errors_and_streaming(self):
+        print("\n🔵 TEST: Offline Latency, Errors and Streaming")
+        model = OfflineGemini(model=conf.model_fast)
+        request = LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text="hello there")])])
+
+        responses = [r async for r in model.generate_content_async(request, stream=True)]
+        self.assertTrue(all(r.partial for r in responses[:-1]))
+        self.assertGreater(len(responses), 2)
+        self.assertEqual("".join(r.content.parts[0].text for r in responses[:-1]),
+                         responses[-1].content.parts[0].text)
+        self.assertGreater(responses[-1].usage_metadata.total_token_count, 0)
+
+        with patch.object(conf, "offline_error_rate", 1.0):
+            with self.assertRaises(OfflineModelError):
+                [r async for r in model.generate_content_async(request)]
+        print("✅ PASS")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+from unittest.mock import patch
+
+from google.adk.agents import BaseAgent
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from marriage_council.config import conf
+from marriage_council.registry import AgentRegistry
+
+
+class EchoAgent(BaseAgent):
+    async def _run_async_impl(self, ctx):
+        yield Event(
+            invocation_id=ctx.invocation_id, author=self.name, branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text="echo: " + ctx.user_content.parts[0].text)])
+        )
+
+
+class RegistryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = AgentRegistry(factory=lambda: EchoAgent(name="marriage_broker_agent"))
+
+    def test_graph_is_built_once_per_config(self):
+        print("\n🔵 TEST: Shared Agent Graph")
+        service = InMemorySessionService()
+        first = self.registry.get_runner("test_app", service)
+        self.assertIs(self.registry.get_runner("test_app", service), first)
+        self.assertEqual(self.registry.builds, 1)
+
+        with patch.object(conf, "model_fast", "gemini-other"):
+            self.assertIsNot(self.registry.get_runner("test_app", service), first)
+        self.assertEqual(self.registry.builds, 2)
+
+        self.registry.invalidate()
+        self.registry.get_agent()
+        self.assertEqual(self.registry.builds, 3)
+        print("✅ PASS")
+
+    def test_turns_run_on_the_shared_loop(self):
+        print("\n🔵 TEST: Registry Event Loop")
+        service = InMemorySessionService()
+        session = self.registry.run(service.create_session(app_name="test_app", user_id="u"))
+        for _ in range(2):
+            texts = [e.content.parts[0].text for e in self.registry.iter_events(
+                "test_app", service, user_id="u", session_id=session.id,
+                new_message=types.Content(role="user", parts=[types.Part(text="hi")]))]
+            self.assertEqual(texts, ["echo: hi"])
+        self.assertEqual(self.registry.builds, 1)
+        print("✅ PASS")
+
+    def test_streaming_turn_reports_sub_agent_progress(self):
+        print("\n🔵 TEST: Streaming and Sub-Agent Progress")
+        from google.adk.agents.run_config import RunConfig, StreamingMode
+        with patch.object(conf, "model_backend", "offline"), patch.object(conf, "vetting_fast_path", False), \
+             patch.object(conf, "tracing_enabled", False):
+            registry = AgentRegistry()
+            service = InMemorySessionService()
+            session = registry.run(service.create_session(app_name="test_app", user_id="u"))
+
+            def turn(prompt, updates):
+                return [event.partial for event in registry.iter_events(
+                    "test_app", service, user_id="u", session_id=session.id,
+                    new_message=types.Content(role="user", parts=[types.Part(text=prompt)]),
+                    run_config=RunConfig(streaming_mode=StreamingMode.SSE), on_progress=updates.append)]
+
+            updates = []
+            turn("Identify Groom G-1 and Bride B-1. Run vetting.", updates)
+            partial = turn("Groom (Location: Delhi, Job: Banker), Bride (Location: Bangalore, Career: Doctor). "
+                           "Propose: Live in Delhi, Bride keeps her Doctor career.", [])
+
+        started = [u.agent_name for u in updates if u.phase == "started"]
+        for name in ("marriage_broker_agent", "parser_agent", "detective_agent", "astrologer_agent", "synthesizer_agent"):
+            self.assertIn(name, started)
+        self.assertEqual((updates[-1].agent_name, updates[-1].phase), ("marriage_broker_agent", "finished"))
+        self.assertTrue(any(partial), "SSE mode should surface partial broker text")
+        self.assertFalse(partial[-1], "The full reply follows the partial chunks")
+        print("✅ PASS")
+
+if __name__ == "__main__":
+    unittest.main()
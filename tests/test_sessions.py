@@ -0,0 +1,99 @@
+import os
+import sqlite3
+import unittest
+import uuid
+from unittest.mock import patch
+
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.runners import Runner
+from google.genai import types
+
+from marriage_council.broker import get_broker_agent
+from marriage_council.config import conf
+from marriage_council.database import setup_database, close_connections, flush_logs, get_connection
+from marriage_council.sessions import SqliteSessionService, SUMMARY_HEADER, chat_transcript
+
+
+class SessionServiceTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.test_db_file = f"test_db_{uuid.uuid4().hex}.sqlite"
+        self.original_db_name = conf.db_name
+        conf.db_name = self.test_db_file
+        setup_database()
+
+        conn = sqlite3.connect(conf.db_name)
+        conn.execute("UPDATE profiles SET risk_factor='Clean'")
+        conn.execute("UPDATE profiles SET horoscope_sign='Leo'")
+        conn.commit()
+        conn.close()
+
+        self.patches = [patch.object(conf, "model_backend", "offline"),
+                        patch.object(conf, "session_keep_turns", 2)]
+        for p in self.patches:
+            p.start()
+
+    async def asyncTearDown(self):
+        for p in reversed(self.patches):
+            p.stop()
+        conf.db_name = self.original_db_name
+        flush_logs()
+        close_connections(self.test_db_file)
+        for path in (self.test_db_file, f"{self.test_db_file}-wal", f"{self.test_db_file}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    async def turn(self, runner, prompt):
+        async for _ in runner.run_async(user_id="u", session_id="s", new_message=types.Content(
+                role="user", parts=[types.Part(text=prompt)])):
+            pass
+
+    async def test_sessions_persist_and_resume(self):
+        print("\n🔵 TEST: Durable Session Resume")
+        service = SqliteSessionService()
+        await service.create_session(app_name="test_app", user_id="u", session_id="s", state={"k": 1})
+        with self.assertRaises(AlreadyExistsError):
+            await service.create_session(app_name="test_app", user_id="u", session_id="s")
+
+        runner = Runner(agent=get_broker_agent(), app_name="test_app", session_service=service)
+        await self.turn(runner, "Identify Groom G-1 and Bride B-1. Run vetting.")
+
+        # A new service instance stands in for a restarted process
+        resumed = await SqliteSessionService().get_session(app_name="test_app", user_id="u", session_id="s")
+        self.assertEqual(resumed.state["k"], 1)
+        self.assertEqual(resumed.events[0].content.parts[0].text, "Identify Groom G-1 and Bride B-1. Run vetting.")
+        self.assertEqual(chat_transcript(resumed)[0], {"role": "user", "content": "Identify Groom G-1 and Bride B-1. Run vetting."})
+
+        listed = await service.list_sessions(app_name="test_app", user_id="u")
+        self.assertEqual([s.id for s in listed.sessions], ["s"])
+        await service.delete_session(app_name="test_app", user_id="u", session_id="s")
+        self.assertIsNone(await service.get_session(app_name="test_app", user_id="u", session_id="s"))
+        print("✅ PASS")
+
+    async def test_history_is_compacted_to_recent_turns(self):
+        print("\n🔵 TEST: Session History Compaction")
+        service = SqliteSessionService()
+        await service.create_session(app_name="test_app", user_id="u", session_id="s")
+        runner = Runner(agent=get_broker_agent(), app_name="test_app", session_service=service)
+
+        await self.turn(runner, "Identify Groom G-1 and Bride B-1. Run vetting.")
+        sizes = []
+        for i in range(6):
+            await self.turn(runner, "Consult the Groom and Bride representatives for their demands.")
+            with get_connection() as conn:
+                sizes.append(conn.execute("SELECT count(*) FROM session_events").fetchone()[0])
+        self.assertEqual(len(set(sizes[2:])), 1, f"Stored events should stop growing: {sizes}")
+
+        session = await service.get_session(app_name="test_app", user_id="u", session_id="s")
+        summary = session.events[0].content.parts[0].text
+        self.assertTrue(summary.startswith(SUMMARY_HEADER))
+        self.assertIn("Identify Groom G-1 and Bride B-1", summary)
+        self.assertEqual(session.state["verdict"]["status"], "PASS")
+        self.assertIn('"status": "PASS"', summary)
+        user_turns = [e for e in session.events[1:] if e.author == "user" and e.content.parts[0].text]
+        self.assertEqual(len(user_turns), 2)
+        print("✅ PASS")
+
+
+if __name__ == "__main__":
+    unittest.main()
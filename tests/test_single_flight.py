@@ -0,0 +1,128 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from google.adk.models.google_llm import Gemini
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from marriage_council.config import conf
+from marriage_council.llm_cache import CoalescingGemini
+from marriage_council.models import build_model
+from marriage_council.single_flight import AsyncSingleFlight, model_flights
+
+
+def make_request(text):
+    return LlmRequest(
+        model=conf.model_fast,
+        contents=[types.Content(role="user", parts=[types.Part(text=text)])],
+        config=types.GenerateContentConfig(system_instruction="You are the Data Extractor."),
+    )
+
+
+class AsyncSingleFlightTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_shared_result_errors_and_cancellation(self):
+        print("\n🔵 TEST: Async Single Flight")
+        flights, calls = AsyncSingleFlight(), []
+
+        async def slow(value):
+            calls.append(value)
+            await asyncio.sleep(0.05)
+            if value == "boom":
+                raise RuntimeError("quota exceeded")
+            return value
+
+        results = await asyncio.gather(*[flights.do("a", lambda: slow("a")) for _ in range(5)])
+        self.assertEqual((results, calls), (["a"] * 5, ["a"]))
+
+        outcomes = await asyncio.gather(*[flights.do("b", lambda: slow("boom")) for _ in range(3)],
+                                        return_exceptions=True)
+        self.assertTrue(all(isinstance(o, RuntimeError) for o in outcomes))
+        self.assertEqual(flights.stats.errors, 1)
+
+        # One caller giving up leaves the shared work running for the others
+        first = asyncio.create_task(flights.do("c", lambda: slow("c")))
+        second = asyncio.create_task(flights.do("c", lambda: slow("c")))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        self.assertEqual(await second, "c")
+        self.assertTrue(first.cancelled())
+        self.assertEqual(calls.count("c"), 1)
+
+        # Once every caller has gone, the work itself is cancelled
+        lonely = asyncio.create_task(flights.do("d", lambda: slow("d")))
+        await asyncio.sleep(0.01)
+        lonely.cancel()
+        await asyncio.gather(lonely, return_exceptions=True)
+        self.assertEqual(flights.stats.cancelled, 1)
+        self.assertEqual(flights._flights, {})
+        self.assertEqual(await flights.do("d", lambda: slow("d")), "d")
+        print("✅ PASS")
+
+    async def test_late_joiners_replay_the_stream(self):
+        print("\n🔵 TEST: Async Single Flight Streams")
+        flights = AsyncSingleFlight()
+
+        async def words():
+            for word in ("match", "is", "viable"):
+                yield word
+                await asyncio.sleep(0.02)
+
+        async def read(delay):
+            await asyncio.sleep(delay)
+            return [w async for w in flights.stream("s", words)]
+
+        self.assertEqual(await asyncio.gather(read(0), read(0.03)), [["match", "is", "viable"]] * 2)
+        self.assertEqual((flights.stats.leaders, flights.stats.collapsed), (1, 1))
+        print("✅ PASS")
+
+
+class CoalescingModelTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.patches = [patch.object(conf, "llm_cache_enabled", False),
+                        patch.object(conf, "single_flight_enabled", True),
+                        patch.object(conf, "model_backend", "gemini")]
+        for p in self.patches:
+            p.start()
+        self.backend_calls = 0
+
+        async def fake_backend(model, llm_request, stream=False):
+            self.backend_calls += 1
+            await asyncio.sleep(0.05)
+            yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="G-1, B-1")]))
+
+        self.patches.append(patch.object(Gemini, "generate_content_async", fake_backend))
+        self.patches[-1].start()
+        model_flights.stats.reset()
+
+    async def asyncTearDown(self):
+        for p in reversed(self.patches):
+            p.stop()
+
+    async def generate(self, model, text):
+        return [r async for r in model.generate_content_async(make_request(text))]
+
+    async def test_identical_concurrent_requests_reach_the_backend_once(self):
+        print("\n🔵 TEST: Coalesced Model Calls")
+        model = build_model(conf.model_fast)
+        self.assertIsInstance(model, CoalescingGemini)
+
+        replies = await asyncio.gather(*[self.generate(model, "Find ids") for _ in range(4)],
+                                       self.generate(model, "Something else"))
+        self.assertEqual(self.backend_calls, 2)
+        self.assertEqual({r[0].content.parts[0].text for r in replies}, {"G-1, B-1"})
+        # Each caller gets its own response object to annotate
+        self.assertEqual(len({id(r[0]) for r in replies}), 5)
+        self.assertEqual(model_flights.stats.snapshot()["collapsed"], 3)
+
+        with patch.object(conf, "single_flight_enabled", False):
+            await asyncio.gather(*[self.generate(model, "Find ids") for _ in range(2)])
+        self.assertEqual(self.backend_calls, 4)
+        print("✅ PASS")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import glob
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import unittest
+import uuid
+
+import numpy as np
+
+from marriage_council.config import conf
+from marriage_council.database import setup_database, close_connections, flush_logs, get_connection
+from marriage_council.sampling import ProfileFilter
+from marriage_council.snapshot import close_snapshots, get_snapshot, snapshot_path
+
+REPO = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+PROBE = r"""
+import json, os, sys
+from marriage_council.snapshot import get_snapshot, snapshot_path
+before = os.stat(snapshot_path(sys.argv[1])).st_ino
+snapshot = get_snapshot(sys.argv[1])
+print(json.dumps({"version": snapshot.version, "rows": len(snapshot), "first": snapshot.profile_id(0),
+                  "shared": not snapshot.age.flags.owndata and not snapshot.age.flags.writeable,
+                  "rewritten": os.stat(snapshot_path(sys.argv[1])).st_ino != before}))
+"""
+
+
+class ProfileSnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.test_db_file = f"test_db_{uuid.uuid4().hex}.sqlite"
+        self.original_db_name = conf.db_name
+        conf.db_name = self.test_db_file
+        setup_database()
+
+    def tearDown(self):
+        close_snapshots()
+        conf.db_name = self.original_db_name
+        flush_logs()
+        close_connections(self.test_db_file)
+        for path in glob.glob(f"{self.test_db_file}*"):
+            os.remove(path)
+
+    def sql_rows(self):
+        with get_connection() as conn:
+            return conn.execute("SELECT id, age, salary_lpa, gender, location, job, family_type, horoscope_sign,"
+                                " risk_factor FROM profiles ORDER BY id").fetchall()
+
+    def snapshot_rows(self, snapshot):
+        at = snapshot.positions(sorted(snapshot.profile_id(i) for i in range(len(snapshot))))
+        decoded = [snapshot.column(col)[at] for col in ("gender", "location", "job", "family_type",
+                                                        "horoscope_sign", "risk_factor")]
+        return [(snapshot.profile_id(i), None if snapshot.age[i] < 0 else int(snapshot.age[i]),
+                 round(float(snapshot.salary_lpa[i]), 1), *(col[n] for col in decoded))
+                for n, i in enumerate(at)]
+
+    def test_round_trip_matches_sqlite(self):
+        print("\n🔵 TEST: Snapshot Round Trip")
+        with get_connection() as conn:
+            conn.execute("UPDATE profiles SET age=NULL, location=NULL WHERE id='B-3'")
+            conn.commit()
+        snapshot = get_snapshot()
+
+        self.assertEqual(self.snapshot_rows(snapshot), self.sql_rows())
+        self.assertEqual(snapshot.age.dtype, np.int16)
+        self.assertEqual(snapshot.codes["location"].dtype, np.uint8)
+        self.assertIsNone(snapshot.column("location")[snapshot.positions(["B-3"])[0]])
+        # Columns are read-only views onto the mapped file
+        self.assertFalse(snapshot.age.flags.owndata or snapshot.age.flags.writeable)
+        self.assertEqual(snapshot.positions(["G-1", "X-404"])[1], -1)
+
+        clean_delhi_grooms = sum(1 for r in self.sql_rows() if r[3] == "Male" and r[4] == "Delhi" and r[8] == "Clean")
+        self.assertEqual(int(snapshot.mask(ProfileFilter("Male", "Delhi", None, True)).sum()), clean_delhi_grooms)
+        print("✅ PASS")
+
+    def test_refresh_patches_changes_atomically(self):
+        print("\n🔵 TEST: Snapshot Refresh")
+        old = get_snapshot()
+        location_before = old.column("location")[old.positions(["G-2"])[0]]
+
+        conn = sqlite3.connect(conf.db_name)
+        conn.execute("UPDATE profiles SET location='Shimla', salary_lpa=99.5 WHERE id='G-2'")
+        conn.execute("DELETE FROM profiles WHERE id='B-4'")
+        conn.execute("INSERT INTO profiles (id, name, gender, age, location, job, salary_lpa, family_type,"
+                     " horoscope_sign, risk_factor) VALUES ('G-99', 'Groom_99', 'Male', 33, 'Goa', 'Chef', 12.0,"
+                     " 'Joint', 'Leo', 'Clean')")
+        conn.commit()
+        conn.close()
+
+        fresh = get_snapshot()
+        self.assertGreater(fresh.version, old.version)
+        self.assertEqual(self.snapshot_rows(fresh), self.sql_rows())
+        self.assertEqual(len(fresh), len(old))
+        self.assertEqual(fresh.column("location")[fresh.positions(["G-2", "G-99"])].tolist(), ["Shimla", "Goa"])
+        # Mappings handed out earlier keep serving the version they were opened at
+        self.assertEqual(old.column("location")[old.positions(["G-2"])[0]], location_before)
+        self.assertNotEqual(old.positions(["B-4"])[0], -1)
+        self.assertIs(get_snapshot(), fresh)
+        self.assertEqual(glob.glob(f"{snapshot_path()}.*"), [], "Temp files must be renamed into place")
+        print("✅ PASS")
+
+    def test_other_processes_map_the_same_file(self):
+        print("\n🔵 TEST: Snapshot Shared Across Processes")
+        snapshot = get_snapshot()
+        env = dict(os.environ, PYTHONPATH=REPO)
+        out = subprocess.run([sys.executable, "-c", PROBE, os.path.abspath(self.test_db_file)], env=env,
+                             capture_output=True, text=True, check=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        self.assertEqual((result["version"], result["rows"], result["first"]),
+                         (snapshot.version, len(snapshot), snapshot.profile_id(0)))
+        self.assertTrue(result["shared"])
+        self.assertFalse(result["rewritten"], "An up-to-date snapshot is opened, not exported again")
+        print("✅ PASS")
+
+
+if __name__ == "__main__":
+    unittest.main()
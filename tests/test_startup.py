@@ -0,0 +1,52 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+REPO = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Importing the package must not reach auth, ADK, pandas or the database
+IMPORT_BUDGET_MS = 500
+HEAVY_MODULES = ("google.auth", "google.adk", "pandas")
+
+PROBE = r"""
+import json, os, sys, time
+start = time.perf_counter()
+import marriage_council
+import_ms = (time.perf_counter() - start) * 1000
+loaded = [m for m in %r if m in sys.modules]
+files = os.listdir(".")
+from marriage_council import tools
+profile = json.loads(tools.get_profile_details("G-1"))
+print(json.dumps({"import_ms": import_ms, "loaded": loaded, "files": files, "profile": profile,
+                  "after_tool": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES, HEAVY_MODULES)
+
+
+class StartupTest(unittest.TestCase):
+
+    def test_import_is_lazy_and_within_budget(self):
+        print("\n🔵 TEST: Import-Time Budget")
+        with tempfile.TemporaryDirectory() as workdir:
+            env = dict(os.environ, PYTHONPATH=REPO)
+            env.pop("GOOGLE_CLOUD_PROJECT", None)
+            out = subprocess.run([sys.executable, "-c", PROBE], cwd=workdir, env=env,
+                                 capture_output=True, text=True, check=True).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            created = os.listdir(workdir)
+
+        self.assertLess(result["import_ms"], IMPORT_BUDGET_MS)
+        self.assertEqual(result["loaded"], [])
+        self.assertEqual(result["files"], [], "No database should be created at import time")
+        # The first tool call creates and seeds the database on demand, still without auth or ADK
+        self.assertEqual(result["profile"]["id"], "G-1")
+        self.assertEqual(result["after_tool"], [])
+        self.assertIn("matrimony_council.sqlite", created)
+        print(f"   import marriage_council: {result['import_ms']:.1f} ms")
+        print("✅ PASS")
+
+
+if __name__ == "__main__":
+    unittest.main()
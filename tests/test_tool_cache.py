@@ -0,0 +1,114 @@
+import json
+import os
+import sqlite3
+import unittest
+import uuid
+from unittest.mock import patch
+
+import httpx
+
+from marriage_council.api import BrokerService, create_app
+from marriage_council.config import conf
+from marriage_council.database import setup_database, close_connections, flush_logs, profiles_version
+from marriage_council.tool_cache import _current, clear_session_caches, session_cache, tool_cache_stats
+from marriage_council.tools import get_profile_details, perform_background_check
+
+
+class ToolCacheTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.test_db_file = f"test_db_{uuid.uuid4().hex}.sqlite"
+        self.original_db_name = conf.db_name
+        conf.db_name = self.test_db_file
+        setup_database()
+
+        conn = sqlite3.connect(conf.db_name)
+        conn.execute("UPDATE profiles SET risk_factor='Clean', horoscope_sign='Leo'")
+        conn.commit()
+        conn.close()
+
+        self.patches = [patch.object(conf, "model_backend", "offline"),
+                        patch.object(conf, "tracing_enabled", False)]
+        for p in self.patches:
+            p.start()
+        clear_session_caches()
+        tool_cache_stats.reset()
+
+    async def asyncTearDown(self):
+        for p in reversed(self.patches):
+            p.stop()
+        clear_session_caches()
+        conf.db_name = self.original_db_name
+        flush_logs()
+        close_connections(self.test_db_file)
+        for path in (self.test_db_file, f"{self.test_db_file}-wal", f"{self.test_db_file}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    async def test_repeated_reads_hit_until_the_row_changes(self):
+        print("\n🔵 TEST: Session Cache Invalidation")
+        cache = session_cache("test_app", "u", "s1")
+        feed_checks = []
+        counting = lambda conn: feed_checks.append(1) or profiles_version(conn)
+        token = _current.set((cache, "inv-1"))
+        try:
+            with patch("marriage_council.tool_cache.profiles_version", counting):
+                first = json.loads(get_profile_details("G-1"))
+                self.assertEqual(perform_background_check("G-1"), "CLEAN")
+                for _ in range(5):
+                    self.assertEqual(json.loads(get_profile_details("G-1")), first)
+                self.assertEqual((tool_cache_stats.hits, tool_cache_stats.misses), (6, 1))
+                self.assertEqual(len(feed_checks), 2, "Detail reads check the feed once per turn, the risk gate always")
+
+                # A risk flag raised from another connection mid-turn is seen by the next background check,
+                # which evicts only that row
+                conn = sqlite3.connect(conf.db_name)
+                conn.execute("UPDATE profiles SET risk_factor='Fake Job' WHERE id='G-1'")
+                conn.commit()
+                conn.close()
+                self.assertEqual(perform_background_check("G-1"), "RISK_FOUND")
+                self.assertEqual(tool_cache_stats.invalidated, 1)
+                self.assertEqual(len(feed_checks), 3)
+
+                # Other detail edits are picked up by the first read of the next turn
+                conn = sqlite3.connect(conf.db_name)
+                conn.execute("UPDATE profiles SET location='Shimla' WHERE id='G-1'")
+                conn.commit()
+                conn.close()
+                _current.set((cache, "inv-2"))
+                self.assertEqual(json.loads(get_profile_details("G-1"))["location"], "Shimla")
+                self.assertEqual(tool_cache_stats.invalidated, 2)
+                self.assertEqual(len(feed_checks), 4)
+        finally:
+            _current.reset(token)
+
+        # Outside a run the tools read straight from the database
+        tool_cache_stats.reset()
+        self.assertEqual(get_profile_details("B-999"), json.dumps({"error": "Not Found"}))
+        self.assertEqual((tool_cache_stats.hits, tool_cache_stats.misses), (0, 0))
+        print("✅ PASS")
+
+    async def test_broker_and_reps_share_the_session_cache(self):
+        print("\n🔵 TEST: Session Cache Across Agents")
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=create_app(BrokerService())),
+                                     base_url="http://test") as client:
+            vet = (await client.post("/vet", json={"groom_id": "G-1", "bride_id": "B-1"})).json()
+            self.assertEqual(vet["verdict"]["status"], "PASS")
+            misses = tool_cache_stats.misses
+
+            deal = (await client.post("/chat", json={
+                "session_id": vet["session_id"],
+                "message": "Consult the representatives of Groom G-1 and Bride B-1 for their demands."})).json()
+            self.assertIn("Demands gathered", deal["reply"])
+
+        stats = tool_cache_stats.snapshot()
+        # Only the first turn touches the database; the negotiation stage reuses the vetted rows
+        self.assertEqual(misses, 2)
+        self.assertEqual(stats["misses"], 2)
+        self.assertGreater(stats["hits"], 2)
+        print(f"   {stats}")
+        print("✅ PASS")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+import asyncio
+import glob
+import json
+import os
+import tempfile
+import time
+import unittest
+import uuid
+from unittest.mock import patch
+
+from marriage_council.config import conf
+from marriage_council.database import setup_database, close_connections, flush_logs, get_connection
+from marriage_council.horoscope import get_table, SIGNS
+from marriage_council.seeding import seed_profiles
+from marriage_council.snapshot import close_snapshots, get_snapshot
+from marriage_council.tools import (calculate_utility_score, find_optimal_compromise, check_horoscope_compatibility,
+                                    recommend_matches)
+
+
+class ScoringTest(unittest.TestCase):
+
+    # --- 1. SINGLE PROPOSAL (thin wrapper) ---
+    def test_single_proposal_scores_unchanged(self):
+        print("\n🔵 TEST: calculate_utility_score")
+        self.assertEqual(json.loads(calculate_utility_score("Delhi", "Bangalore", "Delhi", "Doctor")),
+                         {"total_score": 80, "viability": "High"})
+        self.assertEqual(json.loads(calculate_utility_score("Delhi", "Bangalore", "Mumbai", "Quit Job")),
+                         {"total_score": 0, "viability": "Low"})
+        print("✅ PASS")
+
+    # --- 2. BATCH SEARCH ---
+    def test_batch_search_ranks_and_finds_frontier(self):
+        print("\n🔵 TEST: find_optimal_compromise")
+        result = json.loads(find_optimal_compromise("Delhi", "Bangalore", ["Mumbai"], ["Keep Job", "Quit Job"]))
+
+        self.assertEqual(len(result["ranked"]), 6)
+        self.assertEqual(result["best"]["proposal_loc"], "Delhi")
+        self.assertEqual(result["best"]["total_score"], 80)
+        scores = [p["total_score"] for p in result["ranked"]]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+        frontier = {(p["proposal_loc"], p["bride_career"]) for p in result["pareto_frontier"]}
+        self.assertEqual(frontier, {("Delhi", "Keep Job"), ("Bangalore", "Keep Job")})
+
+        for p in result["ranked"]:
+            single = json.loads(calculate_utility_score("Delhi", "Bangalore", p["proposal_loc"], p["bride_career"]))
+            self.assertEqual(single["total_score"], p["total_score"])
+        print("✅ PASS")
+
+
+class HoroscopeTest(unittest.TestCase):
+
+    def test_lookups_are_deterministic_and_symmetric(self):
+        print("\n🔵 TEST: Horoscope Compatibility Matrix")
+        results = {check_horoscope_compatibility("Leo", "Taurus") for _ in range(20)}
+        self.assertEqual(len(results), 1)
+        self.assertEqual(check_horoscope_compatibility("leo", "Aries"), "GOOD_MATCH")
+        self.assertEqual(check_horoscope_compatibility("Leo", "Taurus"), "BAD_MATCH")
+        self.assertEqual(check_horoscope_compatibility("Leo", "Ophiuchus"), "UNKNOWN_SIGN")
+
+        table = get_table()
+        self.assertTrue((table.scores == table.scores.T).all())
+        print("✅ PASS")
+
+    def test_batch_scores_match_single_lookups(self):
+        print("\n🔵 TEST: Horoscope Batch Scoring")
+        table = get_table()
+        pairs = [(a, b) for a in SIGNS for b in SIGNS]
+        batch = table.score_pairs([a for a, _ in pairs], [b for _, b in pairs])
+        self.assertEqual(list(batch), [table.score(a, b) for a, b in pairs])
+        print("✅ PASS")
+
+    def test_table_round_trips_through_file(self):
+        print("\n🔵 TEST: Horoscope Table File")
+        path = os.path.join(tempfile.mkdtemp(), "horoscope.json")
+        get_table().save(path)
+        with patch.object(conf, "horoscope_table_path", path):
+            self.assertEqual(get_table().score("Virgo", "Pisces"), get_table().score("Pisces", "Virgo"))
+            self.assertEqual(get_table().signs, SIGNS)
+        os.remove(path)
+        print("✅ PASS")
+
+
+class RecommendationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.test_db_file = f"test_db_{uuid.uuid4().hex}.sqlite"
+        self.original_db_name = conf.db_name
+        conf.db_name = self.test_db_file
+        setup_database()
+        seed_profiles(2000, seed=3)
+
+    def tearDown(self):
+        close_snapshots()
+        conf.db_name = self.original_db_name
+        flush_logs()
+        close_connections(self.test_db_file)
+        for path in glob.glob(f"{self.test_db_file}*"):
+            os.remove(path)
+
+    def brute_force(self, profile_id):
+        """Scores every candidate one at a time with the existing single-pair tools."""
+        with get_connection() as conn:
+            rows = conn.execute("SELECT id, gender, location, horoscope_sign, risk_factor FROM profiles ORDER BY rowid").fetchall()
+        subject = next(r for r in rows if r[0] == profile_id)
+        ranked = []
+        for pid, gender, location, sign, risk in rows:
+            if gender == subject[1] or risk in ("High Debt", "Fake Job"):
+                continue
+            if check_horoscope_compatibility(subject[3], sign) == "BAD_MATCH":
+                continue
+            groom_loc, bride_loc = (subject[2], location) if subject[1] == "Male" else (location, subject[2])
+            utility = json.loads(find_optimal_compromise(groom_loc, bride_loc, [], ["Keep Job"]))["best"]["total_score"]
+            ranked.append((-(utility + get_table().score(subject[3], sign)), len(ranked), pid))
+        return [(pid, -score) for score, _, pid in sorted(ranked)]
+
+    def test_top_k_matches_brute_force(self):
+        print("\n🔵 TEST: recommend_matches")
+        with get_connection() as conn:
+            clean = [r[0] for r in conn.execute(
+                "SELECT id FROM profiles WHERE risk_factor='Clean' AND id IN ('G-1','G-2','G-3','B-1','B-2','B-3')")]
+        for pid in clean:
+            result = json.loads(recommend_matches(pid, 10))
+            expected = self.brute_force(pid)
+            self.assertEqual([(m["profile_id"], m["total_score"]) for m in result["matches"]], expected[:10])
+            self.assertEqual(result["candidates"], len(expected))
+            self.assertTrue(all(m["profile_id"][0] != pid[0] for m in result["matches"]))
+        print("✅ PASS")
+
+    def test_ineligible_subjects(self):
+        print("\n🔵 TEST: recommend_matches Ineligible Subjects")
+        with get_connection() as conn:
+            conn.execute("UPDATE profiles SET risk_factor='Fake Job' WHERE id='G-4'")
+            conn.commit()
+        self.assertEqual(json.loads(recommend_matches("G-4"))["matches"], [])
+        self.assertEqual(json.loads(recommend_matches("X-1"))["error"], "Not Found")
+        self.assertEqual(len(json.loads(recommend_matches("B-5", k=0))["matches"]), 0)
+        print("✅ PASS")
+
+    def test_ranks_100k_profiles_in_milliseconds(self):
+        print("\n🔵 TEST: recommend_matches at Scale")
+        seed_profiles(100_000, seed=3)
+        get_snapshot()  # one-off export, shared by every later call
+        with get_connection() as conn:
+            subjects = [r[0] for r in conn.execute(
+                "SELECT id FROM profiles WHERE risk_factor='Clean' AND id LIKE 'G-%' LIMIT 3")]
+            subjects += [r[0] for r in conn.execute(
+                "SELECT id FROM profiles WHERE risk_factor='Clean' AND id LIKE 'B-%' LIMIT 3")]
+        timings = []
+        for pid in subjects:
+            start = time.perf_counter()
+            result = json.loads(recommend_matches(pid, 5))
+            timings.append((time.perf_counter() - start) * 1000)
+            self.assertGreater(result["candidates"], 10_000)
+            self.assertEqual(len(result["matches"]), 5)
+        self.assertLess(max(timings), 25)
+        print(f"   slowest of {len(timings)}: {max(timings):.2f} ms")
+        print("✅ PASS")
+
+    def test_broker_recommends_through_the_tool(self):
+        print("\n🔵 TEST: Broker Uses recommend_matches")
+        from google.adk.runners import Runner
+        from google.adk.sessions import InMemorySessionService
+        from google.genai import types
+        from marriage_council.broker import get_broker_agent
+
+        with get_connection() as conn:
+            conn.execute("UPDATE profiles SET risk_factor='Clean' WHERE id='G-1'")
+            conn.commit()
+
+        async def run():
+            service = InMemorySessionService()
+            session = await service.create_session(app_name="test_app", user_id="u")
+            runner = Runner(agent=get_broker_agent(), app_name="test_app", session_service=service)
+            calls, text = [], ""
+            async for event in runner.run_async(user_id="u", session_id=session.id, new_message=types.Content(
+                    role="user", parts=[types.Part(text="Recommend a bride for G-1.")])):
+                calls += [call.name for call in event.get_function_calls()]
+                if event.is_final_response() and event.content and event.content.parts:
+                    text = event.content.parts[0].text or ""
+            return calls, text
+
+        with patch.object(conf, "model_backend", "offline"), patch.object(conf, "tracing_enabled", False):
+            calls, text = asyncio.run(run())
+        self.assertEqual(calls, ["recommend_matches"])
+        best = json.loads(recommend_matches("G-1"))["matches"][0]["profile_id"]
+        self.assertIn(f"Recommended: {best}", text)
+        print("✅ PASS")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import sqlite3
+import unittest
+import uuid
+from unittest.mock import patch
+
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from marriage_council.broker import get_broker_agent
+from marriage_council.config import conf
+from marriage_council.database import setup_database, close_connections, flush_logs, get_connection
+from marriage_council.tracing import (
+    LATEST_SPANS_SQL, TURN_TOTALS_SQL, TracingPlugin, agent_latency_percentiles, tokens_per_turn,
+)
+
+
+class TracingTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.test_db_file = f"test_db_{uuid.uuid4().hex}.sqlite"
+        self.original_db_name = conf.db_name
+        conf.db_name = self.test_db_file
+        setup_database()
+
+        conn = sqlite3.connect(conf.db_name)
+        conn.execute("UPDATE profiles SET risk_factor='Clean'")
+        conn.commit()
+        conn.close()
+
+        self.patches = [patch.object(conf, "model_backend", "offline"),
+                        patch.object(conf, "vetting_fast_path", False)]
+        for p in self.patches:
+            p.start()
+
+    async def asyncTearDown(self):
+        for p in reversed(self.patches):
+            p.stop()
+        conf.db_name = self.original_db_name
+        flush_logs()
+        close_connections(self.test_db_file)
+        for path in (self.test_db_file, f"{self.test_db_file}-wal", f"{self.test_db_file}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    async def test_turn_is_recorded_as_one_span_tree(self):
+        print("\n🔵 TEST: Span Tree for a Broker Turn")
+        service = InMemorySessionService()
+        await service.create_session(app_name="test_app", user_id="u", session_id="s")
+        runner = Runner(agent=get_broker_agent(), app_name="test_app", session_service=service,
+                        plugins=[TracingPlugin()])
+        async for _ in runner.run_async(user_id="u", session_id="s", new_message=types.Content(
+                role="user", parts=[types.Part(text="Identify Groom G-1 and Bride B-1. Run vetting.")])):
+            pass
+        flush_logs()
+
+        with get_connection() as conn:
+            spans = {row[0]: row for row in conn.execute(
+                "SELECT span_id, parent_id, trace_id, kind, name, prompt_tokens FROM agent_spans")}
+            self.assertEqual(len({s[2] for s in spans.values()}), 1, "AgentTool sub-runs must join the turn's trace")
+            roots = [s for s in spans.values() if s[1] is None]
+            self.assertEqual([(r[3], r[4]) for r in roots], [("agent", "marriage_broker_agent")])
+
+            by_name = {(s[3], s[4]): s for s in spans.values()}
+            tool = by_name[("tool", "VettingPipeline")]
+            detective = by_name[("agent", "detective_agent")]
+            ancestors, parent = [], detective[1]
+            while parent:
+                ancestors.append(parent)
+                parent = spans[parent][1]
+            self.assertIn(tool[0], ancestors)
+            self.assertIn(("tool", "perform_background_check"), by_name)
+            self.assertTrue(any(s[3] == "model" and s[5] > 0 for s in spans.values()))
+
+            latency = agent_latency_percentiles(conn)
+            self.assertIn("detective_agent", set(latency["name"]))
+            turns = tokens_per_turn(conn)
+            self.assertEqual(len(turns), 1)
+            self.assertGreater(int(turns["model_calls"][0]), 3)
+        print("✅ PASS")
+
+    async def test_dashboard_queries_use_indexes(self):
+        print("\n🔵 TEST: Dashboard Span Queries Are Indexed")
+        with get_connection() as conn:
+            latest = [r[3] for r in conn.execute("EXPLAIN QUERY PLAN " + LATEST_SPANS_SQL, (10,))]
+            turns = [r[3] for r in conn.execute("EXPLAIN QUERY PLAN " + TURN_TOTALS_SQL, (10,))]
+        self.assertEqual(latest, ["SCAN agent_spans USING INDEX idx_agent_spans_start"])
+        self.assertIn("SEARCH agent_spans USING INDEX idx_agent_spans_root (parent_id=?)", turns)
+        self.assertIn("SEARCH agent_spans USING INDEX idx_agent_spans_trace (trace_id=?)", turns)
+        print("✅ PASS")
+
+
+if __name__ == "__main__":
+    unittest.main()
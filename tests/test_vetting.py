@@ -0,0 +1,161 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import unittest
+import uuid
+from unittest.mock import patch
+
+from google.adk.agents import BaseAgent
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from marriage_council.config import conf
+from marriage_council.batch import vet_couples, pairs_from_profiles, TokenBucket, _page_sql
+from marriage_council.database import setup_database, close_connections, flush_logs, get_connection
+from marriage_council.sub_agents import vetting
+from marriage_council.sub_agents.vetting import FastVettingAgent, extract_couple_ids, fast_path_stats
+
+
+# --- HELPER: Fallback that stands in for the LLM pipeline ---
+class CannedPipeline(BaseAgent):
+    async def _run_async_impl(self, ctx):
+        yield Event(
+            invocation_id=ctx.invocation_id, author=self.name, branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text="LLM_FALLBACK")])
+        )
+
+
+class FastVettingTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.test_db_file = f"test_db_{uuid.uuid4().hex}.sqlite"
+        self.original_db_name = conf.db_name
+        conf.db_name = self.test_db_file
+        setup_database()
+
+        conn = sqlite3.connect(conf.db_name)
+        conn.execute("UPDATE profiles SET risk_factor='Clean'")
+        conn.execute("UPDATE profiles SET risk_factor='Fake Job' WHERE id='G-8'")
+        conn.execute("UPDATE profiles SET horoscope_sign='Leo'")
+        conn.commit()
+        conn.close()
+        fast_path_stats.reset()
+
+    async def asyncTearDown(self):
+        conf.db_name = self.original_db_name
+        flush_logs()
+        close_connections(self.test_db_file)
+        for path in (self.test_db_file, f"{self.test_db_file}-wal", f"{self.test_db_file}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    async def run_pipeline(self, prompt):
+        agent = FastVettingAgent(name="VettingPipeline", sub_agents=[CannedPipeline(name="LlmVettingPipeline")])
+        service = InMemorySessionService()
+        await service.create_session(app_name="test_app", user_id="u", session_id="s")
+        runner = Runner(agent=agent, app_name="test_app", session_service=service)
+        texts = []
+        async for event in runner.run_async(
+            user_id="u", session_id="s", new_message=types.Content(role="user", parts=[types.Part(text=prompt)])
+        ):
+            if event.content and event.content.parts and event.content.parts[0].text:
+                texts.append(event.content.parts[0].text)
+        session = await service.get_session(app_name="test_app", user_id="u", session_id="s")
+        return texts[-1], session.state
+
+    def test_id_extraction(self):
+        print("\n🔵 TEST: Couple ID Extraction")
+        self.assertEqual(extract_couple_ids("Identify Groom G-1 and Bride b-01."), ("G-1", "B-1"))
+        self.assertIsNone(extract_couple_ids("Compare G-1, G-2 and B-1"))
+        self.assertIsNone(extract_couple_ids("Find a random couple"))
+        print("✅ PASS")
+
+    async def test_fast_path_pass_and_fail(self):
+        print("\n🔵 TEST: Deterministic Vetting Verdicts")
+        text, state = await self.run_pipeline("Identify Groom G-1 and Bride B-1. Run vetting.")
+        self.assertEqual(json.loads(text)["status"], "PASS")
+        self.assertEqual(state["verdict"]["status"], "PASS")
+
+        text, _ = await self.run_pipeline("Identify Groom G-8 and Bride B-1. Run vetting.")
+        self.assertEqual(json.loads(text)["status"], "FAIL")
+        self.assertEqual(fast_path_stats.snapshot()["fast_path"], 2)
+        print("✅ PASS")
+
+    async def test_fast_path_does_not_block_the_loop(self):
+        print("\n🔵 TEST: Fast Path Runs Off the Event Loop")
+        loop_thread, check_threads = threading.get_ident(), []
+
+        def recording_check(profile_id):
+            check_threads.append(threading.get_ident())
+            return real_check(profile_id)
+
+        real_check = vetting.perform_background_check
+        with patch.object(vetting, "perform_background_check", recording_check):
+            text, _ = await self.run_pipeline("Identify Groom G-1 and Bride B-1. Run vetting.")
+        self.assertEqual(json.loads(text)["status"], "PASS")
+        self.assertEqual(len(check_threads), 2)
+        self.assertNotIn(loop_thread, check_threads)
+        print("✅ PASS")
+
+    async def test_ambiguous_ids_fall_back_to_llm(self):
+        print("\n🔵 TEST: Fast Path Fallback")
+        text, _ = await self.run_pipeline("Vet G-1 or G-2 with B-1.")
+        self.assertEqual(text, "LLM_FALLBACK")
+        text, _ = await self.run_pipeline("Vet G-99 with B-1.")  # unknown profile
+        self.assertEqual(text, "LLM_FALLBACK")
+        self.assertEqual(fast_path_stats.snapshot()["llm_fallback"], 2)
+        print("✅ PASS")
+
+    # --- BATCH ENGINE ---
+    async def test_batch_vetting_checkpoints_and_resumes(self):
+        print("\n🔵 TEST: Batch Vetting + Resume")
+        pairs = [("G-1", "B-1"), ("G-8", "B-1"), ("G-2", "B-3")]
+        report = await vet_couples(pairs[:2], run_id="nightly", concurrency=2)
+        self.assertEqual((report.vetted, report.errors), (2, 0))
+        self.assertIn("total", report.stage_percentiles())
+
+        # Second run with the same id only does the remaining couple
+        report = await vet_couples(pairs, run_id="nightly", concurrency=2)
+        self.assertEqual((report.vetted, report.skipped), (1, 2))
+
+        with get_connection() as conn:
+            rows = dict(((g, b), status) for g, b, status in conn.execute(
+                "SELECT groom_id, bride_id, status FROM vetting_results WHERE run_id='nightly'"))
+        self.assertEqual(rows, {("G-1", "B-1"): "PASS", ("G-8", "B-1"): "FAIL", ("G-2", "B-3"): "PASS"})
+        self.assertEqual(len(list(pairs_from_profiles(page_size=7))), 100)
+        print("✅ PASS")
+
+    async def test_pairing_pages_seek_instead_of_sorting(self):
+        print("\n🔵 TEST: Batch Pairing Query Plan")
+        with get_connection() as conn:
+            for clean_only in (False, True):
+                plan = " ".join(r[-1] for r in conn.execute(
+                    "EXPLAIN QUERY PLAN " + _page_sql(clean_only), ("Female", "B-1", 100)))
+                self.assertIn("COVERING INDEX", plan)
+                self.assertNotIn("TEMP B-TREE", plan)
+            expected = conn.execute(
+                "SELECT g.id, b.id FROM profiles g JOIN profiles b ON g.gender = 'Male' AND b.gender = 'Female'"
+                " ORDER BY g.id, b.id").fetchall()
+        self.assertEqual(list(pairs_from_profiles(page_size=7)), expected)
+        self.assertEqual(list(pairs_from_profiles(limit=15, page_size=7)), expected[:15])
+        self.assertEqual(list(pairs_from_profiles(clean_only=True, page_size=4)),
+                         [pair for pair in expected if pair[0] != "G-8"])
+        print("✅ PASS")
+
+    async def test_token_bucket_limits_rate(self):
+        print("\n🔵 TEST: Token Bucket")
+        bucket = TokenBucket(rate=50, capacity=1)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for _ in range(6):
+            await bucket.acquire()
+        self.assertGreaterEqual(loop.time() - start, 0.09)
+        print("✅ PASS")
+
+
+if __name__ == "__main__":
+    unittest.main()